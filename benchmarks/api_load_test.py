@@ -0,0 +1,173 @@
+"""
+Prueba de carga de la API local de Mintly.
+
+Levanta el servidor en un proceso aparte sobre una base de datos temporal (o usa uno ya
+arrancado con --port) y lanza clientes concurrentes con conexiones keep-alive.
+Al terminar muestra el rendimiento (peticiones/s) y los percentiles de latencia.
+
+    python benchmarks/api_load_test.py --clients 16 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HOST = "127.0.0.1"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"El servidor no respondió en el puerto {port}")
+
+
+class Client:
+    def __init__(self, port: int):
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(HOST, self.port)
+
+    async def request(self, method: str, path: str, body=None):
+        data = json.dumps(body).encode() if body is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: {HOST}\r\nContent-Length: {len(data)}\r\n\r\n"
+        self.writer.write(head.encode() + data)
+        await self.writer.drain()
+
+        raw_head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(raw_head.split(b" ", 2)[1])
+        length = 0
+        for line in raw_head.split(b"\r\n"):
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        payload = json.loads(await self.reader.readexactly(length))
+        return status, payload
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def random_transaction(rng: random.Random) -> dict:
+    return {
+        'type': rng.choice(['ingreso', 'gasto', 'gasto', 'gasto']),
+        'amount': round(rng.uniform(1, 500), 2),
+        'category': rng.choice(["🛒 Alimentación", "🚌 Transporte", "🎬 Ocio", "💼 Salario"]),
+        'description': "carga",
+        'date': f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    }
+
+
+async def worker(port: int, n_requests: int, batch_size: int, seed: int, latencies: list, errors: list):
+    rng = random.Random(seed)
+    client = Client(port)
+    await client.connect()
+    cursor = None
+    try:
+        for _ in range(n_requests):
+            roll = rng.random()
+            if roll < 0.6:
+                path = "/transactions?limit=50" + (f"&cursor={cursor}" if cursor else "")
+                method, body = "GET", None
+            elif roll < 0.8:
+                method, path = "POST", "/transactions"
+                if batch_size > 1:
+                    body = [random_transaction(rng) for _ in range(batch_size)]
+                else:
+                    body = random_transaction(rng)
+            elif roll < 0.9:
+                method, path, body = "GET", "/balance", None
+            else:
+                method, path, body = "GET", "/categories/expense", None
+
+            start = time.perf_counter()
+            status, payload = await client.request(method, path, body)
+            latencies.append(time.perf_counter() - start)
+
+            if status >= 400:
+                errors.append((status, payload))
+            elif method == "GET" and path.startswith("/transactions"):
+                cursor = payload.get('next_cursor')
+    finally:
+        await client.close()
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(port: int, clients: int, requests: int, batch_size: int):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        worker(port, requests, batch_size, seed, latencies, errors) for seed in range(clients)
+    ])
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"Peticiones: {total} ({clients} clientes x {requests}), errores: {len(errors)}")
+    print(f"Tiempo total: {elapsed:.2f} s  ->  {total / elapsed:,.0f} peticiones/s")
+    for pct in (50, 90, 95, 99):
+        print(f"  p{pct}: {percentile(latencies, pct) * 1000:.2f} ms")
+    print(f"  max: {latencies[-1] * 1000:.2f} ms" if latencies else "  max: -")
+    if errors:
+        print(f"Primer error: {errors[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API local de Mintly")
+    parser.add_argument("--port", type=int, help="Usar un servidor ya arrancado en este puerto")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Peticiones por cliente")
+    parser.add_argument("--batch-size", type=int, default=1, help="Transacciones por cada POST")
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    process = None
+    tmp_dir = None
+    port = args.port
+    if port is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.api", "--db", os.path.join(tmp_dir.name, "load.db"),
+             "--port", str(port), "--pool-size", str(args.pool_size)],
+            cwd=ROOT, stdout=subprocess.DEVNULL
+        )
+    try:
+        wait_for_port(port)
+        asyncio.run(run(port, args.clients, args.requests, args.batch_size))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark del saldo a una fecha.
+
+Compara sumar todos los movimientos anteriores a la fecha con la busqueda en daily_balance, y
+mide lo que cuesta rehacer el acumulado tras un alta al final del libro y tras una con fecha
+antigua.
+
+    python benchmarks/balance_lookup.py --rows 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.database import Database
+from src.models.transaction import Transaction, TransactionType, day_number
+
+
+def build_ledger(db, rows: int) -> date:
+    rng = random.Random(11)
+    start = date(2010, 1, 1)
+    db.add_transactions([
+        Transaction(TransactionType.INCOME if i % 8 == 0 else TransactionType.EXPENSE,
+                    round(rng.uniform(2, 300), 2), "🛒 Alimentación", f"Movimiento {i}",
+                    (start + timedelta(days=i // 40)).isoformat())
+        for i in range(rows)
+    ])
+    return start + timedelta(days=(rows - 1) // 40)
+
+
+def timed(label: str, fn, rounds: int = 20):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<36} {best * 1000:9.3f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del saldo a una fecha")
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "balance.db"))
+        last = build_ledger(db, args.rows)
+        day = (last - timedelta(days=30)).isoformat()
+        print(f"{args.rows:,} movimientos hasta {last}")
+
+        def summed():
+            with db.transaction() as conn:
+                return conn.execute(
+                    "SELECT SUM(CASE WHEN type = 'ingreso' THEN amount ELSE -amount END) FROM transactions WHERE date <= ?",
+                    (day_number(day),)
+                ).fetchone()[0]
+
+        expected = timed("Sumando todos los movimientos", summed)
+        found = timed("Busqueda en daily_balance", lambda: db.get_balance_at(day))
+        print(f"  Coinciden: {abs(expected - found) < 0.01}")
+
+        def append():
+            db.add_transaction(Transaction(TransactionType.EXPENSE, 1.0, "🎬 Ocio", "", last.isoformat()))
+            return db.get_balance_at(day)
+
+        def back_dated():
+            db.add_transaction(Transaction(TransactionType.EXPENSE, 1.0, "🎬 Ocio", "", "2010-01-02"))
+            return db.get_balance_at(day)
+
+        timed("Alta al final + lectura", append, rounds=5)
+        timed("Alta con fecha antigua + lectura", back_dated, rounds=5)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark del coste de estilar las tarjetas de movimientos.
+
+Crea N TransactionCard con la hoja de estilos de la aplicacion (tema) y otras N aplicando a
+cada widget su propio setStyleSheet como se hacia antes, y mide crear + pintar la lista.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/card_styling.py --cards 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication, QLabel, QPushButton, QVBoxLayout, QWidget
+
+from src.models.transaction import TransactionType
+from src.views.dashboard import TransactionCard
+from src.utils.theme import COLORS, apply_theme
+
+TYPES = (TransactionType.INCOME, TransactionType.EXPENSE, TransactionType.SAVINGS)
+
+
+def legacy_style(card: TransactionCard):
+    # Las mismas hojas que llevaba cada tarjeta antes del tema, una por widget
+    card.setStyleSheet(
+        f"QFrame {{ background: {COLORS['surface']}; border-radius: 10px; }} "
+        f"QFrame:hover {{ background: {COLORS['surface_hover']}; }}"
+    )
+    for label in card.findChildren(QLabel):
+        color = COLORS.get(label.property("tone"), COLORS['text_dim'])
+        name = label.objectName()
+        if name == "cardIndicator":
+            label.setStyleSheet(f"color: {color}; font-size: 20px;")
+        elif name == "cardCategory":
+            label.setStyleSheet("color: white; font-weight: 700; font-size: 14px;")
+        elif name == "cardDate":
+            label.setStyleSheet(f"color: {COLORS['text_dim']}; font-size: 11px;")
+        else:
+            label.setStyleSheet(f"color: {color}; font-weight: 800; font-size: 15px;")
+    for button in card.findChildren(QPushButton):
+        button.setStyleSheet(
+            "QPushButton { background: #EF4444; color: white; border: none; border-radius: 6px; } "
+            "QPushButton:hover { background: #DC2626; }"
+        )
+
+
+def build_list(app, cards: int, legacy: bool) -> float:
+    started = time.perf_counter()
+    container = QWidget()
+    layout = QVBoxLayout(container)
+    for i in range(cards):
+        card = TransactionCard(i, "🛒 Alimentación", 12.5 + i, "2024-05-01", TYPES[i % 3], lambda _: None)
+        if legacy:
+            legacy_style(card)
+        layout.addWidget(card)
+    container.resize(420, 80 * cards)
+    container.grab()
+    app.processEvents()
+    elapsed = time.perf_counter() - started
+    container.deleteLater()
+    app.processEvents()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de estilos de las tarjetas")
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    app.setStyle("Fusion")
+
+    legacy = min(build_list(app, args.cards, True) for _ in range(args.rounds))
+    apply_theme(app)
+    themed = min(build_list(app, args.cards, False) for _ in range(args.rounds))
+
+    print(f"{'Hoja por widget':<20} {legacy * 1000:9.1f} ms  ({legacy / args.cards * 1e6:,.0f} µs/tarjeta)")
+    print(f"{'Tema de aplicacion':<20} {themed * 1000:9.1f} ms  ({themed / args.cards * 1e6:,.0f} µs/tarjeta)")
+    print(f"Mejora: x{legacy / themed:.1f}" if themed else "")
+
+
+if __name__ == "__main__":
+    main()
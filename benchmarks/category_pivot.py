@@ -0,0 +1,64 @@
+"""
+Benchmark de la comparativa mes × categoria.
+
+Crea un libro de varios años con muchas categorias y mide la consulta agrupada que llena la
+matriz y el calculo de las variaciones respecto al mes anterior y al mismo mes del año anterior.
+
+    python benchmarks/category_pivot.py --years 10 --per-day 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.database import Database
+from src.models.transaction import Transaction, TransactionType
+
+CATEGORIES = [f"Categoria {i}" for i in range(20)]
+
+
+def build_ledger(db, years: int, per_day: int):
+    rng = random.Random(3)
+    start = date(2024 - years, 1, 1)
+    db.add_transactions([
+        Transaction(TransactionType.EXPENSE, round(rng.uniform(2, 200), 2), rng.choice(CATEGORIES),
+                    f"Gasto {i}", (start + timedelta(days=i // per_day)).isoformat())
+        for i in range(years * 365 * per_day)
+    ])
+
+
+def timed(label: str, fn, rounds: int = 5):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<32} {best * 1000:9.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la comparativa mensual por categoria")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--per-day", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "pivot.db"))
+        build_ledger(db, args.years, args.per_day)
+        start, end = f"{2024 - args.years}-01", "2023-12"
+        print(f"{args.years * 365 * args.per_day:,} movimientos en {args.years} años")
+
+        pivot = timed("Matriz mes × categoria", lambda: db.get_category_pivot(TransactionType.EXPENSE, start, end))
+        print(f"  {len(pivot)} meses × {len(pivot.categories)} categorias")
+        timed("Variacion mensual e interanual", lambda: (pivot.deltas(), pivot.deltas(lag=12)))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
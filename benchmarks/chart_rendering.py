@@ -0,0 +1,80 @@
+"""
+Benchmark del tiempo que un grafico bloquea el hilo de la interfaz.
+
+Dibuja el mismo grafico de barras N veces con el lienzo Qt de matplotlib (todo en el hilo de la
+interfaz) y con ChartWidget(threaded=True) (Agg en el pool de hilos). Para el modo threaded se
+mide lo que tarda set_data en volver y lo que tarda en llegar la imagen. Tambien lanza rafagas
+de cambios seguidos para comprobar que los renders obsoletos se descartan.
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/chart_rendering.py --renders 20
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QThreadPool
+from PySide6.QtWidgets import QApplication
+
+from src.widgets.chart_widget import ChartWidget
+
+DATA = {f"Categoria {i}": 100.0 + i * 37 for i in range(12)}
+
+
+def make_widget(threaded: bool) -> ChartWidget:
+    widget = ChartWidget(threaded=threaded)
+    widget.resize(800, 400)
+    widget.show()
+    return widget
+
+
+def wait_image(app, widget: ChartWidget):
+    widget._image = None
+    while widget._image is None:
+        app.processEvents()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de renderizado de graficos")
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--burst", type=int, default=10, help="Cambios seguidos en cada rafaga")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    canvas = make_widget(False)
+    app.processEvents()
+    started = time.perf_counter()
+    for i in range(args.renders):
+        canvas.set_data(DATA, f"Render {i}")
+    blocked = (time.perf_counter() - started) / args.renders
+    print(f"{'Lienzo Qt':<22} bloquea {blocked * 1000:8.1f} ms por grafico")
+
+    threaded = make_widget(True)
+    app.processEvents()
+    blocked = ready = 0.0
+    for i in range(args.renders):
+        started = time.perf_counter()
+        threaded.set_data(DATA, f"Render {i}")
+        blocked += time.perf_counter() - started
+        wait_image(app, threaded)
+        ready += time.perf_counter() - started
+    print(f"{'Agg en hilo':<22} bloquea {blocked / args.renders * 1000:8.2f} ms por grafico "
+          f"(imagen lista en {ready / args.renders * 1000:.1f} ms)")
+
+    # Rafagas: solo la ultima peticion deberia acabar pintandose
+    started = time.perf_counter()
+    for r in range(args.renders):
+        for i in range(args.burst):
+            threaded.set_data(DATA, f"Rafaga {r}.{i}")
+        wait_image(app, threaded)
+    QThreadPool.globalInstance().waitForDone()
+    elapsed = (time.perf_counter() - started) / args.renders
+    print(f"{'Rafaga de ' + str(args.burst):<22} {elapsed * 1000:8.1f} ms hasta la imagen final")
+
+
+if __name__ == "__main__":
+    main()
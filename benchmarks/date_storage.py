@@ -0,0 +1,95 @@
+"""
+Benchmark de las fechas como texto 'AAAA-MM-DD' frente a dia juliano entero.
+
+Crea el mismo libro con las dos columnas de fecha (tabla e indices como los de la aplicacion) y
+compara el tamaño del fichero, una suma por rango de fechas y la primera pagina del listado.
+
+    python benchmarks/date_storage.py --rows 500000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import day_number
+
+SCHEMA = """
+    CREATE TABLE transactions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT NOT NULL,
+        description TEXT,
+        date {date_type} NOT NULL
+    )
+"""
+INDEXES = (
+    "CREATE INDEX idx_transactions_date_id ON transactions (date, id)",
+    "CREATE INDEX idx_transactions_type_date_id ON transactions (type, date, id)",
+)
+
+
+def build(path: str, date_type: str, rows: list):
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA.format(date_type=date_type))
+    for statement in INDEXES:
+        conn.execute(statement)
+    convert = day_number if date_type == "INTEGER" else str
+    conn.executemany(
+        "INSERT INTO transactions (type, amount, category, description, date) VALUES (?, ?, ?, ?, ?)",
+        [(t, a, c, d, convert(day)) for t, a, c, d, day in rows]
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    return conn
+
+
+def timed(label: str, fn, rounds: int = 10):
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<28} {best * 1000:9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de fechas en texto frente a dia juliano")
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    start = date(2010, 1, 1)
+    rows = [
+        ('ingreso' if i % 8 == 0 else 'gasto', round(rng.uniform(2, 300), 2), "🛒 Alimentación",
+         f"Movimiento {i}", (start + timedelta(days=i // 60)).isoformat())
+        for i in range(args.rows)
+    ]
+    first, last = "2015-01-01", "2016-12-31"
+    print(f"{args.rows:,} movimientos, rango {first} .. {last}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for date_type, bounds in (("TEXT", (first, last)), ("INTEGER", (day_number(first), day_number(last)))):
+            path = os.path.join(tmp, f"{date_type.lower()}.db")
+            conn = build(path, date_type, rows)
+            print(f"{date_type}: {os.path.getsize(path) / 1024 / 1024:.2f} MB")
+            timed("Suma por rango de fechas", lambda: conn.execute(
+                "SELECT type, SUM(amount) FROM transactions WHERE date BETWEEN ? AND ? GROUP BY type", bounds
+            ).fetchall())
+            timed("Recuento por rango (indice)", lambda: conn.execute(
+                "SELECT COUNT(*) FROM transactions WHERE date BETWEEN ? AND ?", bounds
+            ).fetchone())
+            timed("Primera pagina por tipo", lambda: conn.execute(
+                "SELECT * FROM transactions WHERE type = 'gasto' ORDER BY date DESC, id DESC LIMIT 50"
+            ).fetchall())
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
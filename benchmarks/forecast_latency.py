@@ -0,0 +1,80 @@
+"""
+Benchmark de la proyeccion de balance con NumPy.
+
+Genera un historico diario de mas de 10 años, mide la carga (una consulta agrupada)
+y el calculo de la proyeccion por separado, y falla (codigo de salida 1) si la
+mediana del total supera el presupuesto de latencia.
+
+    python benchmarks/forecast_latency.py --years 12 --per-day 5 --budget-ms 100
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.database import Database
+from src.models.transaction import Transaction, TransactionType
+from src.utils.forecast import load_daily_flows, forecast_balance
+
+
+def build_history(db, years: int, per_day: int):
+    rng = random.Random(7)
+    today = date.today()
+    day = today - timedelta(days=365 * years)
+    batch = []
+    while day <= today:
+        iso = day.isoformat()
+        if day.day == 1:
+            batch.append(Transaction(TransactionType.INCOME, 2400.0, "💼 Salario", "", iso))
+        for _ in range(rng.randint(0, per_day * 2)):
+            batch.append(Transaction(TransactionType.EXPENSE, round(rng.uniform(2, 60), 2), "🛒 Alimentación", "", iso))
+        day += timedelta(days=1)
+    db.add_transactions(batch)
+    return len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la proyeccion de balance")
+    parser.add_argument("--years", type=int, default=12)
+    parser.add_argument("--per-day", type=int, default=5, help="Gastos medios por dia")
+    parser.add_argument("--months", type=int, default=12, help="Meses a proyectar")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        rows = build_history(db, args.years, args.per_day)
+
+        load_times, compute_times = [], []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            dates, net = load_daily_flows(db)
+            loaded = time.perf_counter()
+            forecast_balance(dates, net, args.months)
+            finished = time.perf_counter()
+            load_times.append((loaded - started) * 1000)
+            compute_times.append((finished - loaded) * 1000)
+        db.close()
+
+    totals = [a + b for a, b in zip(load_times, compute_times)]
+    median = statistics.median(totals)
+    print(f"Histórico: {args.years} años, {rows:,} transacciones, {dates.size:,} días con movimientos")
+    print(f"Carga (consulta agrupada): mediana {statistics.median(load_times):.2f} ms")
+    print(f"Cálculo NumPy:             mediana {statistics.median(compute_times):.2f} ms")
+    print(f"Total:                     mediana {median:.2f} ms, máx {max(totals):.2f} ms "
+          f"(presupuesto {args.budget_ms:.0f} ms)")
+
+    if median > args.budget_ms:
+        print("FUERA DE PRESUPUESTO")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
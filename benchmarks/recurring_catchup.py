@@ -0,0 +1,74 @@
+"""
+Benchmark de la generacion de transacciones recurrentes.
+
+Crea miles de reglas (diarias, semanales, mensuales y anuales) que llevan años sin
+ejecutarse y mide cuanto tarda ponerse al dia en una sola pasada, y cuanto cuesta
+la siguiente ejecucion cuando no hay nada pendiente (solo consulta el indice next_due).
+
+    python benchmarks/recurring_catchup.py --rules 5000 --years 5
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.database import Database
+from src.models.recurring_rule import RecurringRule, Frequency
+from src.models.transaction import TransactionType
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de reglas recurrentes")
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=5, help="Años sin ejecutar el planificador")
+    parser.add_argument("--daily-share", type=float, default=0.02, help="Proporcion de reglas diarias")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    today = date.today()
+    start_year = today.year - args.years
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+
+        rules = []
+        for _ in range(args.rules):
+            roll = rng.random()
+            if roll < args.daily_share:
+                frequency = Frequency.DAILY
+            elif roll < 0.2:
+                frequency = Frequency.WEEKLY
+            elif roll < 0.9:
+                frequency = Frequency.MONTHLY
+            else:
+                frequency = Frequency.YEARLY
+            start = date(start_year, rng.randint(1, 12), rng.randint(1, 28)).isoformat()
+            rules.append(RecurringRule(TransactionType.EXPENSE, round(rng.uniform(5, 900), 2),
+                                       "🏠 Vivienda", "bench", frequency, start))
+
+        with db.transaction():
+            for rule in rules:
+                db.add_recurring_rule(rule)
+
+        started = time.perf_counter()
+        created = db.materialize_recurring_rules(today.isoformat())
+        catch_up = time.perf_counter() - started
+
+        started = time.perf_counter()
+        again = db.materialize_recurring_rules(today.isoformat())
+        idle = time.perf_counter() - started
+
+        print(f"Reglas: {args.rules}, años pendientes: {args.years}")
+        print(f"Puesta al día: {created:,} transacciones en {catch_up:.3f} s "
+              f"({created / catch_up:,.0f} transacciones/s)")
+        print(f"Segunda ejecución: {again} transacciones en {idle * 1000:.2f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark de la sincronizacion entre dos libros.
+
+Crea un libro con N movimientos, lo sincroniza con uno vacio (N cambios enviados), luego
+edita y borra una parte en cada lado y vuelve a sincronizar (solo viajan esos cambios).
+
+    python benchmarks/sync_changes.py --changes 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.database import Database
+from src.models.transaction import Transaction, TransactionType
+from src.utils.sync import sync_databases
+
+
+def build_ledger(db, rows: int):
+    rng = random.Random(5)
+    start = date(2020, 1, 1)
+    batch = [
+        Transaction(TransactionType.EXPENSE, round(rng.uniform(2, 200), 2), "🛒 Alimentación",
+                    f"Compra {i}", (start + timedelta(days=i % 1800)).isoformat())
+        for i in range(rows)
+    ]
+    db.add_transactions(batch)
+
+
+def touch(db, fraction: float, seed: int):
+    # Edita y borra una parte del libro directamente, como haria la app fila a fila
+    rng = random.Random(seed)
+    with db.transaction() as conn:
+        ids = [r[0] for r in conn.execute("SELECT id FROM transactions").fetchall()]
+        picked = rng.sample(ids, int(len(ids) * fraction))
+        half = len(picked) // 2
+        conn.executemany("UPDATE transactions SET amount = amount + 1 WHERE id = ?", [(i,) for i in picked[:half]])
+        conn.executemany("DELETE FROM transactions WHERE id = ?", [(i,) for i in picked[half:]])
+    return len(picked)
+
+
+def timed_sync(a, b, label: str):
+    started = time.perf_counter()
+    result = sync_databases(a, b)
+    elapsed = time.perf_counter() - started
+    moved = result['received'] + result['sent']
+    rate = moved / elapsed if elapsed else 0
+    print(f"{label:<28} {moved:>9,} cambios  {elapsed * 1000:9.1f} ms  ({rate:,.0f} cambios/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de sincronizacion entre dos libros")
+    parser.add_argument("--changes", type=int, default=100_000)
+    parser.add_argument("--fraction", type=float, default=0.05, help="Parte del libro que cambia en cada lado")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        a = Database(os.path.join(tmp, "a.db"))
+        b = Database(os.path.join(tmp, "b.db"))
+        build_ledger(a, args.changes)
+
+        timed_sync(a, b, "Sincronizacion inicial")
+        timed_sync(a, b, "Sin cambios")
+        touched = touch(a, args.fraction, 1) + touch(b, args.fraction, 2)
+        print(f"Editadas/borradas {touched:,} filas entre los dos lados")
+        timed_sync(a, b, "Sincronizacion incremental")
+
+        with a.transaction() as conn:
+            count_a = conn.execute("SELECT COUNT(*), ROUND(SUM(amount), 2) FROM transactions").fetchone()
+        with b.transaction() as conn:
+            count_b = conn.execute("SELECT COUNT(*), ROUND(SUM(amount), 2) FROM transactions").fetchone()
+        print(f"Convergen: {tuple(count_a) == tuple(count_b)} ({count_a[0]:,} filas)")
+        a.close()
+        b.close()
+
+
+if __name__ == "__main__":
+    main()
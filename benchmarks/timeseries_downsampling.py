@@ -0,0 +1,79 @@
+"""
+Benchmark de la serie temporal de la pestaña de estadisticas.
+
+Carga la serie diaria de varios años (agrupada en SQLite), la reduce con LTTB al ancho del
+grafico y simula desplazar la vista un mes, que solo consulta el tramo nuevo.
+
+    python benchmarks/timeseries_downsampling.py --years 10 --per-day 20 --width 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.database import Database
+from src.models.transaction import Transaction, TransactionType
+from src.utils.timeseries import SeriesWindow, downsample
+
+
+def build_ledger(db, years: int, per_day: int):
+    rng = random.Random(9)
+    start = date(2024 - years, 1, 1)
+    days = years * 365
+    batch = [
+        Transaction(TransactionType.INCOME if i % 10 == 0 else TransactionType.EXPENSE,
+                    round(rng.uniform(2, 200), 2), "🛒 Alimentación", f"Movimiento {i}",
+                    (start + timedelta(days=i // per_day)).isoformat())
+        for i in range(days * per_day)
+    ]
+    db.add_transactions(batch)
+    return start + timedelta(days=days - 1)
+
+
+def timed(label: str, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"{label:<34} {(time.perf_counter() - started) * 1000:9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de series temporales con LTTB")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--width", type=int, default=1000, help="Pixeles de ancho del grafico")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "series.db"))
+        last = build_ledger(db, args.years, args.per_day)
+        print(f"{args.years * 365 * args.per_day:,} movimientos en {args.years} años")
+
+        window = SeriesWindow(db, 'day')
+        bounds = window.bounds()
+        data = timed("Carga diaria completa", lambda: window.load(*bounds))
+        reduced = timed("LTTB de las 4 series", lambda: [
+            downsample(data['dates'], data[key], args.width)
+            for key in ('income', 'expense', 'savings', 'balance')
+        ])
+        print(f"  {data['dates'].size:,} dias -> {reduced[0][0].size:,} puntos por serie")
+
+        # Vista del ultimo año y desplazamiento de un mes hacia atras
+        window = SeriesWindow(db, 'day')
+        year_ago = np.datetime64(last) - np.timedelta64(365, 'D')
+        timed("Carga del ultimo año", lambda: window.load(year_ago, np.datetime64(last)))
+        month = np.timedelta64(30, 'D')
+        timed("Desplazar un mes", lambda: window.load(year_ago - month, np.datetime64(last) - month))
+        print(f"  Consultas a SQLite: {window.queries}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
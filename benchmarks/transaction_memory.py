@@ -0,0 +1,73 @@
+"""
+Benchmark de memoria de los resultados de transacciones.
+
+Compara, por cada 100k filas, lo que ocupa el libro cargado como objetos Transaction
+(con __slots__), en modo columnar (listas paralelas) y como array estructurado de NumPy,
+ademas del tiempo de carga de cada modo.
+
+    python benchmarks/transaction_memory.py --rows 100000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.database import Database
+from src.models.transaction import Transaction, TransactionType
+
+
+def build_ledger(db, rows: int):
+    rng = random.Random(3)
+    start = date(2015, 1, 1)
+    batch = [
+        Transaction(TransactionType.EXPENSE, round(rng.uniform(2, 200), 2), "🛒 Alimentación",
+                    f"Compra {i}", (start + timedelta(days=i % 3650)).isoformat())
+        for i in range(rows)
+    ]
+    db.add_transactions(batch)
+
+
+def measure(load):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria de las transacciones")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        build_ledger(db, args.rows)
+
+        modes = [
+            ("Objetos Transaction", lambda: db.get_all_transactions()),
+            ("Columnas", lambda: db.get_transactions_columns()),
+            ("NumPy estructurado", lambda: db.get_transactions_columns().to_numpy()),
+        ]
+        scale = 100_000 / args.rows
+        print(f"Libro de {args.rows:,} transacciones (valores por 100k filas)")
+        for name, load in modes:
+            current, peak, elapsed = measure(load)
+            print(f"{name:<20} retenido {current * scale / 2**20:7.1f} MiB  "
+                  f"pico {peak * scale / 2**20:7.1f} MiB  carga {elapsed * 1000:7.1f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .server import ApiServer
+
+__all__ = ['ApiServer']
\ No newline at end of file
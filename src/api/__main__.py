@@ -0,0 +1,3 @@
+from src.api.server import main
+
+main()
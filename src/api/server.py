@@ -0,0 +1,376 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from src.controllers.mintly import Mintly
+from src.models.database import Database
+from src.models.transaction import TransactionType
+
+HOST = "127.0.0.1"
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 8 * 1024 * 1024
+MAX_PAGE_SIZE = 500
+
+TYPE_NAMES = {
+    'ingreso': TransactionType.INCOME,
+    'gasto': TransactionType.EXPENSE,
+    'ahorro': TransactionType.SAVINGS,
+    'INCOME': TransactionType.INCOME,
+    'EXPENSE': TransactionType.EXPENSE,
+    'SAVINGS': TransactionType.SAVINGS
+}
+
+STATUS_TEXT = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def transaction_to_dict(t) -> dict:
+    return {
+        'id': t.id,
+        'type': t.transaction_type.value,
+        'amount': t.amount,
+        'category': t.category,
+        'description': t.description,
+        'date': t.date,
+        'goal_id': t.goal_id
+    }
+
+
+def category_to_dict(c) -> dict:
+    return {
+        'id': c.id,
+        'name': c.name,
+        'type': c.category_type.value,
+        'color': c.color,
+        'icon': c.icon,
+        'parent_id': c.parent_id
+    }
+
+
+def goal_to_dict(g) -> dict:
+    return {
+        'id': g.id,
+        'name': g.name,
+        'target_amount': g.target_amount,
+        'current_amount': g.current_amount,
+        'progress': g.progress_percentage,
+        'deadline': g.deadline,
+        'description': g.description
+    }
+
+
+class ApiServer:
+    # API local (solo localhost) para poder meter movimientos desde otras herramientas sin abrir la interfaz.
+    # Las llamadas al controlador son bloqueantes (SQLite), asi que se ejecutan en un pool de hilos
+    # del mismo tamaño que el pool de conexiones de la base de datos.
+    def __init__(self, controller: Mintly, port: int = 8765, workers: int = None):
+        self.controller = controller
+        self.port = port
+        self.workers = workers or controller.db.pool.size
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mintly-api")
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, HOST, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        print(f"API de Mintly escuchando en http://{HOST}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ApiError as e:
+                    await self._write_response(writer, e.status, {'error': e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, headers, body = request
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                loop = asyncio.get_running_loop()
+                status, payload = await loop.run_in_executor(
+                    self._executor, self._dispatch_safe, method, path, body
+                )
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise ApiError(413, "Cabeceras demasiado grandes")
+        if len(head) > MAX_HEADER_SIZE:
+            raise ApiError(413, "Cabeceras demasiado grandes")
+
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise ApiError(400, "Línea de petición no válida")
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise ApiError(400, "Content-Length no válido")
+        if length < 0:
+            raise ApiError(400, "Content-Length no válido")
+        if length > MAX_BODY_SIZE:
+            raise ApiError(413, "Cuerpo de la petición demasiado grande")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    def _dispatch_safe(self, method: str, target: str, raw_body: bytes):
+        try:
+            body = json.loads(raw_body) if raw_body else None
+        except ValueError:
+            return 400, {'error': "JSON no válido"}
+        return self.dispatch(method, target, body)
+
+    def dispatch(self, method: str, target: str, body=None):
+        try:
+            return self._route(method, target, body)
+        except ApiError as e:
+            return e.status, {'error': e.message}
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {'error': f"Petición no válida: {e}"}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    def _route(self, method: str, target: str, body):
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ['batch'] and method == 'POST':
+            return self._batch(body)
+
+        if parts == ['transactions']:
+            if method == 'GET':
+                return self._list_transactions(query)
+            if method == 'POST':
+                return self._create_transactions(body)
+            raise ApiError(405, "Método no permitido")
+
+        if parts == ['search'] and method == 'GET':
+            return self._search_transactions(query)
+
+        if len(parts) == 2 and parts[0] == 'transactions':
+            t_id = int(parts[1])
+            if method == 'GET':
+                t = self.controller.get_transaction(t_id)
+                if t is None:
+                    raise ApiError(404, "Transacción no encontrada")
+                return 200, transaction_to_dict(t)
+            if method == 'DELETE':
+                self.controller.delete_transaction(t_id)
+                return 200, {'deleted': t_id}
+            raise ApiError(405, "Método no permitido")
+
+        if parts == ['balance'] and method == 'GET':
+            if 'start' in query and 'end' in query:
+                return 200, self.controller.get_balance_by_period(query['start'], query['end'])
+            return 200, self.controller.get_monthly_balance()
+
+        if parts == ['health'] and method == 'GET':
+            return 200, self.controller.get_financial_health_score()
+
+        if parts == ['categories']:
+            if method == 'GET':
+                return 200, [category_to_dict(c) for c in self.controller.get_categories()]
+            if method == 'POST':
+                category_id = self.controller.create_category(
+                    body['name'], self._parse_type(body['type']), body.get('color'), body.get('parent_id')
+                )
+                return 201, {'id': category_id}
+            raise ApiError(405, "Método no permitido")
+
+        if len(parts) == 2 and parts[0] == 'categories' and method == 'PATCH':
+            if not isinstance(body, dict):
+                raise ApiError(400, "Falta el cuerpo de la petición")
+            # parent_id: null la sube al primer nivel; si no viene, no se mueve
+            with self.controller.transaction():
+                if not self.controller.update_category(int(parts[1]), body.get('name'), body.get('color')):
+                    raise ApiError(404, "Categoría no encontrada")
+                if 'parent_id' in body:
+                    self.controller.move_category(int(parts[1]), body['parent_id'])
+            return 200, {'id': int(parts[1])}
+
+        if len(parts) == 2 and parts[0] == 'categories' and method == 'GET':
+            totals = {
+                'income': self.controller.get_income_by_category,
+                'expense': self.controller.get_expenses_by_category,
+                'savings': self.controller.get_savings_by_category
+            }
+            if parts[1] not in totals:
+                raise ApiError(404, "Tipo de categoría no válido")
+            if 'parent' in query or query.get('level') == 'top':
+                # Un nivel del arbol: cada categoria con el total de sus subcategorias
+                t_type = {'income': TransactionType.INCOME, 'expense': TransactionType.EXPENSE,
+                          'savings': TransactionType.SAVINGS}[parts[1]]
+                parent_id = int(query['parent']) if 'parent' in query else None
+                return 200, self.controller.get_subtree_totals(t_type, parent_id)
+            return 200, totals[parts[1]]()
+
+        if parts == ['goals']:
+            if method == 'GET':
+                return 200, [goal_to_dict(g) for g in self.controller.get_all_savings_goals()]
+            if method == 'POST':
+                goal_id = self.controller.create_savings_goal(
+                    body['name'], float(body['target_amount']), float(body.get('current_amount', 0)),
+                    body.get('deadline'), body.get('description', "")
+                )
+                return 201, {'id': goal_id}
+            raise ApiError(405, "Método no permitido")
+
+        if len(parts) == 2 and parts[0] == 'goals' and method == 'DELETE':
+            delete_transactions = query.get('delete_transactions', '').lower() in ('1', 'true')
+            self.controller.delete_savings_goal(int(parts[1]), delete_transactions)
+            return 200, {'deleted': int(parts[1])}
+
+        if len(parts) == 3 and parts[0] == 'goals' and parts[2] == 'deposit' and method == 'POST':
+            self.controller.add_to_savings_goal(int(parts[1]), float(body['amount']))
+            return 200, {'goal_id': int(parts[1]), 'amount': float(body['amount'])}
+
+        raise ApiError(404, "Ruta no encontrada")
+
+    def _list_transactions(self, query: dict):
+        limit = min(int(query.get('limit', 50)), MAX_PAGE_SIZE)
+        t_type = None
+        if 'type' in query:
+            t_type = self._parse_type(query['type'])
+        page, next_cursor = self.controller.get_transactions_page(limit, query.get('cursor'), t_type)
+        return 200, {
+            'items': [transaction_to_dict(t) for t in page],
+            'next_cursor': next_cursor
+        }
+
+    def _search_transactions(self, query: dict):
+        limit = min(int(query.get('limit', 50)), MAX_PAGE_SIZE)
+        filters = {k: query[k] for k in ('category', 'start', 'end') if k in query}
+        if 'type' in query:
+            filters['t_type'] = self._parse_type(query['type'])
+        page, next_cursor = self.controller.search_transactions(
+            query.get('q', ''), filters, query.get('cursor'), limit
+        )
+        return 200, {
+            'items': [transaction_to_dict(t) for t in page],
+            'next_cursor': next_cursor
+        }
+
+    def _create_transactions(self, body):
+        if body is None:
+            raise ApiError(400, "Falta el cuerpo de la petición")
+        items = body if isinstance(body, list) else [body]
+        parsed = [
+            {
+                'type': self._parse_type(i['type']),
+                'amount': float(i['amount']),
+                'category': i['category'],
+                'description': i.get('description', ""),
+                'date': i['date']
+            }
+            for i in items
+        ]
+        ids = self.controller.create_transactions(parsed)
+        if isinstance(body, list):
+            return 201, {'ids': ids}
+        return 201, {'id': ids[0]}
+
+    def _batch(self, body):
+        """
+        Ejecuta varias operaciones en una sola peticion y en una sola transaccion SQLite:
+        si alguna falla no se aplica ninguna.
+        """
+        if not isinstance(body, list):
+            raise ApiError(400, "El lote debe ser una lista de operaciones")
+
+        results = []
+        try:
+            with self.controller.transaction():
+                for op in body:
+                    status, payload = self.dispatch(op.get('method', 'GET').upper(), op['path'], op.get('body'))
+                    results.append({'status': status, 'body': payload})
+                    if status >= 400:
+                        raise ApiError(status, f"Falló la operación {len(results) - 1} del lote")
+        except ApiError as e:
+            return e.status, {'error': e.message, 'results': results}
+        return 200, {'results': results}
+
+    @staticmethod
+    def _parse_type(value):
+        if value not in TYPE_NAMES:
+            raise ApiError(400, f"Tipo de transacción no válido: {value}")
+        return TYPE_NAMES[value]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API local de Mintly Tracker")
+    parser.add_argument("--db", default="mintly.db", help="Ruta de la base de datos")
+    parser.add_argument("--port", type=int, default=8765, help="Puerto (solo escucha en localhost)")
+    parser.add_argument("--pool-size", type=int, default=4, help="Conexiones compartidas con la base de datos")
+    args = parser.parse_args(argv)
+
+    controller = Mintly(Database(args.db, pool_size=args.pool_size))
+    server = ApiServer(controller, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        controller.db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Utilidades de linea de comandos de Mintly Tracker.
+
+    python -m src.cli backup --db mintly.db
+    python -m src.cli snapshots
+    python -m src.cli verify backups/mintly-20240101-120000-000000.db.gz
+    python -m src.cli restore backups/mintly-20240101-120000-000000.db.gz
+    python -m src.cli archive --keep-years 2 --vacuum
+    python -m src.cli --profile Casa backup
+    python -m src.cli profiles --start 2024-01-01
+    python -m src.cli sync /mnt/compartido/mintly.db
+"""
+import argparse
+import os
+import sys
+
+from src.models.profiles import ProfileRegistry, DEFAULT_PROFILE
+from src.models.database import Database
+from src.utils.backup import BackupManager
+from src.utils.sync import sync_databases, SYNC_BATCH
+
+
+def _backup_manager(args) -> BackupManager:
+    return BackupManager(args.database, args.dir, args.keep)
+
+
+def cmd_backup(args):
+    manager = _backup_manager(args)
+
+    def progress(remaining, total):
+        done = total - remaining
+        print(f"\r  Copiando páginas {done}/{total}", end="", flush=True)
+
+    path = manager.create_snapshot(progress)
+    print(f"\nCopia creada: {path} ({os.path.getsize(path) / 1024:,.0f} KiB)")
+    return 0
+
+
+def cmd_snapshots(args):
+    snapshots = _backup_manager(args).list_snapshots()
+    if not snapshots:
+        print("No hay copias de seguridad")
+    for path in snapshots:
+        print(f"{path}  {os.path.getsize(path) / 1024:,.0f} KiB")
+    return 0
+
+
+def cmd_verify(args):
+    manager = _backup_manager(args)
+    paths = args.paths or manager.list_snapshots()
+    failed = 0
+    for path in paths:
+        result = manager.verify(path)
+        if result['ok']:
+            print(f"OK     {path} ({result['transactions']} transacciones, esquema v{result['user_version']})")
+        else:
+            failed += 1
+            print(f"DAÑADA {path}: {result['errors'][0]}")
+    return 1 if failed else 0
+
+
+def cmd_restore(args):
+    manager = _backup_manager(args)
+    if not args.yes:
+        answer = input(f"Se sustituirá el contenido de {args.database.db_name} por {args.path}. ¿Continuar? [s/N] ")
+        if answer.strip().lower() not in ("s", "si", "sí", "y", "yes"):
+            print("Cancelado")
+            return 1
+    previous = manager.restore(args.path)
+    print(f"Restaurado desde {args.path}")
+    if previous:
+        print(f"El estado anterior se ha guardado en {previous}")
+    return 0
+
+
+def cmd_archive(args):
+    archived = args.database.archive_closed_years(args.keep_years)
+    if not archived:
+        print("No hay años cerrados que archivar")
+    for year, rows in archived.items():
+        print(f"{year}: {rows:,} movimientos archivados en {args.database.archive_path(year)}")
+    if archived and args.vacuum:
+        args.database.vacuum()
+        print("Base de datos compactada")
+    return 0
+
+
+def cmd_profiles(args):
+    summary = args.profiles.get_combined_summary(args.start, args.end)
+    rows = list(summary['profiles'].items()) + [("TOTAL", summary['total'])]
+    print(f"{'Perfil':<20} {'Ingresos':>12} {'Gastos':>12} {'Ahorros':>12} {'Balance':>12}")
+    for name, t in rows:
+        print(f"{name:<20} {t['total_income']:>12,.2f} {t['total_expense']:>12,.2f} "
+              f"{t['total_savings']:>12,.2f} {t['balance']:>12,.2f}")
+    return 0
+
+
+def cmd_sync(args):
+    if os.path.abspath(args.path) == os.path.abspath(args.database.db_name):
+        print("No se puede sincronizar una base de datos consigo misma")
+        return 1
+    if not os.path.exists(args.path):
+        print(f"No existe {args.path}")
+        return 1
+    other = Database(args.path)
+    try:
+        result = sync_databases(args.database, other, args.batch)
+    finally:
+        other.close()
+    print(f"Recibidos {result['received']:,} cambios, enviados {result['sent']:,}, "
+          f"{result['conflicts']:,} descartados por conflicto")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="Herramientas de Mintly Tracker")
+    parser.add_argument("--db", default="mintly.db", help="Ruta de la base de datos principal")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, help="Perfil sobre el que se trabaja")
+    parser.add_argument("--dir", default=None, help="Carpeta de copias (por defecto 'backups' junto a la base)")
+    parser.add_argument("--keep", type=int, default=7, help="Copias que se conservan al rotar")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("backup", help="Crea una copia comprimida y verificada").set_defaults(func=cmd_backup)
+    commands.add_parser("snapshots", help="Lista las copias existentes").set_defaults(func=cmd_snapshots)
+
+    verify = commands.add_parser("verify", help="Comprueba la integridad de las copias")
+    verify.add_argument("paths", nargs="*", help="Copias a verificar (por defecto todas)")
+    verify.set_defaults(func=cmd_verify)
+
+    restore = commands.add_parser("restore", help="Restaura una copia sobre la base de datos")
+    restore.add_argument("path")
+    restore.add_argument("-y", "--yes", action="store_true", help="No pedir confirmación")
+    restore.set_defaults(func=cmd_restore)
+
+    archive = commands.add_parser("archive", help="Mueve los años cerrados a bases de datos de archivo")
+    archive.add_argument("--keep-years", type=int, default=1, help="Años recientes que se quedan en la tabla activa")
+    archive.add_argument("--vacuum", action="store_true", help="Compactar la base de datos al terminar")
+    archive.set_defaults(func=cmd_archive)
+
+    profiles = commands.add_parser("profiles", help="Lista los perfiles con sus totales y el total conjunto")
+    profiles.add_argument("--start", default=None, help="Fecha inicial (AAAA-MM-DD)")
+    profiles.add_argument("--end", default=None, help="Fecha final (AAAA-MM-DD)")
+    profiles.set_defaults(func=cmd_profiles)
+
+    sync = commands.add_parser("sync", help="Sincroniza con otra base de datos de Mintly")
+    sync.add_argument("path", help="Ruta del otro mintly.db")
+    sync.add_argument("--batch", type=int, default=SYNC_BATCH, help="Cambios por transacción")
+    sync.set_defaults(func=cmd_sync)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.profiles = ProfileRegistry(args.db)
+    if not args.profiles.exists(args.profile):
+        print(f"No existe el perfil '{args.profile}'")
+        return 1
+    args.database = args.profiles.get(args.profile)
+    try:
+        return args.func(args)
+    finally:
+        args.profiles.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
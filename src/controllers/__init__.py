@@ -1,3 +1,6 @@
 from .mintly import Mintly
+from .goal_projection import GoalProjection, GoalProjectionService
+from .refresh_scheduler import RefreshScheduler
+from .health_history import HealthHistoryService
 
-__all__ = ['Mintly']
\ No newline at end of file
+__all__ = ['Mintly', 'GoalProjection', 'GoalProjectionService', 'RefreshScheduler', 'HealthHistoryService']
\ No newline at end of file
@@ -0,0 +1,85 @@
+from datetime import date, timedelta
+from typing import Optional
+
+DAYS_PER_MONTH = 30.44
+MIN_SPAN_DAYS = 30
+
+
+class GoalProjection:
+    def __init__(self, goal_id: int, monthly_rate: float, estimated_date: Optional[str],
+                 status: str, required_monthly: Optional[float] = None):
+        self.goal_id = goal_id
+        self.monthly_rate = monthly_rate
+        self.estimated_date = estimated_date
+        self.status = status
+        self.required_monthly = required_monthly
+
+    @property
+    def on_track(self) -> bool:
+        return self.status in ("completada", "en camino")
+
+
+class GoalProjectionService:
+    # Estima cuando se completara cada meta segun el ritmo de sus aportaciones.
+    # El resultado se guarda por meta y solo se recalcula cuando la meta cambia (nuevo aporte,
+    # objetivo o fecha limite) o cambia el dia; los recalculos van todos en una consulta agrupada.
+    def __init__(self, db):
+        self.db = db
+        self._cache = {}
+
+    @staticmethod
+    def _cache_key(goal, today: date) -> tuple:
+        return goal.current_amount, goal.target_amount, goal.deadline, today
+
+    def invalidate(self, goal_id: int = None):
+        if goal_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(goal_id, None)
+
+    def get_projections(self, goals: list, today: date = None) -> dict:
+        today = today or date.today()
+        result, stale = {}, []
+        for goal in goals:
+            cached = self._cache.get(goal.id)
+            if cached and cached[0] == self._cache_key(goal, today):
+                result[goal.id] = cached[1]
+            else:
+                stale.append(goal)
+
+        if stale:
+            stats = self.db.get_goal_contribution_stats([g.id for g in stale])
+            for goal in stale:
+                projection = self.project(goal, stats.get(goal.id), today)
+                self._cache[goal.id] = (self._cache_key(goal, today), projection)
+                result[goal.id] = projection
+        return result
+
+    @staticmethod
+    def project(goal, stats: Optional[dict], today: date) -> GoalProjection:
+        remaining = goal.target_amount - goal.current_amount
+        deadline = date.fromisoformat(goal.deadline) if goal.deadline else None
+
+        required = None
+        if deadline and remaining > 0:
+            months_left = max((deadline - today).days, 1) / DAYS_PER_MONTH
+            required = remaining / months_left
+
+        if remaining <= 0:
+            return GoalProjection(goal.id, 0.0, today.isoformat(), "completada")
+
+        if not stats or stats['total'] <= 0:
+            return GoalProjection(goal.id, 0.0, None, "sin datos", required)
+
+        first = date.fromisoformat(stats['first_date'])
+        span = max((today - first).days, MIN_SPAN_DAYS)
+        daily_rate = stats['total'] / span
+        estimated = today + timedelta(days=int(remaining / daily_rate) + 1)
+
+        if deadline is None:
+            status = "sin fecha"
+        elif estimated <= deadline:
+            status = "en camino"
+        else:
+            status = "retrasada"
+        return GoalProjection(goal.id, daily_rate * DAYS_PER_MONTH, estimated.isoformat(), status, required)
@@ -0,0 +1,79 @@
+from datetime import date
+import numpy as np
+
+# Fila de cada tipo en la matriz de totales mensuales
+TYPE_ROWS = {'ingreso': 0, 'gasto': 1, 'ahorro': 2}
+
+
+def health_scores(income, expense, savings) -> np.ndarray:
+    """Puntuacion 0-100 de cada mes a partir de sus totales (escalares o arrays). Sin ingresos: 0."""
+    income = np.asarray(income, dtype=np.float64)
+    safe = np.where(income > 0, income, 1.0)
+    savings_rate = np.asarray(savings, dtype=np.float64) / safe * 100
+    expense_rate = np.asarray(expense, dtype=np.float64) / safe * 100
+    raw = np.trunc(savings_rate * 2 + (100 - expense_rate) * 0.8)
+    return np.where(income > 0, np.clip(raw, 0, 100), 0).astype(np.int64)
+
+
+def health_level(score: int) -> dict:
+    if score >= 80:
+        return {'score': score, 'level': "Excelente", 'message': "¡Ahorro manual impecable!"}
+    elif score >= 50:
+        return {'score': score, 'level': "Bueno", 'message': "Buen control de tus aportes."}
+    else:
+        return {'score': score, 'level': "Mejorable", 'message': "Intenta mover más dinero a tus metas."}
+
+
+class HealthHistoryService:
+    # Puntuacion de salud financiera de cada mes del historico. Los meses cerrados se calculan
+    # todos a la vez desde los totales mensuales y se guardan; mientras no cambie ningun
+    # movimiento de un mes cerrado (month_changes) solo se recalcula el mes en curso.
+    def __init__(self, db):
+        self.db = db
+        self._key = None
+        self._version = 0
+        self._closed = None
+
+    def invalidate(self):
+        self._key = None
+        self._version = 0
+
+    def get_history(self, today: date = None) -> dict:
+        current = np.datetime64(today or date.today(), 'M')
+        key = (self.db.get_replica_id(), current)
+        # La version se lee antes de calcular: lo que se escriba mientras cuenta en la siguiente
+        first_changed, version = self.db.get_changed_months(self._version)
+        if version < self._version:
+            # La version ha ido hacia atras: se ha restaurado una copia anterior del libro
+            self.invalidate()
+        self._version = version
+        if key != self._key or (first_changed is not None and first_changed < str(current)):
+            self._closed = self._months(None, current - 1)
+            self._key = key
+
+        now = self._months(current, current)
+        history = {name: np.concatenate((self._closed[name], now[name])) for name in now}
+        # El historico empieza en el primer mes con movimientos
+        with_data = np.flatnonzero(history['income'] + history['expense'] + history['savings'])
+        first = with_data[0] if with_data.size else history['months'].size - 1
+        return {name: values[first:] for name, values in history.items()}
+
+    def _months(self, start, end) -> dict:
+        # start=None: desde el primer mes con movimientos
+        rows = self.db.get_monthly_type_totals(None if start is None else str(start), str(end))
+        if start is None:
+            start = np.datetime64(rows[0][0], 'M') if rows else end + 1
+        months = np.arange(start, end + 1)
+        totals = np.zeros((3, months.size))
+        if rows:
+            month_keys, types, amounts = zip(*rows)
+            offsets = (np.array(month_keys, dtype='datetime64[M]') - start).astype(np.int64)
+            np.add.at(totals, ([TYPE_ROWS[t] for t in types], offsets), amounts)
+        income, expense, savings = totals
+        return {
+            'months': months,
+            'income': income,
+            'expense': expense,
+            'savings': savings,
+            'scores': health_scores(income, expense, savings)
+        }
@@ -2,30 +2,119 @@ from datetime import datetime
 from src.models.database import Database
 from src.models.transaction import Transaction, TransactionType
 from src.models.savings_goal import SavingsGoal
+from src.models.recurring_rule import RecurringRule
+from src.models.allocation_rule import AllocationRule, AllocationMode
+from src.models.budget import Budget
+from src.models.category import Category, DEFAULT_COLOR
+from src.utils.forecast import forecast_from_db
+from src.utils.timeseries import SeriesWindow
+from src.utils.sync import sync_databases
+from src.controllers.goal_projection import GoalProjectionService
+from src.controllers.health_history import HealthHistoryService, health_level, health_scores
 
 
 class Mintly:
     # Debug finished: Solucionado los bugs en la lógica de la aplicación, he tenido problemas a la hora de la actualizacion de datos
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db=None):
+        self.db = db or Database()
+        self.projections = GoalProjectionService(self.db)
+        self.health_history = HealthHistoryService(self.db)
 
-    def create_transaction(self, t_type, amount, category, description, date):
+    def switch_database(self, db):
+        # Cambio de perfil: la ventana sigue usando el mismo controlador
+        self.db = db
+        self.projections = GoalProjectionService(db)
+        self.health_history = HealthHistoryService(db)
+
+    def transaction(self):
+        """Varias llamadas al controlador en una sola transaccion: si una falla no se aplica ninguna."""
+        return self.db.transaction()
+
+    def create_transaction(self, t_type, amount, category, description, date, goal_id=None, save_pct=None):
+        # goal_id + save_pct: ahorro puntual solo para este ingreso, ademas de las reglas guardadas
         t = Transaction(t_type, amount, category, description, date)
-        return self.db.add_transaction(t)
+        extra_rules = []
+        if goal_id is not None and save_pct:
+            extra_rules.append(AllocationRule(goal_id, AllocationMode.PERCENTAGE, save_pct))
+        return self.db.add_transaction(t, extra_rules)
+
+    def create_transactions(self, items):
+        transactions = [
+            Transaction(i['type'], i['amount'], i['category'], i.get('description', ""), i['date'])
+            for i in items
+        ]
+        return self.db.add_transactions(transactions)
+
+    def import_transactions(self, transactions, skip_duplicates=True):
+        # Devuelve (ids insertados, filas omitidas por estar ya en el libro)
+        if skip_duplicates:
+            return self.db.import_transactions(transactions)
+        return self.db.add_transactions(transactions), 0
+
+    def undo(self):
+        result = self.db.undo()
+        if result:
+            self.projections.invalidate()
+        return result
+
+    def redo(self):
+        result = self.db.redo()
+        if result:
+            self.projections.invalidate()
+        return result
+
+    def get_undo_label(self):
+        return self.db.get_undo_label()
+
+    def get_redo_label(self):
+        return self.db.get_redo_label()
+
+    def archive_closed_years(self, keep_years=1, vacuum=False):
+        archived = self.db.archive_closed_years(keep_years)
+        if archived and vacuum:
+            self.db.vacuum()
+        return archived
+
+    def get_archives(self):
+        return self.db.get_archives()
+
+    def sync_with(self, path):
+        # Sincroniza con otro mintly.db (por ejemplo en una carpeta compartida)
+        other = Database(path)
+        try:
+            result = sync_databases(self.db, other)
+        finally:
+            other.close()
+        if result['received']:
+            self.projections.invalidate()
+        return result
+
+    def find_duplicate(self, t_type, amount, category, description, date):
+        return self.db.find_duplicate(Transaction(t_type, amount, category, description, date))
+
+    def find_duplicate_groups(self):
+        return self.db.find_duplicate_groups()
+
+    def merge_duplicates(self, groups=None):
+        removed = self.db.merge_duplicates(groups)
+        if removed:
+            self.projections.invalidate()
+        return removed
 
     def add_to_savings_goal(self, goal_id, amount):
-        savings_trans = Transaction(
-            TransactionType.SAVINGS,
-            amount,
-            "💰 Ahorro",
-            "Traspaso manual a meta",
-            datetime.now().strftime("%Y-%m-%d")
-        )
-        self.db.add_transaction(savings_trans)
-
-        self.db.update_savings_goal_amount(goal_id, amount)
+        self.db.add_savings_deposit(goal_id, amount, datetime.now().strftime("%Y-%m-%d"))
+        self.projections.invalidate(goal_id)
         return True
 
+    def create_allocation_rule(self, goal_id, mode, value):
+        return self.db.add_allocation_rule(AllocationRule(goal_id, mode, value))
+
+    def get_allocation_rules(self, goal_id=None):
+        return self.db.get_allocation_rules(goal_id)
+
+    def delete_allocation_rule(self, rule_id):
+        return self.db.delete_allocation_rule(rule_id)
+
     def get_monthly_balance(self):
         today = datetime.now()
         start = today.replace(day=1).strftime("%Y-%m-%d")
@@ -50,18 +139,11 @@ class Mintly:
         if income <= 0:
             return {'score': 0, 'level': "Sin datos", 'message': "Registra ingresos para analizar"}
 
-        savings_rate = (bal['total_savings'] / income) * 100
-        expense_rate = (bal['total_expense'] / income) * 100
-
-        score = int(savings_rate * 2 + (100 - expense_rate) * 0.8)
-        score = max(0, min(100, score))
+        return health_level(int(health_scores(income, bal['total_expense'], bal['total_savings'])))
 
-        if score >= 80:
-            return {'score': score, 'level': "Excelente", 'message': "¡Ahorro manual impecable!"}
-        elif score >= 50:
-            return {'score': score, 'level': "Bueno", 'message': "Buen control de tus aportes."}
-        else:
-            return {'score': score, 'level': "Mejorable", 'message': "Intenta mover más dinero a tus metas."}
+    def get_health_history(self, today=None):
+        """Puntuacion de cada mes del historico (los ahorros de cada mes son sus aportes a metas)."""
+        return self.health_history.get_history(today)
 
     def get_transactions_by_type(self, t_type, limit=None):
         return self.db.get_transactions_by_type(t_type, limit)
@@ -69,6 +151,27 @@ class Mintly:
     def get_all_transactions(self, limit=None):
         return self.db.get_all_transactions(limit)
 
+    def search_transactions(self, query, filters=None, cursor=None, limit=50):
+        return self.db.search_transactions(query, filters, cursor, limit)
+
+    def get_transactions_columns(self, t_type=None, start=None, end=None):
+        return self.db.get_transactions_columns(t_type, start, end)
+
+    def get_transaction(self, t_id):
+        return self.db.get_transaction(t_id)
+
+    def get_transactions_page(self, limit=50, cursor=None, t_type=None):
+        return self.db.get_transactions_page(limit, cursor, t_type)
+
+    def get_balance_by_period(self, start, end):
+        return self.db.get_balance_by_period(start, end)
+
+    def get_balance_at(self, day):
+        return self.db.get_balance_at(day)
+
+    def get_balances_at(self, days):
+        return self.db.get_balances_at(days)
+
     def get_savings_by_category(self):
         return self.db.get_savings_by_category()
 
@@ -78,6 +181,38 @@ class Mintly:
     def get_income_by_category(self):
         return self.db.get_income_by_category()
 
+    def get_categories(self, t_type=None):
+        return self.db.get_categories(t_type)
+
+    def get_category_names(self, t_type=None):
+        return [c.name for c in self.db.get_categories(t_type)]
+
+    def get_category_colors(self):
+        return self.db.get_category_colors()
+
+    def create_category(self, name, t_type, color=None, parent_id=None):
+        name = (name or "").strip()
+        if not name:
+            raise ValueError("La categoría necesita un nombre")
+        return self.db.add_category(Category(name, t_type, color or DEFAULT_COLOR, parent_id=parent_id))
+
+    def update_category(self, category_id, name=None, color=None):
+        if name is not None:
+            name = name.strip()
+            if not name:
+                raise ValueError("La categoría necesita un nombre")
+        return self.db.update_category(category_id, name, color)
+
+    def move_category(self, category_id, parent_id=None):
+        return self.db.move_category(category_id, parent_id)
+
+    def get_category_path(self, category_id):
+        return self.db.get_category_path(category_id)
+
+    def get_subtree_totals(self, t_type, parent_id=None):
+        """Totales de un nivel del arbol de categorias (el primero si no se indica padre)."""
+        return self.db.get_subtree_totals(t_type, parent_id)
+
     def get_all_savings_goals(self):
         return self.db.get_all_savings_goals()
 
@@ -88,5 +223,67 @@ class Mintly:
     def delete_transaction(self, t_id):
         return self.db.delete_transaction(t_id)
 
-    def delete_savings_goal(self, g_id):
-        return self.db.delete_savings_goal(g_id)
\ No newline at end of file
+    def delete_savings_goal(self, g_id, delete_transactions=False):
+        self.projections.invalidate(g_id)
+        return self.db.delete_savings_goal(g_id, delete_transactions)
+
+    def get_goal_transactions(self, goal_id):
+        return self.db.get_goal_transactions(goal_id)
+
+    def check_goal_consistency(self, repair=False):
+        issues = self.db.check_goal_consistency()
+        if repair and issues:
+            self.db.repair_goal_amounts()
+            self.projections.invalidate()
+        return issues
+
+    def create_recurring_rule(self, t_type, amount, category, description, frequency, start_date,
+                              interval=1, end_date=None):
+        rule = RecurringRule(t_type, amount, category, description, frequency, start_date, interval, end_date)
+        return self.db.add_recurring_rule(rule)
+
+    def get_recurring_rules(self):
+        return self.db.get_recurring_rules()
+
+    def delete_recurring_rule(self, rule_id):
+        return self.db.delete_recurring_rule(rule_id)
+
+    def run_recurring_rules(self, today=None):
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        return self.db.materialize_recurring_rules(today)
+
+    def set_budget(self, category, monthly_limit, alert_pct=80.0):
+        return self.db.set_budget(Budget(category, monthly_limit, alert_pct))
+
+    def delete_budget(self, category):
+        return self.db.delete_budget(category)
+
+    def get_budget_status(self, month=None):
+        month = month or datetime.now().strftime("%Y-%m")
+        return self.db.get_budgets(month)
+
+    def get_budget_alerts(self, month=None):
+        return [b for b in self.get_budget_status(month) if b.status != "ok"]
+
+    def check_budget(self, category, month=None):
+        month = month or datetime.now().strftime("%Y-%m")
+        return self.db.get_budget(category, month)
+
+    def get_cash_flow_forecast(self, months=6):
+        return forecast_from_db(self.db, months)
+
+    def get_category_pivot(self, t_type=TransactionType.EXPENSE, months=None):
+        """Matriz mes × categoria de los ultimos `months` meses (o de todo el historico)."""
+        if not months:
+            return self.db.get_category_pivot(t_type)
+        today = datetime.now()
+        first = today.year * 12 + today.month - months
+        return self.db.get_category_pivot(t_type, f"{first // 12:04d}-{first % 12 + 1:02d}", today.strftime("%Y-%m"))
+
+    def get_series_window(self, granularity='month'):
+        # Cada vista se queda con su ventana; al cambiar los datos se pide una nueva
+        return SeriesWindow(self.db, granularity)
+
+    def get_goal_projections(self, goals=None):
+        goals = goals if goals is not None else self.get_all_savings_goals()
+        return self.projections.get_projections(goals)
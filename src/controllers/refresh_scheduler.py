@@ -0,0 +1,57 @@
+class RefreshScheduler:
+    # Coordina los refrescos de la interfaz. Cada vista se registra con su funcion de carga y
+    # una funcion que dice si se ve ahora mismo. Tras un cambio las vistas se marcan como sucias
+    # y el refresco se agrupa: todas las peticiones que llegan dentro de la ventana del
+    # temporizador acaban en una sola carga. Las vistas ocultas siguen sucias hasta que se muestran.
+    def __init__(self, start_timer=None):
+        # start_timer(): arranca el temporizador que acabara llamando a flush(). Sin el, cada
+        # peticion se refresca en el momento
+        self._start_timer = start_timer
+        self._views = {}
+        self._dirty = set()
+        self._pending = False
+        self.refresh_counts = {}
+
+    def register(self, name: str, callback, is_visible=None):
+        self._views[name] = (callback, is_visible or (lambda: True))
+        self._dirty.add(name)
+        self.refresh_counts[name] = 0
+
+    def is_dirty(self, name: str) -> bool:
+        return name in self._dirty
+
+    def mark_dirty(self, *names):
+        """Marca esas vistas (o todas si no se indica ninguna) para recargarse."""
+        self._dirty.update(names or self._views)
+
+    def request(self, *names):
+        """Marca las vistas y programa un unico refresco para todo lo que llegue mientras tanto."""
+        self.mark_dirty(*names)
+        if self._start_timer is None:
+            self.flush()
+        elif not self._pending:
+            self._pending = True
+            self._start_timer()
+
+    def flush(self):
+        """Recarga ya las vistas sucias que estan a la vista; las demas esperan a mostrarse."""
+        self._pending = False
+        for name in [n for n in self._views if n in self._dirty]:
+            self._refresh(name)
+
+    def view_shown(self, *names):
+        # Al cambiar de pestaña: solo se recarga lo que haya cambiado desde la ultima vez
+        for name in names:
+            if name in self._dirty:
+                self._refresh(name)
+
+    def _refresh(self, name: str):
+        callback, is_visible = self._views[name]
+        if not is_visible():
+            return
+        self._dirty.discard(name)
+        self.refresh_counts[name] += 1
+        try:
+            callback()
+        except Exception as e:
+            print(f"Error refrescando {name}: {e}")
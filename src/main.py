@@ -2,6 +2,7 @@ import sys
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QFont
 from src.views.main_window import MainWindow
+from src.utils.theme import apply_theme
 
 
 def main():
@@ -17,6 +18,7 @@ def main():
     app.setFont(font)
 
     app.setStyle("Fusion")
+    apply_theme(app)
 
     app.setApplicationName("Mintly Tracker")
     app.setOrganizationName("Iván Mayoral Capel")
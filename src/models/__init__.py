@@ -1,5 +1,11 @@
 from .database import Database
-from .transaction import Transaction, TransactionType
+from .transaction import Transaction, TransactionType, TransactionColumns
 from .savings_goal import SavingsGoal
+from .recurring_rule import RecurringRule, Frequency
+from .allocation_rule import AllocationRule, AllocationMode
+from .budget import Budget
+from .category_pivot import CategoryPivot
+from .profiles import ProfileRegistry, DEFAULT_PROFILE
 
-__all__ = ['Database', 'Transaction', 'TransactionType', 'SavingsGoal']
\ No newline at end of file
+__all__ = ['Database', 'Transaction', 'TransactionType', 'TransactionColumns', 'SavingsGoal', 'RecurringRule', 'Frequency',
+           'AllocationRule', 'AllocationMode', 'Budget', 'CategoryPivot', 'ProfileRegistry', 'DEFAULT_PROFILE']
\ No newline at end of file
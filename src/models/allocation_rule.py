@@ -0,0 +1,23 @@
+from enum import Enum
+from typing import Optional
+
+
+class AllocationMode(Enum):
+    PERCENTAGE = "porcentaje"
+    FIXED = "fijo"
+
+
+class AllocationRule:
+    # Parte de cada ingreso que se aparta automaticamente para una meta de ahorro
+    def __init__(self, goal_id: int, mode: AllocationMode, value: float,
+                 active: bool = True, rule_id: Optional[int] = None):
+        self.id = rule_id
+        self.goal_id = goal_id
+        self.mode = mode
+        self.value = float(value)
+        self.active = active
+
+    def amount_for(self, income: float) -> float:
+        if self.mode == AllocationMode.PERCENTAGE:
+            return round(income * self.value / 100, 2)
+        return round(self.value, 2)
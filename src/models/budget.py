@@ -0,0 +1,25 @@
+class Budget:
+    # Limite mensual de gasto por categoria. `spent` viene de los totales mensuales ya calculados
+    def __init__(self, category: str, monthly_limit: float, alert_pct: float = 80.0, spent: float = 0.0):
+        self.category = category
+        self.monthly_limit = float(monthly_limit)
+        self.alert_pct = float(alert_pct)
+        self.spent = float(spent)
+
+    @property
+    def used_percentage(self) -> float:
+        if self.monthly_limit <= 0:
+            return 100.0 if self.spent > 0 else 0.0
+        return (self.spent / self.monthly_limit) * 100
+
+    @property
+    def remaining(self) -> float:
+        return self.monthly_limit - self.spent
+
+    @property
+    def status(self) -> str:
+        if self.spent > self.monthly_limit:
+            return "superado"
+        if self.used_percentage >= self.alert_pct:
+            return "aviso"
+        return "ok"
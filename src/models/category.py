@@ -0,0 +1,44 @@
+from typing import Optional
+
+from src.models.transaction import TransactionType, SAVINGS_CATEGORY
+
+DEFAULT_COLOR = "#6B7280"
+
+# Catalogo con el que empieza cada libro: (nombre, tipo, color)
+DEFAULT_CATEGORIES = (
+    ("💼 Salario", TransactionType.INCOME, "#10B981"),
+    ("📈 Inversiones", TransactionType.INCOME, "#3B82F6"),
+    ("🎁 Regalos", TransactionType.INCOME, "#F59E0B"),
+    ("💰 Otros", TransactionType.INCOME, DEFAULT_COLOR),
+    ("🏠 Vivienda", TransactionType.EXPENSE, "#EF4444"),
+    ("🛒 Alimentación", TransactionType.EXPENSE, "#F59E0B"),
+    ("🚌 Transporte", TransactionType.EXPENSE, "#3B82F6"),
+    ("🎬 Ocio", TransactionType.EXPENSE, "#8B5CF6"),
+    ("🏥 Salud", TransactionType.EXPENSE, "#10B981"),
+    ("🛍️ Compras", TransactionType.EXPENSE, "#EC4899"),
+    ("❓ Otros", TransactionType.EXPENSE, DEFAULT_COLOR),
+    (SAVINGS_CATEGORY, TransactionType.SAVINGS, "#8E44AD"),
+)
+
+
+def category_icon(name: str) -> Optional[str]:
+    """Emoji con el que empieza el nombre ("🛒 Alimentación" -> "🛒"), o None si no lleva."""
+    head = (name or "").strip().split(" ", 1)[0]
+    if head and not any(ch.isalnum() for ch in head):
+        return head
+    return None
+
+
+class Category:
+    # Categoria de movimientos. `name` es la etiqueta completa que se ve y se exporta; los
+    # movimientos la referencian por id, asi que renombrarla no toca sus filas. `parent_id` la
+    # cuelga de otra del mismo tipo (None en las de primer nivel)
+    def __init__(self, name: str, category_type: TransactionType, color: str = DEFAULT_COLOR,
+                 icon: Optional[str] = None, category_id: Optional[int] = None,
+                 parent_id: Optional[int] = None):
+        self.id = category_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category_type = category_type
+        self.color = color
+        self.icon = icon if icon is not None else category_icon(name)
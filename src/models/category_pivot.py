@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class CategoryPivot:
+    """
+    Matriz mes × categoria: values[i, j] es el total del mes months[i] en categories[j]. Los
+    meses sin movimientos del rango tambien tienen su fila (a cero) para poder compararlos.
+    """
+    __slots__ = ('months', 'categories', 'values')
+
+    def __init__(self, months: np.ndarray, categories: list, values: np.ndarray):
+        self.months = months
+        self.categories = categories
+        self.values = values
+
+    @classmethod
+    def from_rows(cls, rows: list, start_month: str, end_month: str) -> "CategoryPivot":
+        # rows: (mes 'AAAA-MM', categoria, total), ya agrupadas por SQLite
+        months = np.arange(np.datetime64(start_month, 'M'), np.datetime64(end_month, 'M') + 1)
+        if not rows:
+            return cls(months, [], np.zeros((months.size, 0)))
+
+        month_keys, categories, totals = zip(*rows)
+        index = {}
+        columns = np.fromiter((index.setdefault(c, len(index)) for c in categories), dtype=np.int64, count=len(rows))
+        offsets = (np.array(month_keys, dtype='datetime64[M]') - months[0]).astype(np.int64)
+        values = np.zeros((months.size, len(index)))
+        np.add.at(values, (offsets, columns), np.array(totals, dtype=np.float64))
+
+        # Categorias de mayor a menor total en el rango
+        order = np.argsort(-values.sum(axis=0), kind='stable')
+        names = list(index)
+        return cls(months, [names[i] for i in order], values[:, order])
+
+    def __len__(self):
+        return self.months.size
+
+    def month_labels(self) -> list:
+        return [str(m) for m in self.months]
+
+    def totals_by_month(self) -> np.ndarray:
+        return self.values.sum(axis=1)
+
+    def totals_by_category(self) -> np.ndarray:
+        return self.values.sum(axis=0)
+
+    def deltas(self, lag: int = 1) -> tuple:
+        """
+        Diferencia de cada celda con la de `lag` meses antes (1: mes anterior, 12: mismo mes
+        del año anterior), en importe y en porcentaje. Sin periodo previo (o con 0) queda NaN.
+        """
+        previous = np.full_like(self.values, np.nan)
+        if lag < len(self):
+            previous[lag:] = self.values[:-lag]
+        diff = self.values - previous
+        pct = np.divide(diff, previous, out=np.full_like(diff, np.nan), where=previous != 0) * 100
+        return diff, pct
@@ -0,0 +1,82 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    # Antes cada consulta abria una conexion nueva y nunca la cerraba. Ahora las conexiones
+    # se reutilizan y se pueden compartir entre hilos (servidor API, tareas en segundo plano...)
+    def __init__(self, db_name: str, size: int = 4, timeout: float = 5.0):
+        self.db_name = db_name
+        # Cada conexion a ':memory:' es una base de datos distinta, asi que solo puede haber una
+        self.size = 1 if db_name == ":memory:" else max(1, size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._all = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_name, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.db_name != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("El pool de conexiones está cerrado")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._all) < self.size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("No hay conexiones libres en el pool") from None
+
+    def release(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Presta una conexion dentro de una transaccion (commit al salir, rollback si hay error).
+        Si el hilo ya tiene una conexion prestada se reutiliza, de modo que las llamadas
+        anidadas forman parte de la misma transaccion.
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+
+        conn = self.acquire()
+        self._local.conn = conn
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.conn = None
+            self.release(conn)
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
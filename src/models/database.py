@@ -1,30 +1,258 @@
+import json
+import os
+import re
 import sqlite3
-from src.models.transaction import Transaction, TransactionType
+from contextlib import contextmanager
+from datetime import date
+from src.models.connection_pool import ConnectionPool
+from src.models.migrations import run_migrations
+from src.models.recurring_rule import RecurringRule, Frequency
+from src.models.allocation_rule import AllocationRule, AllocationMode
+from src.models.budget import Budget
+from src.models.transaction import (Transaction, TransactionType, TransactionColumns, SAVINGS_CATEGORY, content_hash,
+                                    day_number, iso_date, month_day_range)
 from src.models.savings_goal import SavingsGoal
+from src.models.category_pivot import CategoryPivot
+from src.models.category import Category, DEFAULT_COLOR, category_icon
+
+
+TYPE_TO_DB = {
+    TransactionType.INCOME: 'ingreso',
+    TransactionType.EXPENSE: 'gasto',
+    TransactionType.SAVINGS: 'ahorro',
+    'INCOME': 'ingreso',
+    'EXPENSE': 'gasto',
+    'SAVINGS': 'ahorro',
+    'ingreso': 'ingreso',
+    'gasto': 'gasto',
+    'ahorro': 'ahorro'
+}
+
+TYPE_FROM_DB = {
+    'ingreso': TransactionType.INCOME,
+    'gasto': TransactionType.EXPENSE,
+    'ahorro': TransactionType.SAVINGS
+}
+
+# Columnas tal cual se guardan (la fecha como dia juliano) y tal cual se leen ('AAAA-MM-DD')
+STORED_COLUMNS = "id, type, amount, category, description, date, goal_id"
+
+
+def select_columns(alias: str = "") -> str:
+    return f"{alias}id, {alias}type, {alias}amount, {alias}category, {alias}description, " \
+           f"date({alias}date) AS date, {alias}goal_id"
+
+
+COLUMNS = select_columns()
+
+# Vista de transactions con el nombre de la categoria (la tabla solo guarda su id). Los
+# ficheros de archivo guardan el nombre y se leen directamente
+ROWS = "transaction_rows"
+
+INSERT_TRANSACTION = """
+    INSERT INTO transactions (type, amount, category_id, description, date, goal_id, content_hash)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Cuantas huellas se consultan por sentencia al deduplicar un lote (limite de parametros de SQLite)
+HASH_CHUNK = 500
+
+# Pasos de deshacer que se conservan; los mas antiguos se compactan (se borran del diario)
+JOURNAL_MAX_STEPS = 200
+JOURNALED_TABLES = ('transactions', 'savings_goals', 'allocation_rules')
+# Columnas que se acumulan (current_amount = current_amount + ?) tambien fuera de un paso, por
+# ejemplo al generar reglas repetitivas o sincronizar: deshacer resta lo que sumo el paso
+JOURNAL_DELTA_COLUMNS = {'savings_goals': ('current_amount',)}
+
+# Esquema de cada base de datos de archivo (un año cerrado, solo se añaden filas)
+ARCHIVE_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS transactions (
+        id INTEGER PRIMARY KEY,
+        type TEXT NOT NULL,
+        amount REAL NOT NULL,
+        category TEXT NOT NULL,
+        description TEXT,
+        date INTEGER NOT NULL,
+        goal_id INTEGER,
+        content_hash INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_transactions_date_id ON transactions (date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_type_date_id ON transactions (type, date, id)",
+    "CREATE INDEX IF NOT EXISTS idx_transactions_content_hash ON transactions (content_hash)",
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5 (
+        description, category,
+        content = 'transactions', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_fts_insert AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO transactions_fts (rowid, description, category)
+        VALUES (NEW.id, NEW.description, NEW.category);
+    END
+    """,
+)
+# SQLite admite 10 bases adjuntas por conexion; se deja margen
+MAX_ATTACHED = 8
+
+# Tablas que se sincronizan, en el orden en que se aplican (las metas antes que sus aportes)
+SYNCED_TABLES = ('savings_goals', 'transactions')
+# Columnas que viajan en cada cambio; las referencias a metas van por uid, no por id local
+SYNC_COLUMNS = {
+    'savings_goals': ('name', 'target_amount', 'current_amount', 'initial_amount', 'deadline', 'description'),
+    'transactions': ('type', 'amount', 'category', 'description', 'date', 'goal_uid'),
+}
+
+# Peso de cada columna del indice de texto en el ranking (descripcion, categoria)
+SEARCH_WEIGHTS = (2.0, 1.0)
+
+# Primer dia de cada periodo de las series temporales (las semanas empiezan en lunes)
+PERIOD_BUCKETS = {
+    'day': "date(date)",
+    'week': "date(date - (CAST(strftime('%w', date) AS INTEGER) + 6) % 7)",
+    'month': "strftime('%Y-%m-01', date)",
+}
 
 
 class Database:
     # No ha sido nada facil trabajar con esto la verdad, me ha dado muchos problemas pero finalmente la aplicación para la version en la que esta
     # está totalmente funcional.
-    _instance = None
-
-    def __new__(cls, db_name="mintly.db"):
-        if cls._instance is None:
-            cls._instance = super(Database, cls).__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-
-    def __init__(self, db_name="mintly.db"):
-        if self._initialized:
-            return
+    # Ya no es un singleton: cada perfil tiene su propia instancia y su pool (ver ProfileRegistry)
+    def __init__(self, db_name="mintly.db", pool_size=4):
         self.db_name = db_name
-        self._initialized = True
+        self.journal_max_steps = JOURNAL_MAX_STEPS
+        self.pool = ConnectionPool(db_name, pool_size)
+        self._categories = None
         self._create_tables()
 
     def _get_connection(self):
-        conn = sqlite3.connect(self.db_name)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return self.pool.connection()
+
+    def transaction(self):
+        """Agrupa varias operaciones de la base de datos en una sola transaccion."""
+        return self.pool.connection()
+
+    def close(self):
+        self.pool.close()
+
+    @contextmanager
+    def journal_step(self, label: str):
+        """
+        Abre un paso del diario de deshacer: los triggers apuntan en change_journal cada fila que
+        se escriba dentro, en la misma transaccion. Si ya hay un paso abierto (llamadas anidadas)
+        todo queda en el mismo paso.
+        """
+        with self._get_connection() as conn:
+            if conn.execute("SELECT step FROM journal_state").fetchone()[0] is not None:
+                yield conn
+                return
+
+            # Una accion nueva hace que ya no se pueda rehacer lo deshecho
+            conn.execute("DELETE FROM journal_steps WHERE undone = 1")
+            step = conn.execute("INSERT INTO journal_steps (label) VALUES (?)", (label,)).lastrowid
+            conn.execute("UPDATE journal_state SET step = ?", (step,))
+            try:
+                yield conn
+            finally:
+                conn.execute("UPDATE journal_state SET step = NULL")
+
+            if conn.execute("SELECT 1 FROM change_journal WHERE step = ? LIMIT 1", (step,)).fetchone() is None:
+                conn.execute("DELETE FROM journal_steps WHERE id = ?", (step,))
+            else:
+                self._compact_journal(conn)
+
+    def _compact_journal(self, conn):
+        # Los pasos mas antiguos salen del diario; sus filas se borran en cascada por el indice (step, id)
+        conn.execute("""
+            DELETE FROM journal_steps
+            WHERE id <= (SELECT id FROM journal_steps ORDER BY id DESC LIMIT 1 OFFSET ?)
+        """, (self.journal_max_steps,))
+
+    def undo(self):
+        """
+        Deshace el ultimo paso aplicando las operaciones inversas en orden contrario. Solo se leen
+        las filas de ese paso, no el libro. Las actualizaciones solo tocan las columnas que cambio
+        el paso, y las acumuladas se corrigen por diferencia, asi que no se pisa lo escrito despues
+        fuera del diario. Devuelve {'label', 'tables'} o None si no hay nada.
+        """
+        return self._replay(undo=True)
+
+    def redo(self):
+        return self._replay(undo=False)
+
+    def get_undo_label(self):
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT label FROM journal_steps WHERE undone = 0 ORDER BY id DESC LIMIT 1").fetchone()
+            return row['label'] if row else None
+
+    def get_redo_label(self):
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT label FROM journal_steps WHERE undone = 1 ORDER BY id LIMIT 1").fetchone()
+            return row['label'] if row else None
+
+    def _replay(self, undo: bool):
+        with self._get_connection() as conn:
+            if undo:
+                step = conn.execute(
+                    "SELECT id, label FROM journal_steps WHERE undone = 0 ORDER BY id DESC LIMIT 1").fetchone()
+            else:
+                step = conn.execute("SELECT id, label FROM journal_steps WHERE undone = 1 ORDER BY id LIMIT 1").fetchone()
+            if step is None:
+                return None
+
+            entries = conn.execute(
+                f"SELECT tbl, op, old_data, new_data FROM change_journal WHERE step = ? "
+                f"ORDER BY id {'DESC' if undo else 'ASC'}", (step['id'],)
+            ).fetchall()
+            tables = set()
+            for e in entries:
+                if e['tbl'] not in JOURNALED_TABLES:
+                    continue
+                tables.add(e['tbl'])
+                if e['op'] == 'update':
+                    old, new = json.loads(e['old_data']), json.loads(e['new_data'])
+                    self._apply_row(conn, e['tbl'], 'update', old if undo else new, new if undo else old)
+                elif undo:
+                    inverse = {'insert': 'delete', 'delete': 'insert'}[e['op']]
+                    data = e['new_data'] if e['op'] == 'insert' else e['old_data']
+                    self._apply_row(conn, e['tbl'], inverse, json.loads(data))
+                else:
+                    data = e['old_data'] if e['op'] == 'delete' else e['new_data']
+                    self._apply_row(conn, e['tbl'], e['op'], json.loads(data))
+
+            conn.execute("UPDATE journal_steps SET undone = ? WHERE id = ?", (1 if undo else 0, step['id']))
+            return {'label': step['label'], 'tables': tables}
+
+    @staticmethod
+    def _apply_row(conn, table: str, op: str, row: dict, previous: dict = None):
+        # En 'update', `previous` es la imagen de la que se parte: solo se escribe lo que cambia
+        if op == 'delete':
+            conn.execute(f"DELETE FROM {table} WHERE id = ?", (row['id'],))
+        elif op == 'insert':
+            columns = list(row)
+            conn.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [row[c] for c in columns]
+            )
+        else:
+            deltas = JOURNAL_DELTA_COLUMNS.get(table, ())
+            columns = [c for c in row if c != 'id' and row[c] != previous[c]]
+            if not columns:
+                return
+            conn.execute(
+                f"UPDATE {table} SET {', '.join(f'{c} = {c} + ?' if c in deltas else f'{c} = ?' for c in columns)} "
+                f"WHERE id = ?",
+                [(row[c] or 0) - (previous[c] or 0) if c in deltas else row[c] for c in columns] + [row['id']]
+            )
+
+    def ensure_schema(self):
+        # Crea lo que falte y aplica las migraciones pendientes (por ejemplo tras restaurar una copia)
+        self._categories = None
+        self._create_tables()
 
     def _create_tables(self):
         with self._get_connection() as conn:
@@ -82,66 +310,383 @@ class Database:
                          )
                          """)
 
-    def _get_type_string(self, t_type):
-        mapping = {
-            TransactionType.INCOME: 'ingreso',
-            TransactionType.EXPENSE: 'gasto',
-            TransactionType.SAVINGS: 'ahorro',
-            'INCOME': 'ingreso',
-            'EXPENSE': 'gasto',
-            'SAVINGS': 'ahorro',
-            'ingreso': 'ingreso',
-            'gasto': 'gasto',
-            'ahorro': 'ahorro'
-        }
-        return mapping.get(t_type, 'gasto')
+            # Indices para la paginacion por cursor (fecha, id) de los listados
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date_id ON transactions (date, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_type_date_id ON transactions (type, date, id)")
+
+            run_migrations(conn)
 
-    def add_transaction(self, t: Transaction) -> int:
-        tipo_db = self._get_type_string(t.transaction_type)
+    @staticmethod
+    def _get_type_string(t_type):
+        return TYPE_TO_DB.get(t_type, 'gasto')
+
+    def add_transaction(self, t: Transaction, extra_rules: list = None) -> int:
+        return self.add_transactions([t], extra_rules)[0]
+
+    def add_transactions(self, transactions: list, extra_rules: list = None) -> list:
+        """
+        Inserta varias transacciones en una sola transaccion. Los ingresos pasan por las reglas
+        de ahorro automatico (y por `extra_rules`, reglas puntuales solo para este lote).
+        """
+        ids, incomes = [], []
+        label = "Añadir movimiento" if len(transactions) == 1 else f"Añadir {len(transactions)} movimientos"
+        with self.journal_step(label) as conn:
+            category_ids = self._resolve_categories(
+                conn, [(t.category, self._get_type_string(t.transaction_type)) for t in transactions])
+            for t in transactions:
+                tipo_db = self._get_type_string(t.transaction_type)
+                cursor = conn.execute(INSERT_TRANSACTION, (
+                    tipo_db, t.amount, category_ids[t.category], t.description, day_number(t.date), t.goal_id,
+                    content_hash(t.date, t.amount, t.category, t.description)
+                ))
+                ids.append(cursor.lastrowid)
+                if tipo_db == 'ingreso':
+                    incomes.append((t.amount, t.date))
+            self._allocate_savings(conn, incomes, extra_rules)
+        return ids
+
+    def import_transactions(self, transactions: list, extra_rules: list = None) -> tuple:
+        """
+        Como add_transactions pero sin volver a meter lo que ya esta en el libro. Las huellas del
+        lote se comprueban con unas pocas consultas agrupadas (no una por fila) y se respeta la
+        multiplicidad: si el libro tiene un cafe de 2€ ese dia y el extracto trae dos, entra uno.
+        Devuelve (ids_insertados, omitidas).
+        """
+        hashes = [content_hash(t.date, t.amount, t.category, t.description) for t in transactions]
+        existing = self._count_hashes(hashes, {int(str(t.date)[:4]) for t in transactions})
+        new = []
+        for t, h in zip(transactions, hashes):
+            if existing.get(h, 0) > 0:
+                existing[h] -= 1
+            else:
+                new.append(t)
+        with self.journal_step("Importar movimientos"):
+            ids = self.add_transactions(new, extra_rules)
+        return ids, len(transactions) - len(new)
+
+    def _count_hashes(self, hashes: list, years: set) -> dict:
+        # Cuantas filas hay ya con cada huella, en la tabla activa y en los años archivados del lote
+        existing = {}
+        unique = list(set(hashes))
+        with self._get_connection() as conn:
+            archived = sorted(years & set(self._archive_years(conn)))
+            passes = [None] + [archived[i:i + MAX_ATTACHED] for i in range(0, len(archived), MAX_ATTACHED)]
+            for chunk_years in passes:
+                if chunk_years is None:
+                    group = ["transactions"]
+                else:
+                    group = [f"{a}.transactions" for a in self._attach_archives(conn, chunk_years)]
+                for i in range(0, len(unique), HASH_CHUNK):
+                    chunk = unique[i:i + HASH_CHUNK]
+                    placeholders = ", ".join("?" * len(chunk))
+                    for source in group:
+                        for r in conn.execute(
+                                f"SELECT content_hash, COUNT(*) FROM {source} "
+                                f"WHERE content_hash IN ({placeholders}) GROUP BY content_hash", chunk):
+                            existing[r[0]] = existing.get(r[0], 0) + r[1]
+        return existing
+
+    def find_duplicate(self, t: Transaction):
+        """
+        Id de un movimiento con el mismo contenido, o None. Es una busqueda por indice, en la tabla
+        activa y, si la fecha es de un año archivado, en su archivo (como import_transactions).
+        """
+        params = (content_hash(t.date, t.amount, t.category, t.description),
+                  self._get_type_string(t.transaction_type))
+        year = int(str(t.date)[:4])
+        with self._get_connection() as conn:
+            sources = ["transactions"]
+            if year in self._archive_years(conn):
+                sources.append(f"{self._attach_archives(conn, [year])[0]}.transactions")
+            for source in sources:
+                row = conn.execute(
+                    f"SELECT id FROM {source} WHERE content_hash = ? AND type = ? LIMIT 1", params
+                ).fetchone()
+                if row:
+                    return row['id']
+            return None
 
+    def find_duplicate_groups(self) -> list:
+        """
+        Grupos de movimientos repetidos (misma huella, tipo y meta), cada uno como lista de ids
+        ordenada. Se agrupa sobre el indice de la huella, sin comparar filas entre si.
+        """
         query = """
-                INSERT INTO transactions (type, amount, category, description, date)
-                VALUES (?, ?, ?, ?, ?) \
+                SELECT GROUP_CONCAT(id) AS ids
+                FROM transactions
+                WHERE content_hash IS NOT NULL
+                GROUP BY content_hash, type, goal_id
+                HAVING COUNT(*) > 1 \
                 """
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                query,
-                (tipo_db, t.amount, t.category, t.description, t.date)
-            )
-            return cursor.lastrowid
+            groups = [sorted(int(i) for i in r['ids'].split(",")) for r in conn.execute(query).fetchall()]
+        return sorted(groups)
 
-    def delete_transaction(self, t_id: int) -> bool:
+    def merge_duplicates(self, groups: list = None) -> int:
+        """
+        Deja el movimiento mas antiguo de cada grupo y borra el resto en una sola transaccion.
+        Si los repetidos estaban enlazados a una meta, su saldo se descuenta para que siga
+        cuadrando con el libro. Devuelve cuantas filas se han borrado.
+        """
+        if groups is None:
+            groups = self.find_duplicate_groups()
+        extra = [t_id for group in groups for t_id in sorted(group)[1:]]
+        if not extra:
+            return 0
+
+        with self.journal_step("Fusionar duplicados") as conn:
+            removed = 0
+            for i in range(0, len(extra), HASH_CHUNK):
+                chunk = extra[i:i + HASH_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                goal_totals = conn.execute(
+                    f"SELECT goal_id, SUM(amount) AS total FROM transactions "
+                    f"WHERE id IN ({placeholders}) AND goal_id IS NOT NULL GROUP BY goal_id", chunk
+                ).fetchall()
+                conn.executemany(
+                    "UPDATE savings_goals SET current_amount = current_amount - ? WHERE id = ?",
+                    [(r['total'], r['goal_id']) for r in goal_totals]
+                )
+                removed += conn.execute(f"DELETE FROM transactions WHERE id IN ({placeholders})", chunk).rowcount
+            return removed
+
+    def _allocate_savings(self, conn, incomes: list, extra_rules: list = None):
+        """
+        Aplica las reglas de ahorro a los ingresos (monto, fecha) dentro de la transaccion en curso:
+        todas las transacciones de ahorro se insertan de golpe y cada meta se actualiza una sola vez.
+        Nunca se aparta mas de lo que queda del ingreso ni mas de lo que le falta a la meta.
+        """
+        if not incomes:
+            return
+        rules = [self._row_to_allocation_rule(r) for r in
+                 conn.execute("SELECT * FROM allocation_rules WHERE active = 1 ORDER BY id").fetchall()]
+        rules.extend(extra_rules or [])
+        if not rules:
+            return
+
+        goal_ids = {rule.goal_id for rule in rules}
+        placeholders = ", ".join("?" * len(goal_ids))
+        goals = {
+            r['id']: {'name': r['name'], 'missing': r['target_amount'] - r['current_amount'],
+                      'capped': r['target_amount'] > 0, 'added': 0.0}
+            for r in conn.execute(
+                f"SELECT id, name, target_amount, current_amount FROM savings_goals WHERE id IN ({placeholders})",
+                list(goal_ids)
+            ).fetchall()
+        }
+
+        savings = []
+        savings_category = self._resolve_categories(conn, [(SAVINGS_CATEGORY, 'ahorro')])[SAVINGS_CATEGORY]
+        for amount, date in incomes:
+            remaining = amount
+            for rule in rules:
+                goal = goals.get(rule.goal_id)
+                if goal is None:
+                    continue
+                value = min(rule.amount_for(amount), remaining)
+                if goal['capped']:
+                    value = min(value, goal['missing'] - goal['added'])
+                value = round(value, 2)
+                if value <= 0:
+                    continue
+                remaining -= value
+                goal['added'] += value
+                description = f"Auto-ahorro: {goal['name']}"
+                savings.append((
+                    'ahorro', value, savings_category, description, day_number(date), rule.goal_id,
+                    content_hash(date, value, SAVINGS_CATEGORY, description)
+                ))
+
+        conn.executemany(INSERT_TRANSACTION, savings)
+        conn.executemany(
+            "UPDATE savings_goals SET current_amount = current_amount + ? WHERE id = ?",
+            [(g['added'], g_id) for g_id, g in goals.items() if g['added'] > 0]
+        )
+
+    def get_transaction(self, t_id: int):
         with self._get_connection() as conn:
+            row = conn.execute(f"SELECT {COLUMNS} FROM {ROWS} WHERE id = ?", (t_id,)).fetchone()
+            # Puede ser de un año archivado (los ids se conservan al archivar)
+            years = self._archive_years(conn) if row is None else []
+            for i in range(0, len(years), MAX_ATTACHED):
+                aliases = self._attach_archives(conn, years[i:i + MAX_ATTACHED])
+                union = " UNION ALL ".join(f"SELECT {COLUMNS} FROM {a}.transactions WHERE id = ?" for a in aliases)
+                row = conn.execute(union, [t_id] * len(aliases)).fetchone()
+                if row:
+                    break
+            return self._row_to_transaction(row) if row else None
+
+    def delete_transaction(self, t_id: int) -> bool:
+        with self.journal_step("Borrar movimiento") as conn:
             conn.execute("DELETE FROM transactions WHERE id = ?", (t_id,))
             return True
 
     def get_all_transactions(self, limit: int = None) -> list:
-        query = "SELECT * FROM transactions ORDER BY date DESC, id DESC"
-        if limit:
-            query += f" LIMIT {limit}"
-        with self._get_connection() as conn:
-            rows = conn.execute(query).fetchall()
-            return [self._row_to_transaction(r) for r in rows]
+        return [self._row_to_transaction(r) for r in self._select_transactions([], [], limit)]
 
     def get_transactions_by_type(self, t_type, limit: int = None) -> list:
-        tipo_db = self._get_type_string(t_type)
-        query = "SELECT * FROM transactions WHERE type = ? ORDER BY date DESC, id DESC"
-        if limit:
-            query += f" LIMIT {limit}"
+        rows = self._select_transactions(["type = ?"], [self._get_type_string(t_type)], limit)
+        return [self._row_to_transaction(r) for r in rows]
+
+    def _select_transactions(self, conditions: list, params: list, limit: int = None,
+                             start: str = None, end: str = None) -> list:
+        """
+        Filas ordenadas por (fecha, id) descendente de la tabla activa y, solo si hace falta, de los
+        años archivados: los que caen en [start, end] y, si la tabla activa ya llena el limite,
+        unicamente los que no son mas antiguos que la ultima fila devuelta.
+        """
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        limit_sql = " LIMIT ?" if limit else ""
+        tail = " ORDER BY date DESC, id DESC" + limit_sql
+        tail_params = [int(limit)] if limit else []
+
         with self._get_connection() as conn:
-            rows = conn.execute(query, (tipo_db,)).fetchall()
-            return [self._row_to_transaction(r) for r in rows]
+            # Se ordena por la columna guardada (indice por fecha), no por la fecha ya convertida
+            rows = conn.execute(
+                f"SELECT {COLUMNS} FROM {ROWS}{where} "
+                f"ORDER BY {ROWS}.date DESC, {ROWS}.id DESC{limit_sql}", params + tail_params
+            ).fetchall()
+            years = self._archive_years(conn, start, end)
+            if limit and len(rows) >= limit:
+                oldest = int(rows[-1]['date'][:4])
+                years = [y for y in years if y >= oldest]
+            if not years:
+                return rows
+
+            for i in range(0, len(years), MAX_ATTACHED):
+                aliases = self._attach_archives(conn, years[i:i + MAX_ATTACHED])
+                union = " UNION ALL ".join(f"SELECT {COLUMNS} FROM {a}.transactions{where}" for a in aliases)
+                rows += conn.execute(f"SELECT * FROM ({union}){tail}", params * len(aliases) + tail_params).fetchall()
+
+        rows.sort(key=lambda r: (r['date'], r['id']), reverse=True)
+        return rows[:limit] if limit else rows
+
+    def get_transactions_page(self, limit: int = 50, cursor: str = None, t_type=None) -> tuple:
+        """
+        Paginacion por cursor (keyset): en lugar de OFFSET se continua desde la ultima
+        (fecha, id) devuelta, asi cada pagina cuesta lo mismo sin importar lo profunda que sea.
+        Devuelve (transacciones, cursor_siguiente) y el cursor es None en la ultima pagina.
+        """
+        conditions, params, end = [], [], None
+        if t_type is not None:
+            conditions.append("type = ?")
+            params.append(self._get_type_string(t_type))
+        if cursor:
+            last_date, last_id = self.decode_cursor(cursor)
+            day = day_number(last_date)
+            conditions.append("(date < ? OR (date = ? AND id < ?))")
+            params.extend([day, day, last_id])
+            end = last_date
+
+        rows = self._select_transactions(conditions, params, int(limit) + 1, end=end)
+
+        page = [self._row_to_transaction(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and page:
+            next_cursor = self.encode_cursor(page[-1].date, page[-1].id)
+        return page, next_cursor
+
+    @staticmethod
+    def encode_cursor(date: str, t_id: int) -> str:
+        return f"{date}_{t_id}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple:
+        try:
+            date, t_id = cursor.rsplit("_", 1)
+            return date, int(t_id)
+        except ValueError:
+            raise ValueError(f"Cursor no válido: {cursor}") from None
+
+    @staticmethod
+    def _fts_query(text: str) -> str:
+        # Cada palabra se busca como prefijo ("caf" encuentra "café") y todas deben aparecer.
+        # Se citan para que comillas, guiones u operadores de FTS5 del usuario no rompan la consulta
+        words = re.findall(r"\w+", text or "")
+        return " ".join(f'"{w}"*' for w in words)
+
+    def search_transactions(self, query: str, filters: dict = None, cursor: str = None,
+                            limit: int = 50) -> tuple:
+        """
+        Busqueda de texto completo en descripcion y categoria, ordenada por relevancia (bm25).
+        filters admite 't_type', 'category', 'start' y 'end'. Pagina igual que
+        get_transactions_page: devuelve (transacciones, cursor_siguiente).
+        """
+        match = self._fts_query(query)
+        if not match:
+            return [], None
+
+        filters = filters or {}
+        conditions, params = ["transactions_fts MATCH ?"], [match]
+        if filters.get('t_type') is not None:
+            conditions.append("t.type = ?")
+            params.append(self._get_type_string(filters['t_type']))
+        if filters.get('category'):
+            conditions.append("t.category = ?")
+            params.append(filters['category'])
+        if filters.get('start'):
+            conditions.append("t.date >= ?")
+            params.append(day_number(filters['start']))
+        if filters.get('end'):
+            conditions.append("t.date <= ?")
+            params.append(day_number(filters['end']))
+
+        # El cursor es la ultima (puntuacion, id) devuelta; bm25 es menor cuanto mas relevante
+        outer, outer_params = "", []
+        if cursor:
+            last_score, last_id = self.decode_search_cursor(cursor)
+            outer = "WHERE score > ? OR (score = ? AND id > ?)"
+            outer_params = [last_score, last_score, last_id]
+
+        def arm(schema: str, table: str = "transactions") -> str:
+            return f"""
+                SELECT {select_columns("t.")}, bm25(transactions_fts, {SEARCH_WEIGHTS[0]}, {SEARCH_WEIGHTS[1]}) AS score
+                FROM {schema}transactions_fts
+                JOIN {schema}{table} t ON t.id = transactions_fts.rowid
+                WHERE {" AND ".join(conditions)}
+                """
+
+        tail = f" {outer} ORDER BY score, id LIMIT ?"
+        tail_params = outer_params + [int(limit) + 1]
+        with self._get_connection() as conn:
+            rows = conn.execute(f"SELECT * FROM ({arm('', ROWS)}){tail}", params + tail_params).fetchall()
+            # Los años archivados solo entran si el rango de fechas del filtro los incluye
+            years = self._archive_years(conn, filters.get('start'), filters.get('end'))
+            for i in range(0, len(years), MAX_ATTACHED):
+                aliases = self._attach_archives(conn, years[i:i + MAX_ATTACHED])
+                union = " UNION ALL ".join(arm(f"{a}.") for a in aliases)
+                rows += conn.execute(f"SELECT * FROM ({union}){tail}", params * len(aliases) + tail_params).fetchall()
+        if years:
+            rows.sort(key=lambda r: (r['score'], r['id']))
+
+        page = [self._row_to_transaction(r) for r in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit and page:
+            last = rows[limit - 1]
+            next_cursor = f"{last['score']!r}_{last['id']}"
+        return page, next_cursor
+
+    @staticmethod
+    def decode_search_cursor(cursor: str) -> tuple:
+        try:
+            score, t_id = cursor.rsplit("_", 1)
+            return float(score), int(t_id)
+        except ValueError:
+            raise ValueError(f"Cursor no válido: {cursor}") from None
 
     def get_balance_by_period(self, start: str, end: str) -> dict:
+        # Lo archivado sale de sus totales diarios, sin abrir los archivos
         query = """
-                SELECT type, SUM(amount) as total
-                FROM transactions
-                WHERE date BETWEEN ? AND ?
+                SELECT type, SUM(total) as total
+                FROM (SELECT type, amount AS total FROM transactions WHERE date BETWEEN ? AND ?
+                      UNION ALL
+                      SELECT type, total FROM archive_totals WHERE date BETWEEN ? AND ?)
                 GROUP BY type \
                 """
         result = {"ingreso": 0.0, "gasto": 0.0, "ahorro": 0.0}
         with self._get_connection() as conn:
-            rows = conn.execute(query, (start, end)).fetchall()
+            start, end = day_number(start), day_number(end)
+            rows = conn.execute(query, (start, end, start, end)).fetchall()
             for r in rows:
                 result[r['type']] = float(r['total'] or 0.0)
 
@@ -151,6 +696,93 @@ class Database:
             'total_savings': result['ahorro']
         }
 
+    def get_daily_net_flows(self) -> list:
+        # Ingresos suman; gastos y traspasos a metas restan del balance disponible
+        query = """
+                SELECT date(day) AS date, SUM(CASE WHEN type = 'ingreso' THEN amount ELSE -amount END) AS net
+                FROM (SELECT date AS day, type, amount FROM transactions
+                      UNION ALL
+                      SELECT date, type, total FROM archive_totals)
+                GROUP BY day
+                ORDER BY day \
+                """
+        with self._get_connection() as conn:
+            return conn.execute(query).fetchall()
+
+    def get_period_totals(self, granularity: str, start: str, end: str) -> list:
+        """Ingresos, gastos y ahorros de cada dia, semana o mes del rango, agrupados en SQLite."""
+        query = f"""
+                SELECT {PERIOD_BUCKETS[granularity]} AS period,
+                       SUM(CASE WHEN type = 'ingreso' THEN amount ELSE 0 END) AS income,
+                       SUM(CASE WHEN type = 'gasto' THEN amount ELSE 0 END) AS expense,
+                       SUM(CASE WHEN type = 'ahorro' THEN amount ELSE 0 END) AS savings
+                FROM (SELECT date, type, amount FROM transactions WHERE date BETWEEN ? AND ?
+                      UNION ALL
+                      SELECT date, type, total FROM archive_totals WHERE date BETWEEN ? AND ?)
+                GROUP BY period
+                ORDER BY period \
+                """
+        start, end = day_number(start), day_number(end)
+        with self._get_connection() as conn:
+            return conn.execute(query, (start, end, start, end)).fetchall()
+
+    def get_date_bounds(self) -> tuple:
+        # MIN/MAX por separado en cada tabla para que SQLite use el indice por fecha
+        query = """
+                SELECT date(MIN(first)), date(MAX(last))
+                FROM (SELECT MIN(date) AS first, MAX(date) AS last FROM transactions
+                      UNION ALL
+                      SELECT MIN(date), MAX(date) FROM archive_totals) \
+                """
+        with self._get_connection() as conn:
+            return tuple(conn.execute(query).fetchone())
+
+    @staticmethod
+    def _repair_balances(conn):
+        # Rehace el acumulado desde el primer dia que ha cambiado desde la ultima lectura
+        dirty = conn.execute("SELECT dirty_from FROM balance_state").fetchone()[0]
+        if dirty is None:
+            return
+        conn.execute("""
+            WITH running AS (
+                SELECT date,
+                       COALESCE((SELECT balance FROM daily_balance WHERE date < :start ORDER BY date DESC LIMIT 1), 0)
+                       + SUM(net) OVER (ORDER BY date) AS balance
+                FROM daily_balance
+                WHERE date >= :start
+            )
+            UPDATE daily_balance SET balance = running.balance
+            FROM running
+            WHERE daily_balance.date = running.date
+        """, {'start': dirty})
+        conn.execute("UPDATE balance_state SET dirty_from = NULL")
+
+    @staticmethod
+    def _balance_lookup(conn, day: str, inclusive: bool = True) -> float:
+        op = "<=" if inclusive else "<"
+        row = conn.execute(
+            f"SELECT balance FROM daily_balance WHERE date {op} ? ORDER BY date DESC LIMIT 1", (day_number(day),)
+        ).fetchone()
+        return row[0] if row else 0.0
+
+    def get_balance_at(self, day: str) -> float:
+        """Saldo (ingresos - gastos - ahorros) al cierre de `day`: una busqueda por clave primaria."""
+        with self._get_connection() as conn:
+            self._repair_balances(conn)
+            return self._balance_lookup(conn, day)
+
+    def get_balance_between(self, start: str, end: str) -> float:
+        """Cuanto ha cambiado el saldo entre dos fechas (ambas incluidas)."""
+        with self._get_connection() as conn:
+            self._repair_balances(conn)
+            return self._balance_lookup(conn, end) - self._balance_lookup(conn, start, inclusive=False)
+
+    def get_balances_at(self, days) -> dict:
+        """Saldo al cierre de varios dias de una vez (columna de saldo de los listados)."""
+        with self._get_connection() as conn:
+            self._repair_balances(conn)
+            return {day: self._balance_lookup(conn, day) for day in set(days)}
+
     def get_expenses_by_category(self) -> dict:
         return self._get_category_totals('gasto')
 
@@ -161,40 +793,435 @@ class Database:
         return self._get_category_totals('ahorro')
 
     def _get_category_totals(self, t_type: str) -> dict:
-        query = "SELECT category, SUM(amount) as total FROM transactions WHERE type = ? GROUP BY category"
+        query = """
+                SELECT c.name AS category, s.total
+                FROM (SELECT category_id, SUM(amount) AS total
+                      FROM (SELECT category_id, amount FROM transactions WHERE type = ?
+                            UNION ALL
+                            SELECT category_id, total FROM archive_totals WHERE type = ?)
+                      GROUP BY category_id) s
+                         JOIN categories c ON c.id = s.category_id \
+                """
         with self._get_connection() as conn:
-            rows = conn.execute(query, (t_type,)).fetchall()
+            rows = conn.execute(query, (t_type, t_type)).fetchall()
             return {r['category']: float(r['total']) for r in rows}
 
+    def get_monthly_type_totals(self, start_month: str = None, end_month: str = None) -> list:
+        """(mes, tipo, total) de cada mes entre dos meses 'AAAA-MM', desde los totales mensuales."""
+        start_month, end_month = start_month or "0001-01", end_month or "9999-12"
+        query = """
+                SELECT month, type, SUM(total)
+                FROM (SELECT month, type, total FROM monthly_category_totals
+                      WHERE month BETWEEN ? AND ? AND count > 0
+                      UNION ALL
+                      SELECT strftime('%Y-%m', date), type, total FROM archive_totals
+                      WHERE date BETWEEN ? AND ?)
+                GROUP BY month, type
+                ORDER BY month \
+                """
+        params = (start_month, end_month) + month_day_range(start_month, end_month)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(query, params).fetchall()
+
+    def get_category_pivot(self, t_type, start_month: str = None, end_month: str = None) -> CategoryPivot:
+        """
+        Totales de un tipo por mes y categoria entre dos meses ('AAAA-MM'), con una sola
+        consulta agrupada sobre monthly_category_totals y los totales de los años archivados.
+        """
+        t_type = self._get_type_string(t_type)
+        if start_month is None or end_month is None:
+            first, last = self.get_date_bounds()
+            if first is None:
+                today = date.today().strftime("%Y-%m")
+                return CategoryPivot.from_rows([], start_month or today, end_month or today)
+            start_month = start_month or first[:7]
+            end_month = end_month or max(last[:7], date.today().strftime("%Y-%m"))
+
+        query = """
+                SELECT s.month, c.name, s.total
+                FROM (SELECT month, category_id, SUM(total) AS total
+                      FROM (SELECT month, category_id, total FROM monthly_category_totals
+                            WHERE type = ? AND month BETWEEN ? AND ? AND count > 0
+                            UNION ALL
+                            SELECT strftime('%Y-%m', date), category_id, total FROM archive_totals
+                            WHERE type = ? AND date BETWEEN ? AND ?)
+                      GROUP BY month, category_id) s
+                         JOIN categories c ON c.id = s.category_id \
+                """
+        params = (t_type, start_month, end_month, t_type) + month_day_range(start_month, end_month)
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(query, params).fetchall()
+        return CategoryPivot.from_rows(rows, start_month, end_month)
+
     @staticmethod
     def _row_to_transaction(r) -> Transaction:
-        type_map = {
-            'ingreso': TransactionType.INCOME,
-            'gasto': TransactionType.EXPENSE,
-            'ahorro': TransactionType.SAVINGS
-        }
         return Transaction(
-            transaction_type=type_map.get(r['type'], TransactionType.EXPENSE),
-            amount=r['amount'],
-            category=r['category'],
-            description=r['description'],
-            date=r['date'],
-            transaction_id=r['id']
+            TYPE_FROM_DB.get(r['type'], TransactionType.EXPENSE),
+            r['amount'],
+            r['category'],
+            r['description'],
+            r['date'],
+            r['id'],
+            r['goal_id']
         )
 
-    def add_savings_goal(self, goal: SavingsGoal) -> int:
-        query = "INSERT INTO savings_goals (name, target_amount, current_amount, deadline, description) VALUES (?, ?, ?, ?, ?)"
-        params = (goal.name, goal.target_amount, goal.current_amount, goal.deadline, goal.description)
+    def get_transactions_columns(self, t_type=None, start: str = None, end: str = None) -> TransactionColumns:
+        """Todo el libro (o un tipo / rango de fechas) en columnas, con una sola consulta."""
+        conditions, params = [], []
+        if t_type is not None:
+            conditions.append("type = ?")
+            params.append(self._get_type_string(t_type))
+        if start:
+            conditions.append("date >= ?")
+            params.append(day_number(start))
+        if end:
+            conditions.append("date <= ?")
+            params.append(day_number(end))
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        order = f" ORDER BY {ROWS}.date DESC, {ROWS}.id DESC"
+
         with self._get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(f"SELECT {COLUMNS} FROM {ROWS}{where}{order}", params).fetchall()
+            years = self._archive_years(conn, start, end)
+            for i in range(0, len(years), MAX_ATTACHED):
+                aliases = self._attach_archives(conn, years[i:i + MAX_ATTACHED])
+                union = " UNION ALL ".join(f"SELECT {COLUMNS} FROM {a}.transactions{where}" for a in aliases)
+                rows += cursor.execute(union, params * len(aliases)).fetchall()
+        if years:
+            rows.sort(key=lambda r: (r[5], r[0]), reverse=True)
+        return TransactionColumns.from_rows(rows)
+
+    def archive_path(self, year: int) -> str:
+        base, _ = os.path.splitext(os.path.abspath(self.db_name))
+        return f"{base}_archive_{year}.db"
+
+    def get_archives(self) -> list:
+        with self._get_connection() as conn:
+            return [dict(r) for r in conn.execute("SELECT year, path, rows, archived_at FROM archives ORDER BY year")]
+
+    def _archive_years(self, conn, start: str = None, end: str = None) -> list:
+        query = "SELECT year FROM archives WHERE year >= ? AND year <= ? ORDER BY year DESC"
+        first = int(start[:4]) if start else 0
+        last = int(end[:4]) if end else 9999
+        return [r[0] for r in conn.execute(query, (first, last)).fetchall()]
+
+    def _attach_archives(self, conn, years: list) -> list:
+        """
+        Adjunta a la conexion los archivos de esos años (si no lo estaban ya) y devuelve sus
+        alias. Se quedan adjuntos para las siguientes consultas; si no caben, se sueltan los demas.
+        """
+        attached = {r[1] for r in conn.execute("PRAGMA database_list").fetchall()}
+        aliases = [f"archive_{y}" for y in years]
+        missing = [(y, a) for y, a in zip(years, aliases) if a not in attached]
+        archived = [a for a in attached if a.startswith("archive_")]
+        if missing and len(archived) + len(missing) > MAX_ATTACHED and not conn.in_transaction:
+            for alias in archived:
+                if alias not in aliases:
+                    conn.execute(f"DETACH DATABASE {alias}")
+        paths = dict(conn.execute("SELECT year, path FROM archives").fetchall()) if missing else {}
+        for year, alias in missing:
+            conn.execute(f"ATTACH DATABASE ? AS {alias}", (paths[year],))
+        return aliases
+
+    def archive_year(self, year: int) -> int:
+        """
+        Mueve los movimientos de un año cerrado a su propia base de datos de archivo y deja en
+        archive_totals sus totales por dia, tipo y categoria. Los aportes enlazados a metas se
+        quedan en la tabla activa para que los saldos de las metas sigan cuadrando.
+        Borra el historial de deshacer. Devuelve cuantas filas se han archivado.
+        """
+        if self.db_name == ":memory:":
+            raise ValueError("No se puede archivar una base de datos en memoria")
+        if year >= date.today().year:
+            raise ValueError(f"Solo se pueden archivar años cerrados: {year}")
+
+        path = self.archive_path(year)
+        archive = sqlite3.connect(path)
+        try:
+            for statement in ARCHIVE_SCHEMA:
+                archive.execute(statement)
+            archive.commit()
+        finally:
+            archive.close()
+
+        start, end = day_number(f"{year}-01-01"), day_number(f"{year}-12-31")
+        with self._get_connection() as conn:
+            if conn.in_transaction:
+                raise sqlite3.OperationalError("No se puede archivar dentro de otra transacción")
+            conn.execute("INSERT OR REPLACE INTO archives (year, path, rows) VALUES (?, ?, 0)", (year, path))
+            conn.commit()
+            alias = self._attach_archives(conn, [year])[0]
+
+            # Primero se copia al archivo y despues se borra de la tabla activa. Si se corta entre
+            # medias, repetirlo no duplica nada (INSERT OR IGNORE por id)
+            with conn:
+                conn.execute(f"""
+                    INSERT OR IGNORE INTO {alias}.transactions ({STORED_COLUMNS}, content_hash)
+                    SELECT {STORED_COLUMNS}, content_hash FROM {ROWS}
+                    WHERE date BETWEEN ? AND ? AND goal_id IS NULL
+                """, (start, end))
+            with conn:
+                conn.execute("""
+                    INSERT INTO archive_totals (date, type, category_id, total, count)
+                    SELECT date, type, category_id, SUM(amount), COUNT(*) FROM transactions
+                    WHERE date BETWEEN ? AND ? AND goal_id IS NULL
+                    GROUP BY date, type, category_id
+                    ON CONFLICT (date, type, category_id)
+                    DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+                """, (start, end))
+                # El saldo diario tampoco cambia: se suma aqui lo que el trigger restara al borrar
+                conn.execute("""
+                    INSERT INTO daily_balance (date, net)
+                    SELECT date, SUM(CASE WHEN type = 'ingreso' THEN amount ELSE -amount END) FROM transactions
+                    WHERE date BETWEEN ? AND ? AND goal_id IS NULL
+                    GROUP BY date
+                    ON CONFLICT (date) DO UPDATE SET net = net + excluded.net
+                """, (start, end))
+                # Archivar no es borrar: no se propaga a otras replicas. Las filas conservan su uid,
+                # marcado como archivado, para reconocer los cambios que lleguen de otra replica
+                conn.execute("""
+                    UPDATE sync_rows SET archived = 1
+                    WHERE tbl = 'transactions' AND row_id IN (
+                        SELECT id FROM transactions WHERE date BETWEEN ? AND ? AND goal_id IS NULL)
+                """, (start, end))
+                conn.execute("UPDATE sync_state SET paused = 1")
+                moved = conn.execute(
+                    "DELETE FROM transactions WHERE date BETWEEN ? AND ? AND goal_id IS NULL", (start, end)
+                ).rowcount
+                conn.execute("UPDATE sync_state SET paused = 0")
+                conn.execute(
+                    f"UPDATE archives SET rows = (SELECT COUNT(*) FROM {alias}.transactions) WHERE year = ?", (year,)
+                )
+                # Los pasos guardados pueden apuntar a filas que ya no estan en la tabla activa
+                conn.execute("DELETE FROM journal_steps")
+            return moved
+
+    def archive_closed_years(self, keep_years: int = 1) -> dict:
+        """Archiva todos los años anteriores a los `keep_years` mas recientes. Devuelve {año: filas}."""
+        last_year = date.today().year - keep_years
+        with self._get_connection() as conn:
+            years = [int(r[0]) for r in conn.execute(
+                "SELECT DISTINCT strftime('%Y', date) FROM transactions WHERE date < ? AND goal_id IS NULL",
+                (day_number(f"{last_year + 1}-01-01"),)
+            ).fetchall()]
+        return {year: self.archive_year(year) for year in sorted(years)}
+
+    def get_replica_id(self) -> str:
+        with self._get_connection() as conn:
+            return conn.execute("SELECT replica FROM sync_state").fetchone()[0]
+
+    def reset_replica_id(self) -> str:
+        # Para una copia del archivo: a partir de ahora sus cambios cuentan como de otra replica
+        with self._get_connection() as conn:
+            conn.execute("UPDATE sync_state SET replica = lower(hex(randomblob(8)))")
+            return conn.execute("SELECT replica FROM sync_state").fetchone()[0]
+
+    def get_sync_seq(self) -> int:
+        with self._get_connection() as conn:
+            return conn.execute("SELECT seq FROM sync_state").fetchone()[0]
+
+    def get_changed_months(self, since: int = 0) -> tuple:
+        """
+        (primer mes 'AAAA-MM' con cambios posteriores a la version `since` o None, version actual).
+        La version actual se pasa como `since` en la siguiente llamada.
+        """
+        query = """
+                SELECT (SELECT MIN(month) FROM month_changes WHERE version > ?),
+                       (SELECT COALESCE(MAX(version), 0) FROM month_changes) \
+                """
+        with self._get_connection() as conn:
+            return tuple(conn.execute(query, (since,)).fetchone())
+
+    def get_sync_point(self, replica: str) -> int:
+        """Ultima secuencia de esa replica que ya se ha recibido (0 si nunca se ha sincronizado)."""
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT last_seq FROM sync_peers WHERE replica = ?", (replica,)).fetchone()
+            return row[0] if row else 0
+
+    def get_changes(self, table: str, since: int, until: int, exclude_origin: str = None, limit: int = 5000) -> list:
+        """
+        Cambios de `table` con secuencia en (since, until], en orden. Se omiten los que vienen de
+        `exclude_origin` (la replica que los va a recibir ya los tiene).
+        """
+        columns = SYNC_COLUMNS[table]
+        if table == 'transactions':
+            data = "t.type, t.amount, t.category, t.description, date(t.date) AS date, g.uid AS goal_uid"
+            joins = (f"LEFT JOIN {ROWS} t ON t.id = s.row_id "
+                     "LEFT JOIN sync_rows g ON g.tbl = 'savings_goals' AND g.row_id = t.goal_id")
+        else:
+            data = ", ".join(f"t.{c}" for c in columns)
+            joins = f"LEFT JOIN {table} t ON t.id = s.row_id"
+        query = f"""
+                SELECT s.uid, s.seq, s.modified_at, s.origin, s.deleted, {data}
+                FROM sync_rows s {joins}
+                WHERE s.tbl = ? AND s.seq > ? AND s.seq <= ? AND s.origin != ? AND s.archived = 0
+                ORDER BY s.seq
+                LIMIT ? \
+                """
+        with self._get_connection() as conn:
+            rows = conn.execute(query, (table, since, until, exclude_origin or "", limit)).fetchall()
+        return [
+            {'uid': r['uid'], 'tbl': table, 'seq': r['seq'], 'modified_at': r['modified_at'], 'origin': r['origin'],
+             'deleted': r['deleted'], 'data': None if r['deleted'] else {c: r[c] for c in columns}}
+            for r in rows
+        ]
+
+    def apply_changes(self, changes: list) -> tuple:
+        """
+        Aplica cambios recibidos de otra replica en una sola transaccion, sin volver a registrarlos
+        como propios. Conflictos: gana el cambio mas reciente; a la misma hora un borrado gana a
+        una edicion y, si aun empatan, decide el id de replica. Los cambios a filas de años
+        archivados se descartan: el archivo es de solo lectura. Devuelve (aplicados, descartados).
+        """
+        applied = skipped = 0
+        goal_ids = {}
+        with self._get_connection() as conn:
+            conn.execute("UPDATE sync_state SET paused = 1")
+            seq = conn.execute("SELECT seq FROM sync_state").fetchone()[0]
+            try:
+                for change in changes:
+                    local = conn.execute(
+                        "SELECT row_id, modified_at, origin, deleted, archived FROM sync_rows WHERE uid = ?",
+                        (change['uid'],)
+                    ).fetchone()
+                    if local is not None and local['archived']:
+                        skipped += 1
+                        continue
+                    remote_version = (change['modified_at'], change['deleted'], change['origin'])
+                    if local is not None:
+                        local_version = (local['modified_at'], local['deleted'], local['origin'])
+                        if remote_version < local_version:
+                            skipped += 1
+                        if remote_version <= local_version:
+                            continue
+
+                    row_id = self._apply_sync_row(conn, change, local['row_id'] if local else None, goal_ids)
+                    seq += 1
+                    conn.execute("""
+                        INSERT INTO sync_rows (uid, tbl, row_id, seq, modified_at, origin, deleted)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (uid) DO UPDATE SET row_id = excluded.row_id, seq = excluded.seq,
+                            modified_at = excluded.modified_at, origin = excluded.origin, deleted = excluded.deleted
+                    """, (change['uid'], change['tbl'], row_id, seq, change['modified_at'], change['origin'],
+                          change['deleted']))
+                    applied += 1
+            finally:
+                conn.execute("UPDATE sync_state SET seq = ?, paused = 0", (seq,))
+        return applied, skipped
+
+    def _apply_sync_row(self, conn, change: dict, row_id, goal_ids: dict):
+        table = change['tbl']
+        if change['deleted']:
+            if row_id is not None:
+                if table == 'savings_goals':
+                    conn.execute("UPDATE transactions SET goal_id = NULL WHERE goal_id = ?", (row_id,))
+                conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+            return None
+
+        values = dict(change['data'])
+        if table == 'transactions':
+            goal_uid = values.pop('goal_uid')
+            if goal_uid is not None and goal_uid not in goal_ids:
+                row = conn.execute("SELECT row_id FROM sync_rows WHERE uid = ?", (goal_uid,)).fetchone()
+                goal_ids[goal_uid] = row[0] if row else None
+            values['goal_id'] = goal_ids.get(goal_uid)
+            values['content_hash'] = content_hash(values['date'], values['amount'], values['category'],
+                                                  values['description'])
+            values['date'] = day_number(values['date'])
+            category = values.pop('category')
+            values['category_id'] = self._resolve_categories(conn, [(category, values['type'])])[category]
+
+        columns = list(values)
+        if row_id is None:
+            return conn.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [values[c] for c in columns]
+            ).lastrowid
+        conn.execute(
+            f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?",
+            [values[c] for c in columns] + [row_id]
+        )
+        return row_id
+
+    def end_sync(self, replica: str, seq: int, changed: bool):
+        """Guarda el punto de sincronizacion con `replica` y, si ha cambiado algo, cuadra las metas."""
+        if changed:
+            # Los aportes de las dos replicas pueden no estar en el saldo que gano el conflicto
+            self.repair_goal_amounts()
+        with self._get_connection() as conn:
+            conn.execute("""
+                INSERT INTO sync_peers (replica, last_seq) VALUES (?, ?)
+                ON CONFLICT (replica) DO UPDATE SET last_seq = excluded.last_seq, synced_at = CURRENT_TIMESTAMP
+            """, (replica, seq))
+            if changed:
+                # El historial de deshacer no sabe nada de las filas que han llegado
+                conn.execute("DELETE FROM journal_steps")
+
+    def vacuum(self):
+        # Tras archivar, recupera en disco el espacio de la tabla activa
+        with self._get_connection() as conn:
+            if conn.in_transaction:
+                raise sqlite3.OperationalError("No se puede compactar dentro de otra transacción")
+            conn.execute("VACUUM")
+
+    def add_savings_goal(self, goal: SavingsGoal) -> int:
+        query = """
+                INSERT INTO savings_goals (name, target_amount, current_amount, initial_amount, deadline, description)
+                VALUES (?, ?, ?, ?, ?, ?) \
+                """
+        params = (goal.name, goal.target_amount, goal.current_amount, goal.current_amount, goal.deadline,
+                  goal.description)
+        with self.journal_step("Crear meta") as conn:
             cursor = conn.execute(query, params)
             return cursor.lastrowid
 
+    def add_savings_deposit(self, goal_id: int, amount: float, date: str,
+                            description: str = "Traspaso manual a meta") -> int:
+        # La transaccion de ahorro y el saldo de la meta se guardan juntos o no se guarda nada
+        with self.journal_step("Aportar a meta") as conn:
+            category_id = self._resolve_categories(conn, [(SAVINGS_CATEGORY, 'ahorro')])[SAVINGS_CATEGORY]
+            cursor = conn.execute(INSERT_TRANSACTION, (
+                'ahorro', amount, category_id, description, day_number(date), goal_id,
+                content_hash(date, amount, SAVINGS_CATEGORY, description)
+            ))
+            self.update_savings_goal_amount(goal_id, amount)
+            return cursor.lastrowid
+
     def update_savings_goal_amount(self, goal_id: int, amount: float) -> bool:
         query = "UPDATE savings_goals SET current_amount = current_amount + ? WHERE id = ?"
         with self._get_connection() as conn:
             conn.execute(query, (amount, goal_id))
             return True
 
+    def get_goal_contribution_stats(self, goal_ids: list = None) -> dict:
+        """Aportaciones de cada meta (primera fecha, total y numero) en una sola consulta agrupada."""
+        query = """
+                SELECT goal_id, date(MIN(date)) AS first_date, date(MAX(date)) AS last_date,
+                       SUM(amount) AS total, COUNT(*) AS count
+                FROM transactions
+                WHERE goal_id IS NOT NULL \
+                """
+        params = []
+        if goal_ids is not None:
+            if not goal_ids:
+                return {}
+            query += f" AND goal_id IN ({', '.join('?' * len(goal_ids))})"
+            params = list(goal_ids)
+        query += " GROUP BY goal_id"
+        with self._get_connection() as conn:
+            return {
+                r['goal_id']: {'first_date': r['first_date'], 'last_date': r['last_date'],
+                               'total': float(r['total']), 'count': r['count']}
+                for r in conn.execute(query, params).fetchall()
+            }
+
     def get_all_savings_goals(self) -> list:
         with self._get_connection() as conn:
             rows = conn.execute("SELECT * FROM savings_goals ORDER BY id DESC").fetchall()
@@ -202,7 +1229,398 @@ class Database:
                                 current_amount=r['current_amount'], deadline=r['deadline'],
                                 description=r['description'], goal_id=r['id']) for r in rows]
 
-    def delete_savings_goal(self, g_id: int) -> bool:
-        with self._get_connection() as conn:
+    def delete_savings_goal(self, g_id: int, delete_transactions: bool = False) -> bool:
+        """
+        Borra la meta y, en la misma transaccion, sus reglas de ahorro. Los aportes enlazados
+        se borran tambien o se quedan en el historial como ahorro sin meta.
+        """
+        with self.journal_step("Borrar meta") as conn:
+            conn.execute("DELETE FROM allocation_rules WHERE goal_id = ?", (g_id,))
+            if delete_transactions:
+                conn.execute("DELETE FROM transactions WHERE goal_id = ?", (g_id,))
+            else:
+                conn.execute("UPDATE transactions SET goal_id = NULL WHERE goal_id = ?", (g_id,))
             conn.execute("DELETE FROM savings_goals WHERE id = ?", (g_id,))
-            return True
\ No newline at end of file
+            return True
+
+    def get_goal_transactions(self, goal_id: int) -> list:
+        query = f"SELECT {COLUMNS} FROM {ROWS} WHERE goal_id = ? ORDER BY {ROWS}.date DESC, {ROWS}.id DESC"
+        with self._get_connection() as conn:
+            rows = conn.execute(query, (goal_id,)).fetchall()
+            return [self._row_to_transaction(r) for r in rows]
+
+    def check_goal_consistency(self) -> list:
+        """
+        Compara el saldo guardado de cada meta con el que sale del libro (saldo inicial + aportes
+        enlazados) en una sola consulta agregada. Devuelve las metas que no cuadran.
+        """
+        query = """
+                SELECT g.id, g.name, g.current_amount,
+                       g.initial_amount + COALESCE(SUM(t.amount), 0) AS expected
+                FROM savings_goals g
+                         LEFT JOIN transactions t ON t.goal_id = g.id
+                GROUP BY g.id
+                HAVING ABS(g.current_amount - expected) > 0.005 \
+                """
+        with self._get_connection() as conn:
+            return [
+                {'goal_id': r['id'], 'name': r['name'], 'stored': r['current_amount'], 'expected': r['expected']}
+                for r in conn.execute(query).fetchall()
+            ]
+
+    def repair_goal_amounts(self) -> int:
+        query = """
+                UPDATE savings_goals
+                SET current_amount = initial_amount + COALESCE(
+                        (SELECT SUM(amount) FROM transactions t WHERE t.goal_id = savings_goals.id), 0)
+                WHERE id IN (SELECT g.id
+                             FROM savings_goals g
+                                      LEFT JOIN transactions t ON t.goal_id = g.id
+                             GROUP BY g.id
+                             HAVING ABS(g.current_amount - g.initial_amount - COALESCE(SUM(t.amount), 0)) > 0.005) \
+                """
+        with self.journal_step("Recalcular saldos de metas") as conn:
+            return conn.execute(query).rowcount
+
+    def add_recurring_rule(self, rule: RecurringRule) -> int:
+        query = """
+                INSERT INTO recurring_rules (type, amount, category, description, frequency, interval,
+                                             start_date, end_date, next_index, next_due, active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) \
+                """
+        params = (self._get_type_string(rule.transaction_type), rule.amount, rule.category, rule.description,
+                  rule.frequency.value, rule.interval, rule.start_date, rule.end_date, rule.next_index,
+                  rule.next_due, int(rule.active))
+        with self._get_connection() as conn:
+            cursor = conn.execute(query, params)
+            return cursor.lastrowid
+
+    def get_recurring_rules(self) -> list:
+        with self._get_connection() as conn:
+            rows = conn.execute("SELECT * FROM recurring_rules ORDER BY id DESC").fetchall()
+            return [self._row_to_recurring_rule(r) for r in rows]
+
+    def delete_recurring_rule(self, rule_id: int) -> bool:
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM recurring_rules WHERE id = ?", (rule_id,))
+            return True
+
+    def materialize_recurring_rules(self, today: str) -> int:
+        """
+        Genera de una vez todas las ocurrencias pendientes hasta `today`. Solo se leen las reglas
+        vencidas (indice sobre next_due) y las inserciones y el avance de cada regla van en la misma
+        transaccion, asi que volver a ejecutarlo tras un reinicio no duplica nada.
+        """
+        with self._get_connection() as conn:
+            if not conn.in_transaction:
+                # Bloquea la escritura desde el principio para que otro proceso no genere lo mismo
+                conn.execute("BEGIN IMMEDIATE")
+
+            rows = conn.execute("""
+                                SELECT *
+                                FROM recurring_rules
+                                WHERE active = 1 AND next_due IS NOT NULL AND next_due <= ? \
+                                """, (today,)).fetchall()
+
+            new_transactions, updates = [], []
+            category_ids = self._resolve_categories(conn, [(r['category'], r['type']) for r in rows])
+            for r in rows:
+                rule = self._row_to_recurring_rule(r)
+                dates = rule.due_dates(today)
+                new_transactions.extend(
+                    (r['type'], rule.amount, category_ids[rule.category], rule.description, day_number(d), None,
+                     content_hash(d, rule.amount, rule.category, rule.description))
+                    for d in dates
+                )
+                rule.next_index += len(dates)
+                updates.append((rule.next_index, rule.next_due, rule.id))
+
+            conn.executemany(INSERT_TRANSACTION, new_transactions)
+            conn.executemany("UPDATE recurring_rules SET next_index = ?, next_due = ? WHERE id = ?", updates)
+            self._allocate_savings(conn, [(t[1], iso_date(t[4])) for t in new_transactions if t[0] == 'ingreso'])
+            return len(new_transactions)
+
+    @staticmethod
+    def _row_to_recurring_rule(r) -> RecurringRule:
+        return RecurringRule(
+            transaction_type=TransactionType(r['type']),
+            amount=r['amount'],
+            category=r['category'],
+            description=r['description'],
+            frequency=Frequency(r['frequency']),
+            start_date=r['start_date'],
+            interval=r['interval'],
+            end_date=r['end_date'],
+            next_index=r['next_index'],
+            active=bool(r['active']),
+            rule_id=r['id']
+        )
+
+    def add_allocation_rule(self, rule: AllocationRule) -> int:
+        query = "INSERT INTO allocation_rules (goal_id, mode, value, active) VALUES (?, ?, ?, ?)"
+        with self.journal_step("Crear regla de ahorro") as conn:
+            cursor = conn.execute(query, (rule.goal_id, rule.mode.value, rule.value, int(rule.active)))
+            return cursor.lastrowid
+
+    def get_allocation_rules(self, goal_id: int = None) -> list:
+        query = "SELECT * FROM allocation_rules"
+        params = ()
+        if goal_id is not None:
+            query += " WHERE goal_id = ?"
+            params = (goal_id,)
+        with self._get_connection() as conn:
+            rows = conn.execute(query + " ORDER BY id", params).fetchall()
+            return [self._row_to_allocation_rule(r) for r in rows]
+
+    def delete_allocation_rule(self, rule_id: int) -> bool:
+        with self.journal_step("Borrar regla de ahorro") as conn:
+            conn.execute("DELETE FROM allocation_rules WHERE id = ?", (rule_id,))
+            return True
+
+    @staticmethod
+    def _row_to_allocation_rule(r) -> AllocationRule:
+        return AllocationRule(
+            goal_id=r['goal_id'],
+            mode=AllocationMode(r['mode']),
+            value=r['value'],
+            active=bool(r['active']),
+            rule_id=r['id']
+        )
+
+    def set_budget(self, budget: Budget) -> bool:
+        query = """
+                INSERT INTO budgets (category, monthly_limit, alert_pct)
+                VALUES (?, ?, ?)
+                ON CONFLICT (category) DO UPDATE SET monthly_limit = excluded.monthly_limit,
+                                                     alert_pct     = excluded.alert_pct \
+                """
+        with self._get_connection() as conn:
+            conn.execute(query, (budget.category, budget.monthly_limit, budget.alert_pct))
+            return True
+
+    def delete_budget(self, category: str) -> bool:
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM budgets WHERE category = ?", (category,))
+            return True
+
+    def get_budgets(self, month: str) -> list:
+        """
+        Presupuesto frente a gasto real de un mes ('YYYY-MM'), sin recorrer las transacciones. Los
+        meses de años archivados salen de archive_totals.
+        """
+        query = """
+                SELECT b.category, b.monthly_limit, b.alert_pct,
+                       COALESCE(t.total, 0) + COALESCE((SELECT SUM(a.total) FROM archive_totals a
+                                                        WHERE a.date BETWEEN ? AND ? AND a.type = 'gasto'
+                                                          AND a.category_id = c.id), 0) AS spent
+                FROM budgets b
+                         LEFT JOIN categories c ON c.name = b.category
+                         LEFT JOIN monthly_category_totals t
+                                   ON t.month = ? AND t.type = 'gasto' AND t.category_id = c.id
+                ORDER BY b.category \
+                """
+        with self._get_connection() as conn:
+            rows = conn.execute(query, month_day_range(month, month) + (month,)).fetchall()
+            return [Budget(r['category'], r['monthly_limit'], r['alert_pct'], r['spent']) for r in rows]
+
+    def get_budget(self, category: str, month: str):
+        query = """
+                SELECT b.category, b.monthly_limit, b.alert_pct,
+                       COALESCE(t.total, 0) + COALESCE((SELECT SUM(a.total) FROM archive_totals a
+                                                        WHERE a.date BETWEEN ? AND ? AND a.type = 'gasto'
+                                                          AND a.category_id = c.id), 0) AS spent
+                FROM budgets b
+                         LEFT JOIN categories c ON c.name = b.category
+                         LEFT JOIN monthly_category_totals t
+                                   ON t.month = ? AND t.type = 'gasto' AND t.category_id = c.id
+                WHERE b.category = ? \
+                """
+        with self._get_connection() as conn:
+            r = conn.execute(query, month_day_range(month, month) + (month, category)).fetchone()
+            return Budget(r['category'], r['monthly_limit'], r['alert_pct'], r['spent']) if r else None
+
+    def get_month_category_total(self, month: str, t_type, category: str) -> float:
+        # Los meses archivados ya no estan en monthly_category_totals, sino en archive_totals
+        query = """
+                SELECT COALESCE((SELECT total FROM monthly_category_totals
+                                 WHERE month = ? AND type = ? AND category_id = c.id), 0)
+                     + COALESCE((SELECT SUM(total) FROM archive_totals
+                                 WHERE date BETWEEN ? AND ? AND type = ? AND category_id = c.id), 0) AS total
+                FROM categories c
+                WHERE c.name = ? \
+                """
+        tipo_db = self._get_type_string(t_type)
+        with self._get_connection() as conn:
+            first, last = month_day_range(month, month)
+            row = conn.execute(query, (month, tipo_db, first, last, tipo_db, category)).fetchone()
+            return float(row['total']) if row else 0.0
+
+    def _category_map(self) -> dict:
+        # Catalogo {nombre: Category} en memoria; se vuelve a leer cuando cambia
+        if self._categories is None:
+            with self._get_connection() as conn:
+                rows = conn.execute(
+                    "SELECT id, name, type, color, icon, parent_id FROM categories ORDER BY id"
+                ).fetchall()
+            self._categories = {r['name']: self._row_to_category(r) for r in rows}
+        return self._categories
+
+    def _resolve_categories(self, conn, pairs) -> dict:
+        """
+        {nombre: id} de las categorias de un lote de (nombre, tipo). Las que aun no estan en el
+        catalogo se crean con el color por defecto, dentro de la transaccion en curso.
+        """
+        known = self._category_map()
+        ids = {}
+        for name, t_type in pairs:
+            if name in ids:
+                continue
+            if name in known:
+                ids[name] = known[name].id
+                continue
+            row = conn.execute("SELECT id FROM categories WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                row = (conn.execute(
+                    "INSERT INTO categories (name, type, icon) VALUES (?, ?, ?)",
+                    (name, self._get_type_string(t_type), category_icon(name))
+                ).lastrowid,)
+                # No se guarda en memoria hasta que se vuelva a leer: la transaccion aun puede deshacerse
+                self._categories = None
+            ids[name] = row[0]
+        return ids
+
+    def get_categories(self, t_type=None) -> list:
+        categories = list(self._category_map().values())
+        if t_type is not None:
+            t_type = TYPE_FROM_DB[self._get_type_string(t_type)]
+            categories = [c for c in categories if c.category_type == t_type]
+        return categories
+
+    def get_category_colors(self) -> dict:
+        return {name: c.color for name, c in self._category_map().items()}
+
+    def get_category_color(self, name: str) -> str:
+        category = self._category_map().get(name)
+        return category.color if category else DEFAULT_COLOR
+
+    def add_category(self, category: Category) -> int:
+        query = "INSERT INTO categories (name, type, color, icon, parent_id) VALUES (?, ?, ?, ?, ?)"
+        t_type = self._get_type_string(category.category_type)
+        try:
+            with self._get_connection() as conn:
+                if category.parent_id is not None:
+                    self._check_parent(conn, category.parent_id, t_type)
+                category_id = conn.execute(query, (
+                    category.name, t_type, category.color, category.icon, category.parent_id
+                )).lastrowid
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Ya existe la categoría {category.name}") from None
+        self._categories = None
+        return category_id
+
+    def update_category(self, category_id: int, name: str = None, color: str = None) -> bool:
+        """
+        Renombra o cambia el color de una categoria. Los movimientos la referencian por id y no se
+        tocan; solo se actualizan el indice de texto completo de sus filas y los presupuestos y
+        reglas repetitivas, que guardan el nombre. Los años archivados conservan el nombre antiguo.
+        """
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute("SELECT name FROM categories WHERE id = ?", (category_id,)).fetchone()
+                if row is None:
+                    return False
+                old = row['name']
+                if color is not None:
+                    conn.execute("UPDATE categories SET color = ? WHERE id = ?", (color, category_id))
+                if name is not None and name != old:
+                    conn.execute("""
+                        INSERT INTO transactions_fts (transactions_fts, rowid, description, category)
+                        SELECT 'delete', id, description, ? FROM transactions WHERE category_id = ?
+                    """, (old, category_id))
+                    conn.execute("UPDATE categories SET name = ?, icon = ? WHERE id = ?",
+                                 (name, category_icon(name), category_id))
+                    conn.execute("""
+                        INSERT INTO transactions_fts (rowid, description, category)
+                        SELECT id, description, ? FROM transactions WHERE category_id = ?
+                    """, (name, category_id))
+                    conn.execute("UPDATE budgets SET category = ? WHERE category = ?", (name, old))
+                    conn.execute("UPDATE recurring_rules SET category = ? WHERE category = ?", (name, old))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Ya existe la categoría {name}") from None
+        finally:
+            self._categories = None
+        return True
+
+    def move_category(self, category_id: int, parent_id: int = None) -> bool:
+        """
+        Cuelga una categoria (con todo su subarbol) de otra del mismo tipo, o la deja en el primer
+        nivel con parent_id=None. La tabla de cierre la actualizan los triggers de categories.
+        """
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute("SELECT type FROM categories WHERE id = ?", (category_id,)).fetchone()
+                if row is None:
+                    return False
+                if parent_id is not None:
+                    self._check_parent(conn, parent_id, row['type'])
+                conn.execute("UPDATE categories SET parent_id = ? WHERE id = ?", (parent_id, category_id))
+        except sqlite3.IntegrityError as e:
+            # trg_category_tree_cycle
+            raise ValueError(str(e)) from None
+        finally:
+            self._categories = None
+        return True
+
+    @staticmethod
+    def _check_parent(conn, parent_id: int, t_type: str):
+        row = conn.execute("SELECT type FROM categories WHERE id = ?", (parent_id,)).fetchone()
+        if row is None:
+            raise ValueError("La categoría padre no existe")
+        if row['type'] != t_type:
+            raise ValueError("La subcategoría debe ser del mismo tipo que su categoría padre")
+
+    def get_category_path(self, category_id: int) -> list:
+        """Categorias desde la de primer nivel hasta `category_id`, ambas incluidas."""
+        query = """
+                SELECT c.id, c.name, c.type, c.color, c.icon, c.parent_id
+                FROM category_tree t
+                         JOIN categories c ON c.id = t.ancestor_id
+                WHERE t.descendant_id = ?
+                ORDER BY t.depth DESC \
+                """
+        with self._get_connection() as conn:
+            return [self._row_to_category(r) for r in conn.execute(query, (category_id,)).fetchall()]
+
+    def get_subtree_totals(self, t_type, parent_id: int = None, start_month: str = None,
+                           end_month: str = None) -> dict:
+        """
+        {nombre: total} de un nivel del arbol de categorias: cada hija de `parent_id` (o cada
+        categoria de primer nivel) con lo de todo su subarbol, y lo apuntado en el propio padre
+        bajo su nombre. Sale de los totales mensuales y archivados unidos a category_tree, sin
+        recorrer los movimientos.
+        """
+        t_type = self._get_type_string(t_type)
+        start_month, end_month = start_month or "0001-01", end_month or "9999-12"
+        query = """
+                SELECT c.name AS category, SUM(s.total) AS total
+                FROM (SELECT category_id, SUM(total) AS total
+                      FROM (SELECT category_id, total FROM monthly_category_totals
+                            WHERE type = ? AND month BETWEEN ? AND ? AND count > 0
+                            UNION ALL
+                            SELECT category_id, total FROM archive_totals
+                            WHERE type = ? AND date BETWEEN ? AND ?)
+                      GROUP BY category_id) s
+                         JOIN category_tree t ON t.descendant_id = s.category_id
+                         JOIN categories c ON c.id = t.ancestor_id
+                WHERE c.parent_id IS ? OR (c.id = ? AND t.depth = 0)
+                GROUP BY c.id \
+                """
+        params = (t_type, start_month, end_month, t_type) + month_day_range(start_month, end_month) \
+            + (parent_id, parent_id)
+        with self._get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+            return {r['category']: float(r['total']) for r in rows}
+
+    @staticmethod
+    def _row_to_category(r) -> Category:
+        return Category(r['name'], TYPE_FROM_DB[r['type']], r['color'], r['icon'], r['id'], r['parent_id'])
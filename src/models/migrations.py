@@ -0,0 +1,799 @@
+import os
+import re
+import sqlite3
+
+from src.models.transaction import content_hash
+from src.models.category import DEFAULT_CATEGORIES, category_icon
+
+# Cambios de esquema numerados. La version aplicada se guarda en PRAGMA user_version,
+# asi una base de datos antigua se pone al dia al abrirla y una nueva pasa por todos los pasos.
+
+
+def _001_recurring_rules(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS recurring_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL CHECK (type IN ('ingreso', 'gasto', 'ahorro')),
+            amount REAL NOT NULL,
+            category TEXT NOT NULL,
+            description TEXT,
+            frequency TEXT NOT NULL CHECK (frequency IN ('diaria', 'semanal', 'mensual', 'anual')),
+            interval INTEGER NOT NULL DEFAULT 1,
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            next_index INTEGER NOT NULL DEFAULT 0,
+            next_due TEXT,
+            active INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    # Solo las reglas activas con ocurrencias pendientes entran en el indice
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_recurring_next_due
+        ON recurring_rules (next_due)
+        WHERE active = 1 AND next_due IS NOT NULL
+    """)
+
+
+def _002_allocation_rules(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS allocation_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            goal_id INTEGER NOT NULL REFERENCES savings_goals (id) ON DELETE CASCADE,
+            mode TEXT NOT NULL CHECK (mode IN ('porcentaje', 'fijo')),
+            value REAL NOT NULL CHECK (value >= 0),
+            active INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+
+
+def _003_budgets(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS budgets (
+            category TEXT PRIMARY KEY,
+            monthly_limit REAL NOT NULL CHECK (monthly_limit >= 0),
+            alert_pct REAL NOT NULL DEFAULT 80
+        )
+    """)
+    # Totales por mes, tipo y categoria mantenidos por triggers en cada alta/baja/cambio,
+    # para no tener que recorrer la tabla de transacciones al consultar un mes
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_category_totals (
+            month TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, type, category)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("DELETE FROM monthly_category_totals")
+    conn.execute("""
+        INSERT INTO monthly_category_totals (month, type, category, total, count)
+        SELECT substr(date, 1, 7), type, category, SUM(amount), COUNT(*)
+        FROM transactions
+        GROUP BY substr(date, 1, 7), type, category
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_totals_insert AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO monthly_category_totals (month, type, category, total, count)
+            VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount, 1)
+            ON CONFLICT (month, type, category)
+            DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_totals_delete AFTER DELETE ON transactions
+        BEGIN
+            UPDATE monthly_category_totals
+            SET total = total - OLD.amount, count = count - 1
+            WHERE month = substr(OLD.date, 1, 7) AND type = OLD.type AND category = OLD.category;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_totals_update AFTER UPDATE OF type, amount, category, date ON transactions
+        BEGIN
+            UPDATE monthly_category_totals
+            SET total = total - OLD.amount, count = count - 1
+            WHERE month = substr(OLD.date, 1, 7) AND type = OLD.type AND category = OLD.category;
+            INSERT INTO monthly_category_totals (month, type, category, total, count)
+            VALUES (substr(NEW.date, 1, 7), NEW.type, NEW.category, NEW.amount, 1)
+            ON CONFLICT (month, type, category)
+            DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+    """)
+
+
+def _004_transaction_goal_link(conn: sqlite3.Connection):
+    conn.execute("ALTER TABLE transactions ADD COLUMN goal_id INTEGER REFERENCES savings_goals (id)")
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_transactions_goal_date
+        ON transactions (goal_id, date)
+        WHERE goal_id IS NOT NULL
+    """)
+
+
+def _005_goal_link_backfill(conn: sqlite3.Connection):
+    # Lo que la meta tenia al crearse, para poder comprobar current_amount contra el libro
+    conn.execute("ALTER TABLE savings_goals ADD COLUMN initial_amount REAL NOT NULL DEFAULT 0")
+
+    # Enlaces a metas que ya no existen
+    conn.execute("""
+        UPDATE transactions SET goal_id = NULL
+        WHERE goal_id IS NOT NULL AND goal_id NOT IN (SELECT id FROM savings_goals)
+    """)
+    # Auto-ahorros: la descripcion lleva el nombre de la meta (solo si el nombre es unico)
+    conn.execute("""
+        UPDATE transactions
+        SET goal_id = (SELECT g.id FROM savings_goals g WHERE 'Auto-ahorro: ' || g.name = transactions.description)
+        WHERE type = 'ahorro' AND goal_id IS NULL
+          AND (SELECT COUNT(*) FROM savings_goals g WHERE 'Auto-ahorro: ' || g.name = transactions.description) = 1
+    """)
+    # Traspasos manuales: solo se pueden atribuir si hay una unica meta
+    conn.execute("""
+        UPDATE transactions
+        SET goal_id = (SELECT id FROM savings_goals)
+        WHERE type = 'ahorro' AND goal_id IS NULL AND (SELECT COUNT(*) FROM savings_goals) = 1
+    """)
+    conn.execute("""
+        UPDATE savings_goals
+        SET initial_amount = MAX(0, current_amount - COALESCE(
+            (SELECT SUM(amount) FROM transactions t WHERE t.goal_id = savings_goals.id), 0))
+    """)
+
+
+def _006_transactions_fts(conn: sqlite3.Connection):
+    # Indice de texto completo sobre descripcion y categoria. Es de contenido externo: no
+    # duplica el texto, solo guarda el indice y lee las filas de 'transactions' por rowid.
+    # 'remove_diacritics' permite encontrar "cafe" al buscar "café" y al reves
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5 (
+            description, category,
+            content = 'transactions', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_insert AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (rowid, description, category)
+            VALUES (NEW.id, NEW.description, NEW.category);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_delete AFTER DELETE ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description, category)
+            VALUES ('delete', OLD.id, OLD.description, OLD.category);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_fts_update AFTER UPDATE OF description, category ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description, category)
+            VALUES ('delete', OLD.id, OLD.description, OLD.category);
+            INSERT INTO transactions_fts (rowid, description, category)
+            VALUES (NEW.id, NEW.description, NEW.category);
+        END
+    """)
+    # Indexa los movimientos que ya existian
+    conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+
+def _007_transaction_content_hash(conn: sqlite3.Connection):
+    # Huella del contenido (fecha, importe, categoria, descripcion) para detectar duplicados
+    conn.execute("ALTER TABLE transactions ADD COLUMN content_hash INTEGER")
+    last_id = 0
+    while True:
+        chunk = conn.execute(
+            "SELECT id, date, amount, category, description FROM transactions WHERE id > ? ORDER BY id LIMIT 5000",
+            (last_id,)
+        ).fetchall()
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        conn.executemany(
+            "UPDATE transactions SET content_hash = ? WHERE id = ?",
+            [(content_hash(r[1], r[2], r[3], r[4]), r[0]) for r in chunk]
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_content_hash ON transactions (content_hash)")
+
+
+# Columnas que guarda el diario de cambios de cada tabla (congeladas en esta version del esquema)
+_008_JOURNALED = {
+    'transactions': ('id', 'type', 'amount', 'category', 'description', 'date', 'goal_id', 'content_hash'),
+    'savings_goals': ('id', 'name', 'target_amount', 'current_amount', 'deadline', 'description', 'initial_amount'),
+    'allocation_rules': ('id', 'goal_id', 'mode', 'value', 'active'),
+}
+
+
+def _008_change_journal(conn: sqlite3.Connection):
+    # Diario de cambios para deshacer/rehacer. Cada accion del usuario es un paso y los triggers
+    # guardan la imagen de cada fila tocada dentro de la misma transaccion que la escritura.
+    # Solo se registra mientras journal_state tiene un paso abierto
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS journal_steps (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            label TEXT NOT NULL,
+            created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            undone INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS change_journal (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            step INTEGER NOT NULL REFERENCES journal_steps (id) ON DELETE CASCADE,
+            tbl TEXT NOT NULL,
+            op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+            old_data TEXT,
+            new_data TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_change_journal_step ON change_journal (step, id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS journal_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            step INTEGER
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO journal_state (id, step) VALUES (1, NULL)")
+
+    for table, columns in _008_JOURNALED.items():
+        _journal_triggers(conn, table, columns)
+
+
+def _journal_triggers(conn: sqlite3.Connection, table: str, columns: tuple):
+    old = "json_object(" + ", ".join(f"'{c}', OLD.{c}" for c in columns) + ")"
+    new = "json_object(" + ", ".join(f"'{c}', NEW.{c}" for c in columns) + ")"
+    when = "WHEN (SELECT step FROM journal_state) IS NOT NULL"
+    for op, event, old_data, new_data in (('insert', 'INSERT', 'NULL', new),
+                                          ('update', 'UPDATE', old, new),
+                                          ('delete', 'DELETE', old, 'NULL')):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_journal_{table}_{op} AFTER {event} ON {table}
+            {when}
+            BEGIN
+                INSERT INTO change_journal (step, tbl, op, old_data, new_data)
+                VALUES ((SELECT step FROM journal_state), '{table}', '{op}', {old_data}, {new_data});
+            END
+        """)
+
+
+def _009_archives(conn: sqlite3.Connection):
+    # Años cerrados que se han movido a bases de datos de archivo
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archives (
+            year INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            archived_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # Totales diarios de lo archivado: balances, graficos y proyecciones no necesitan abrir los archivos
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS archive_totals (
+            date TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (date, type, category)
+        ) WITHOUT ROWID
+    """)
+
+
+# Tablas que se sincronizan entre bases de datos (ver src/utils/sync.py)
+_010_SYNCED = ('savings_goals', 'transactions')
+
+
+def _010_sync_log(conn: sqlite3.Connection):
+    # Registro de cambios por fila para sincronizar dos libros. Cada fila tiene un uid global y la
+    # version de su ultimo cambio: un numero de secuencia local (monotono) para saber que falta por
+    # enviar, y la hora y la replica que lo hicieron para resolver conflictos. Los borrados dejan
+    # la fila como lapida (deleted = 1, row_id NULL) para que tambien se propaguen.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_rows (
+            uid TEXT PRIMARY KEY,
+            tbl TEXT NOT NULL,
+            row_id INTEGER,
+            seq INTEGER NOT NULL,
+            modified_at TEXT NOT NULL,
+            origin TEXT NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            UNIQUE (tbl, row_id)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sync_rows_seq ON sync_rows (seq)")
+    # paused = 1 mientras se aplican cambios que no deben registrarse (los que llegan de otra replica)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            replica TEXT NOT NULL,
+            seq INTEGER NOT NULL DEFAULT 0,
+            paused INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO sync_state (id, replica) VALUES (1, lower(hex(randomblob(8))))")
+    # Hasta que secuencia de cada replica se ha recibido ya
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_peers (
+            replica TEXT PRIMARY KEY,
+            last_seq INTEGER NOT NULL DEFAULT 0,
+            synced_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    now = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+    replica = "(SELECT replica FROM sync_state)"
+    for table in _010_SYNCED:
+        conn.execute(f"""
+            INSERT INTO sync_rows (uid, tbl, row_id, seq, modified_at, origin)
+            SELECT lower(hex(randomblob(16))), '{table}', id, 0, {now}, {replica} FROM {table}
+        """)
+    conn.execute("UPDATE sync_rows SET seq = rowid")
+    conn.execute("UPDATE sync_state SET seq = (SELECT COALESCE(MAX(seq), 0) FROM sync_rows)")
+
+    bump = "UPDATE sync_state SET seq = seq + 1;"
+    when = "WHEN (SELECT paused FROM sync_state) = 0"
+    for table in _010_SYNCED:
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_sync_{table}_insert AFTER INSERT ON {table}
+            {when}
+            BEGIN
+                {bump}
+                INSERT INTO sync_rows (uid, tbl, row_id, seq, modified_at, origin)
+                VALUES (lower(hex(randomblob(16))), '{table}', NEW.id, (SELECT seq FROM sync_state), {now}, {replica});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_sync_{table}_update AFTER UPDATE ON {table}
+            {when}
+            BEGIN
+                {bump}
+                UPDATE sync_rows SET seq = (SELECT seq FROM sync_state), modified_at = {now}, origin = {replica}
+                WHERE tbl = '{table}' AND row_id = NEW.id;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_sync_{table}_delete AFTER DELETE ON {table}
+            {when}
+            BEGIN
+                {bump}
+                UPDATE sync_rows SET seq = (SELECT seq FROM sync_state), modified_at = {now}, origin = {replica},
+                                     deleted = 1, row_id = NULL
+                WHERE tbl = '{table}' AND row_id = OLD.id;
+            END
+        """)
+
+
+
+def _011_daily_balance(conn: sqlite3.Connection):
+    # Saldo al cierre de cada dia con movimientos (suma acumulada del flujo neto). Los triggers
+    # solo actualizan el neto del dia y apuntan desde que fecha hay que rehacer el acumulado;
+    # Database lo rehace al leer, asi que apuntar al final del libro solo toca la ultima fila
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_balance (
+            date TEXT PRIMARY KEY,
+            net REAL NOT NULL DEFAULT 0,
+            balance REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS balance_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            dirty_from TEXT
+        )
+    """)
+    conn.execute("DELETE FROM daily_balance")
+    conn.execute("""
+        INSERT INTO daily_balance (date, net)
+        SELECT date, SUM(CASE WHEN type = 'ingreso' THEN amount ELSE -amount END)
+        FROM (SELECT date, type, amount FROM transactions
+              UNION ALL
+              SELECT date, type, total FROM archive_totals)
+        GROUP BY date
+    """)
+    conn.execute("INSERT OR REPLACE INTO balance_state (id, dirty_from) VALUES (1, (SELECT MIN(date) FROM daily_balance))")
+
+    def add(row: str, sign: str) -> str:
+        return f"""
+            INSERT INTO daily_balance (date, net)
+            VALUES ({row}.date, {sign}CASE WHEN {row}.type = 'ingreso' THEN {row}.amount ELSE -{row}.amount END)
+            ON CONFLICT (date) DO UPDATE SET net = net + excluded.net;
+            UPDATE balance_state SET dirty_from = MIN(COALESCE(dirty_from, {row}.date), {row}.date);
+        """
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_balance_insert AFTER INSERT ON transactions
+        BEGIN {add("NEW", "")} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_balance_delete AFTER DELETE ON transactions
+        BEGIN {add("OLD", "-")} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_balance_update AFTER UPDATE OF type, amount, date ON transactions
+        BEGIN {add("OLD", "-")} {add("NEW", "")} END
+    """)
+
+
+def _rebuild_table(conn: sqlite3.Connection, table: str, create: str, values: dict, keep=None):
+    """
+    Rehace `table` con la definicion `create` (CREATE TABLE <table>_new ...) copiando sus filas:
+    cada columna nueva sale de la expresion de `values`. SQLite no permite cambiar el tipo de una
+    columna. Se conservan los indices, los triggers para los que keep(sql) es cierto y la
+    secuencia de AUTOINCREMENT.
+    """
+    dependents = [r[0] for r in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,)
+    ) if keep is None or keep(r[0])]
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone() \
+        if 'AUTOINCREMENT' in create.upper() else None
+
+    conn.execute(create)
+    conn.execute(f"INSERT INTO {table}_new ({', '.join(values)}) SELECT {', '.join(values.values())} FROM {table}")
+    conn.execute(f"DROP TABLE {table}")
+    # Sin esto SQLite revisa todos los triggers al renombrar y fallan los que usan la tabla borrada
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        conn.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+    for statement in dependents:
+        conn.execute(statement)
+    if sequence is not None:
+        # Los ids borrados no se reutilizan aunque la tabla sea nueva
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table))
+
+
+def _new_table_sql(conn: sqlite3.Connection, table: str) -> str:
+    # Definicion actual de la tabla, renombrada a <table>_new
+    create = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+    return re.sub(rf"^CREATE TABLE\s+\"?{table}\"?", f"CREATE TABLE {table}_new", create, count=1)
+
+
+def _012_julian_day(column: str) -> str:
+    # 'AAAA-MM-DD' -> dia juliano entero; un valor ya convertido se queda igual
+    return f"CAST(julianday({column}) + 0.5 AS INTEGER)"
+
+
+def _012_retype_date(conn: sqlite3.Connection, table: str, column: str = 'date') -> bool:
+    # Pasa `column` a INTEGER (dia juliano). Devuelve False si ya estaba convertida
+    info = [r[1:3] for r in conn.execute(f"PRAGMA table_info({table})")]
+    if dict(info)[column].upper() == 'INTEGER':
+        return False
+    create = re.sub(rf"\b{column}(\s+)TEXT\b", rf"{column}\1INTEGER", _new_table_sql(conn, table), count=1)
+    _rebuild_table(conn, table, create, {c: _012_julian_day(c) if c == column else c for c, _ in info})
+    return True
+
+
+def _012_integer_dates(conn: sqlite3.Connection):
+    # Las fechas pasan de texto 'AAAA-MM-DD' a dia juliano entero: el indice por fecha ocupa menos
+    # y compara enteros. Database convierte en los bordes, fuera sigue siendo 'AAAA-MM-DD'
+    bad = conn.execute("SELECT id, date FROM transactions WHERE julianday(date) IS NULL LIMIT 5").fetchall()
+    if bad:
+        listed = ", ".join(f"{r[0]} ({r[1]!r})" for r in bad)
+        raise ValueError(f"Hay movimientos con fechas no válidas, corrígelas antes de actualizar: {listed}")
+
+    _012_retype_date(conn, 'transactions')
+    _012_retype_date(conn, 'archive_totals')
+    _012_retype_date(conn, 'daily_balance')
+    _012_retype_date(conn, 'balance_state', 'dirty_from')
+
+    # El mes de los totales ya no se puede sacar con substr()
+    for trigger in ('insert', 'delete', 'update'):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_totals_{trigger}")
+    conn.execute("""
+        CREATE TRIGGER trg_totals_insert AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO monthly_category_totals (month, type, category, total, count)
+            VALUES (strftime('%Y-%m', NEW.date), NEW.type, NEW.category, NEW.amount, 1)
+            ON CONFLICT (month, type, category)
+            DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_totals_delete AFTER DELETE ON transactions
+        BEGIN
+            UPDATE monthly_category_totals
+            SET total = total - OLD.amount, count = count - 1
+            WHERE month = strftime('%Y-%m', OLD.date) AND type = OLD.type AND category = OLD.category;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_totals_update AFTER UPDATE OF type, amount, category, date ON transactions
+        BEGIN
+            UPDATE monthly_category_totals
+            SET total = total - OLD.amount, count = count - 1
+            WHERE month = strftime('%Y-%m', OLD.date) AND type = OLD.type AND category = OLD.category;
+            INSERT INTO monthly_category_totals (month, type, category, total, count)
+            VALUES (strftime('%Y-%m', NEW.date), NEW.type, NEW.category, NEW.amount, 1)
+            ON CONFLICT (month, type, category)
+            DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+    """)
+    # El diario guarda imagenes de filas con la fecha en texto
+    conn.execute("DELETE FROM journal_steps")
+
+    # Los años archivados viven en sus propios ficheros
+    for (path,) in conn.execute("SELECT path FROM archives").fetchall():
+        if not os.path.exists(path):
+            continue
+        archive = sqlite3.connect(path)
+        try:
+            with archive:
+                _012_retype_date(archive, 'transactions')
+        finally:
+            archive.close()
+
+
+def _013_categories(conn: sqlite3.Connection):
+    # Catalogo de categorias. Los movimientos y sus totales las referencian por id: filas e indices
+    # ocupan menos, se agrupa por enteros y renombrar una categoria no reescribe el libro.
+    # Presupuestos, reglas repetitivas y ficheros de archivo siguen guardando el nombre
+    if 'category_id' in {r[1] for r in conn.execute("PRAGMA table_info(transactions)")}:
+        return
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            type TEXT NOT NULL CHECK (type IN ('ingreso', 'gasto', 'ahorro')),
+            color TEXT NOT NULL DEFAULT '#6B7280',
+            icon TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT OR IGNORE INTO categories (name, type, color, icon) VALUES (?, ?, ?, ?)",
+        [(name, t_type.value, color, category_icon(name)) for name, t_type, color in DEFAULT_CATEGORIES]
+    )
+    # Las que ya se usan en el libro y no estan en el catalogo
+    used = []
+    for query in ("SELECT category, MIN(type) FROM transactions GROUP BY category",
+                  "SELECT category, MIN(type) FROM archive_totals GROUP BY category",
+                  "SELECT category, MIN(type) FROM recurring_rules GROUP BY category",
+                  "SELECT category, 'gasto' FROM budgets"):
+        used.extend(conn.execute(query).fetchall())
+    conn.executemany("INSERT OR IGNORE INTO categories (name, type, icon) VALUES (?, ?, ?)",
+                     [(name, t_type, category_icon(name)) for name, t_type in used])
+
+    category_id = "(SELECT id FROM categories WHERE name = category)"
+    columns = [r[1] for r in conn.execute("PRAGMA table_info(transactions)")]
+    create = re.sub(r"\bcategory(\s+)TEXT NOT NULL", r"category_id\1INTEGER NOT NULL REFERENCES categories (id)",
+                    _new_table_sql(conn, 'transactions'), count=1)
+    # Los triggers que leen la categoria se vuelven a crear abajo
+    _rebuild_table(conn, 'transactions', create,
+                   {('category_id' if c == 'category' else c): (category_id if c == 'category' else c)
+                    for c in columns},
+                   keep=lambda sql: re.search(r"\bcategory\b", sql) is None)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transactions_category_date ON transactions (category_id, date)")
+
+    # Filas con el nombre de la categoria, para leer y para el indice de texto completo
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS transaction_rows AS
+        SELECT id, type, amount, (SELECT name FROM categories c WHERE c.id = category_id) AS category,
+               description, date, goal_id, content_hash, category_id
+        FROM transactions
+    """)
+    conn.execute("DROP TABLE IF EXISTS transactions_fts")
+    conn.execute("""
+        CREATE VIRTUAL TABLE transactions_fts USING fts5 (
+            description, category,
+            content = 'transaction_rows', content_rowid = 'id',
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """)
+    name = "(SELECT name FROM categories WHERE id = {}.category_id)"
+    conn.execute(f"""
+        CREATE TRIGGER trg_fts_insert AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (rowid, description, category)
+            VALUES (NEW.id, NEW.description, {name.format('NEW')});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_fts_delete AFTER DELETE ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description, category)
+            VALUES ('delete', OLD.id, OLD.description, {name.format('OLD')});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER trg_fts_update AFTER UPDATE OF description, category_id ON transactions
+        BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, description, category)
+            VALUES ('delete', OLD.id, OLD.description, {name.format('OLD')});
+            INSERT INTO transactions_fts (rowid, description, category)
+            VALUES (NEW.id, NEW.description, {name.format('NEW')});
+        END
+    """)
+    conn.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+    # Totales por id de categoria (se recalculan: salen del libro)
+    conn.execute("DROP TABLE monthly_category_totals")
+    conn.execute("""
+        CREATE TABLE monthly_category_totals (
+            month TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category_id INTEGER NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, type, category_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        INSERT INTO monthly_category_totals (month, type, category_id, total, count)
+        SELECT strftime('%Y-%m', date), type, category_id, SUM(amount), COUNT(*)
+        FROM transactions
+        GROUP BY 1, type, category_id
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_totals_insert AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO monthly_category_totals (month, type, category_id, total, count)
+            VALUES (strftime('%Y-%m', NEW.date), NEW.type, NEW.category_id, NEW.amount, 1)
+            ON CONFLICT (month, type, category_id)
+            DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_totals_delete AFTER DELETE ON transactions
+        BEGIN
+            UPDATE monthly_category_totals
+            SET total = total - OLD.amount, count = count - 1
+            WHERE month = strftime('%Y-%m', OLD.date) AND type = OLD.type AND category_id = OLD.category_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER trg_totals_update AFTER UPDATE OF type, amount, category_id, date ON transactions
+        BEGIN
+            UPDATE monthly_category_totals
+            SET total = total - OLD.amount, count = count - 1
+            WHERE month = strftime('%Y-%m', OLD.date) AND type = OLD.type AND category_id = OLD.category_id;
+            INSERT INTO monthly_category_totals (month, type, category_id, total, count)
+            VALUES (strftime('%Y-%m', NEW.date), NEW.type, NEW.category_id, NEW.amount, 1)
+            ON CONFLICT (month, type, category_id)
+            DO UPDATE SET total = total + excluded.total, count = count + 1;
+        END
+    """)
+
+    columns = [r[1] for r in conn.execute("PRAGMA table_info(archive_totals)")]
+    create = re.sub(r"\bcategory(\s+)TEXT NOT NULL", r"category_id\1INTEGER NOT NULL",
+                    _new_table_sql(conn, 'archive_totals'), count=1)
+    create = create.replace("(date, type, category)", "(date, type, category_id)")
+    _rebuild_table(conn, 'archive_totals', create,
+                   {('category_id' if c == 'category' else c): (category_id if c == 'category' else c)
+                    for c in columns})
+
+    _journal_triggers(conn, 'transactions', ('id', 'type', 'amount', 'category_id', 'description', 'date',
+                                             'goal_id', 'content_hash'))
+    # El diario guarda imagenes de filas con el nombre de la categoria
+    conn.execute("DELETE FROM journal_steps")
+
+
+def _014_category_tree(conn: sqlite3.Connection):
+    # Subcategorias ("Vivienda > Alquiler"). category_tree es la tabla de cierre de la jerarquia: una
+    # fila por cada par (antecesor, descendiente), con la de cada categoria consigo misma, para que
+    # el total de un subarbol salga de un solo join indexado con los totales mensuales
+    if 'parent_id' not in {r[1] for r in conn.execute("PRAGMA table_info(categories)")}:
+        conn.execute("ALTER TABLE categories ADD COLUMN parent_id INTEGER REFERENCES categories (id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_categories_parent ON categories (parent_id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS category_tree (
+            ancestor_id INTEGER NOT NULL,
+            descendant_id INTEGER NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor_id, descendant_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_category_tree_descendant ON category_tree (descendant_id, depth)")
+    conn.execute("DELETE FROM category_tree")
+    conn.execute("""
+        INSERT INTO category_tree (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE up (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM categories
+            UNION ALL
+            SELECT c.parent_id, up.descendant_id, up.depth + 1
+            FROM up JOIN categories c ON c.id = up.ancestor_id
+            WHERE c.parent_id IS NOT NULL
+        )
+        SELECT ancestor_id, descendant_id, depth FROM up
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_category_tree_insert AFTER INSERT ON categories
+        BEGIN
+            INSERT INTO category_tree (ancestor_id, descendant_id, depth)
+            SELECT NEW.id, NEW.id, 0
+            UNION ALL
+            SELECT ancestor_id, NEW.id, depth + 1 FROM category_tree WHERE descendant_id = NEW.parent_id;
+        END
+    """)
+    # Una categoria no puede colgar de si misma ni de una de sus descendientes
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_category_tree_cycle BEFORE UPDATE OF parent_id ON categories
+        WHEN NEW.parent_id IS NOT NULL AND EXISTS (
+            SELECT 1 FROM category_tree WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id)
+        BEGIN
+            SELECT RAISE(ABORT, 'La categoría no puede colgar de sí misma ni de una subcategoría suya');
+        END
+    """)
+    # Mover una categoria mueve su subarbol: se sueltan los antecesores antiguos y se enlazan los nuevos
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_category_tree_move AFTER UPDATE OF parent_id ON categories
+        WHEN NEW.parent_id IS NOT OLD.parent_id
+        BEGIN
+            DELETE FROM category_tree
+            WHERE descendant_id IN (SELECT descendant_id FROM category_tree WHERE ancestor_id = NEW.id)
+              AND ancestor_id NOT IN (SELECT descendant_id FROM category_tree WHERE ancestor_id = NEW.id);
+            INSERT INTO category_tree (ancestor_id, descendant_id, depth)
+            SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+            FROM category_tree a, category_tree d
+            WHERE a.descendant_id = NEW.parent_id AND d.ancestor_id = NEW.id;
+        END
+    """)
+
+
+def _015_month_changes(conn: sqlite3.Connection):
+    # Ultima version en la que cambio cada mes. Quien guarda calculos por mes (la salud financiera
+    # de los meses cerrados) solo tiene que rehacerlos si desde su version cambio un mes anterior
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS month_changes (
+            month TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_month_changes_version ON month_changes (version)")
+
+    def touch(row: str) -> str:
+        return f"""
+            INSERT INTO month_changes (month, version)
+            VALUES (strftime('%Y-%m', {row}.date), (SELECT COALESCE(MAX(version), 0) + 1 FROM month_changes))
+            ON CONFLICT (month) DO UPDATE SET version = excluded.version;
+        """
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_month_changes_insert AFTER INSERT ON transactions
+        BEGIN {touch("NEW")} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_month_changes_delete AFTER DELETE ON transactions
+        BEGIN {touch("OLD")} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_month_changes_update AFTER UPDATE OF type, amount, date ON transactions
+        BEGIN {touch("OLD")} {touch("NEW")} END
+    """)
+
+
+def _016_sync_archived(conn: sqlite3.Connection):
+    # Las filas archivadas conservan su uid (archived = 1): un cambio que llegue de otra replica
+    # para una de ellas se reconoce y no se vuelve a insertar en la tabla activa
+    if 'archived' not in {r[1] for r in conn.execute("PRAGMA table_info(sync_rows)")}:
+        conn.execute("ALTER TABLE sync_rows ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
+
+
+MIGRATIONS = [
+    _001_recurring_rules,
+    _002_allocation_rules,
+    _003_budgets,
+    _004_transaction_goal_link,
+    _005_goal_link_backfill,
+    _006_transactions_fts,
+    _007_transaction_content_hash,
+    _008_change_journal,
+    _009_archives,
+    _010_sync_log,
+    _011_daily_balance,
+    _012_integer_dates,
+    _013_categories,
+    _014_category_tree,
+    _015_month_changes,
+    _016_sync_archived,
+]
+
+
+def run_migrations(conn: sqlite3.Connection):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(conn)
+        conn.execute(f"PRAGMA user_version = {number}")
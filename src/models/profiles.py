@@ -0,0 +1,165 @@
+import os
+import re
+import sqlite3
+from collections import OrderedDict
+from src.models.database import Database, MAX_ATTACHED, TYPE_TO_DB
+
+DEFAULT_PROFILE = "Principal"
+# Nombres validos de perfil: se usan tal cual como nombre de archivo
+PROFILE_NAME = re.compile(r"[\w][\w -]{0,39}")
+# Las bases de archivo de cada perfil viven en la misma carpeta y no son perfiles
+ARCHIVE_FILE = re.compile(r".+_archive_\d{4}\.db")
+
+
+class ProfileRegistry:
+    # Cada perfil es su propio archivo SQLite con su propio pool de conexiones. El perfil
+    # principal sigue siendo mintly.db; el resto van en la carpeta 'profiles' junto a el.
+    # Solo se mantienen abiertos los `max_open` perfiles usados mas recientemente.
+    def __init__(self, db_name: str = "mintly.db", pool_size: int = 4, max_open: int = 4):
+        self.default_path = db_name
+        self.profiles_dir = os.path.join(os.path.dirname(os.path.abspath(db_name)), "profiles")
+        self.pool_size = pool_size
+        self.max_open = max(1, max_open)
+        self._open = OrderedDict()
+
+    def path(self, name: str) -> str:
+        if name == DEFAULT_PROFILE:
+            return self.default_path
+        return os.path.join(self.profiles_dir, f"{name}.db")
+
+    def list_profiles(self) -> list:
+        names = []
+        if os.path.isdir(self.profiles_dir):
+            names = sorted(
+                n[:-3] for n in os.listdir(self.profiles_dir)
+                if n.endswith(".db") and not ARCHIVE_FILE.fullmatch(n)
+            )
+        return [DEFAULT_PROFILE] + names
+
+    def exists(self, name: str) -> bool:
+        return name == DEFAULT_PROFILE or os.path.exists(self.path(name))
+
+    def get(self, name: str = DEFAULT_PROFILE, create: bool = False) -> Database:
+        """Devuelve la base de datos del perfil, abriendola (y migrandola) si hace falta."""
+        db = self._open.get(name)
+        if db is not None:
+            self._open.move_to_end(name)
+            return db
+        if not create and not self.exists(name):
+            raise KeyError(f"No existe el perfil '{name}'")
+
+        db = Database(self.path(name), self.pool_size)
+        self._open[name] = db
+        # El perfil menos usado cierra su pool; si se vuelve a pedir se abre de nuevo
+        while len(self._open) > self.max_open:
+            _, oldest = self._open.popitem(last=False)
+            oldest.close()
+        return db
+
+    def create_profile(self, name: str) -> Database:
+        name = name.strip()
+        if not PROFILE_NAME.fullmatch(name) or ARCHIVE_FILE.fullmatch(f"{name}.db"):
+            raise ValueError(f"Nombre de perfil no válido: '{name}'")
+        if self.exists(name):
+            raise ValueError(f"Ya existe el perfil '{name}'")
+        os.makedirs(self.profiles_dir, exist_ok=True)
+        # Abrir la base de datos crea el archivo con el esquema completo
+        return self.get(name, create=True)
+
+    def delete_profile(self, name: str):
+        if name == DEFAULT_PROFILE:
+            raise ValueError("El perfil principal no se puede borrar")
+        db = self._open.pop(name, None)
+        if db is not None:
+            db.close()
+        path = self.path(name)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    def close(self):
+        for db in self._open.values():
+            db.close()
+        self._open.clear()
+
+    def get_combined_summary(self, start: str = None, end: str = None, names: list = None) -> dict:
+        """
+        Totales de ingresos, gastos y ahorros de cada perfil y de todos juntos, calculados en
+        SQLite adjuntando los archivos de los perfiles (sin cargar sus movimientos en Python).
+        """
+        names = names or self.list_profiles()
+        empty = {'total_income': 0.0, 'total_expense': 0.0, 'total_savings': 0.0}
+        profiles = {name: dict(empty) for name in names}
+        keys = {'ingreso': 'total_income', 'gasto': 'total_expense', 'ahorro': 'total_savings'}
+
+        for name, t_type, total in self._attached_query(names, self._summary_arm, start, end):
+            profiles[name][keys[t_type]] += total
+
+        combined = dict(empty)
+        for totals in profiles.values():
+            for key in empty:
+                combined[key] += totals[key]
+        for totals in list(profiles.values()) + [combined]:
+            totals['balance'] = totals['total_income'] - totals['total_expense'] - totals['total_savings']
+        return {'profiles': profiles, 'total': combined}
+
+    def get_combined_category_totals(self, t_type: str = 'gasto', start: str = None, end: str = None,
+                                     names: list = None) -> dict:
+        """Totales por categoria sumando todos los perfiles."""
+        totals = {}
+        rows = self._attached_query(names or self.list_profiles(), self._category_arm, start, end,
+                                    (TYPE_TO_DB[t_type],))
+        for _, category, total in rows:
+            totals[category] = totals.get(category, 0.0) + total
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    @staticmethod
+    def _summary_arm(schema: str, has_archive: bool, has_categories: bool) -> str:
+        query = f"SELECT type, amount, date FROM {schema}.transactions"
+        if has_archive:
+            query += f" UNION ALL SELECT type, total, date FROM {schema}.archive_totals"
+        return f"SELECT type, SUM(amount) FROM ({query}) WHERE date(date) BETWEEN ? AND ? GROUP BY type"
+
+    @staticmethod
+    def _category_arm(schema: str, has_archive: bool, has_categories: bool) -> str:
+        if has_categories:
+            # Perfil ya migrado: la categoria es un id del catalogo del propio perfil
+            name = f"(SELECT name FROM {schema}.categories c WHERE c.id = category_id)"
+            query = f"SELECT type, amount, {name} AS category, date FROM {schema}.transactions"
+            if has_archive:
+                query += f" UNION ALL SELECT type, total, {name}, date FROM {schema}.archive_totals"
+        else:
+            query = f"SELECT type, amount, category, date FROM {schema}.transactions"
+            if has_archive:
+                query += f" UNION ALL SELECT type, total, category, date FROM {schema}.archive_totals"
+        return (f"SELECT category, SUM(amount) FROM ({query}) "
+                f"WHERE date(date) BETWEEN ? AND ? AND type = ? GROUP BY category")
+
+    def _attached_query(self, names: list, arm, start: str, end: str, params: tuple = ()):
+        # Conexion aparte en memoria: los perfiles se adjuntan en solo lectura, de MAX_ATTACHED
+        # en MAX_ATTACHED, y cada consulta devuelve solo los totales ya agrupados
+        # Se filtra por date(date): vale tanto para perfiles con la fecha en texto (aun sin
+        # migrar, se adjuntan en solo lectura) como para los que ya la guardan como dia juliano
+        start, end = start or "0000-01-01", end or "9999-12-31"
+        paths = [(name, self.path(name)) for name in names if os.path.exists(self.path(name))]
+        conn = sqlite3.connect(":memory:", uri=True)
+        try:
+            for i in range(0, len(paths), MAX_ATTACHED):
+                chunk = paths[i:i + MAX_ATTACHED]
+                for n, (_, path) in enumerate(chunk):
+                    uri = "file:" + os.path.abspath(path).replace("?", "%3f") + "?mode=ro"
+                    conn.execute(f"ATTACH DATABASE ? AS profile_{n}", (uri,))
+                try:
+                    for n, (name, _) in enumerate(chunk):
+                        schema = f"profile_{n}"
+                        tables = {r[0] for r in conn.execute(
+                            f"SELECT name FROM {schema}.sqlite_master WHERE name IN ('archive_totals', 'categories')"
+                        )}
+                        arm_sql = arm(schema, 'archive_totals' in tables, 'categories' in tables)
+                        for row in conn.execute(arm_sql, (start, end) + params):
+                            yield (name,) + tuple(row)
+                finally:
+                    for n in range(len(chunk)):
+                        conn.execute(f"DETACH DATABASE profile_{n}")
+        finally:
+            conn.close()
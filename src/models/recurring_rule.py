@@ -0,0 +1,73 @@
+import calendar
+from datetime import date, timedelta
+from enum import Enum
+from typing import Optional
+from src.models.transaction import Transaction, TransactionType
+
+
+class Frequency(Enum):
+    DAILY = "diaria"
+    WEEKLY = "semanal"
+    MONTHLY = "mensual"
+    YEARLY = "anual"
+
+
+class RecurringRule:
+    # Nominas, alquiler, suscripciones... se generan solas en vez de meterlas a mano cada mes
+    def __init__(self, transaction_type: TransactionType, amount: float, category: str,
+                 description: str, frequency: Frequency, start_date: str, interval: int = 1,
+                 end_date: Optional[str] = None, next_index: int = 0, active: bool = True,
+                 rule_id: Optional[int] = None):
+        self.id = rule_id
+        self.transaction_type = transaction_type
+        self.amount = float(amount)
+        self.category = category
+        self.description = description
+        self.frequency = frequency
+        self.start_date = start_date
+        self.interval = max(1, int(interval))
+        self.end_date = end_date
+        self.next_index = next_index
+        self.active = active
+
+    def occurrence_date(self, index: int) -> str:
+        """
+        Fecha de la ocurrencia numero `index` contada siempre desde la fecha de inicio,
+        asi una regla del dia 31 cae el 28/29 en febrero y vuelve al 31 en marzo.
+        """
+        start = date.fromisoformat(self.start_date)
+        step = index * self.interval
+
+        if self.frequency == Frequency.DAILY:
+            return (start + timedelta(days=step)).isoformat()
+        if self.frequency == Frequency.WEEKLY:
+            return (start + timedelta(weeks=step)).isoformat()
+
+        months = step * 12 if self.frequency == Frequency.YEARLY else step
+        year, month = divmod(start.month - 1 + months, 12)
+        year += start.year
+        month += 1
+        day = min(start.day, calendar.monthrange(year, month)[1])
+        return date(year, month, day).isoformat()
+
+    @property
+    def next_due(self) -> Optional[str]:
+        due = self.occurrence_date(self.next_index)
+        if self.end_date and due > self.end_date:
+            return None
+        return due
+
+    def due_dates(self, until: str) -> list:
+        """Fechas pendientes desde la siguiente ocurrencia hasta `until` (incluido)."""
+        dates = []
+        index = self.next_index
+        limit = min(until, self.end_date) if self.end_date else until
+        due = self.occurrence_date(index)
+        while due <= limit:
+            dates.append(due)
+            index += 1
+            due = self.occurrence_date(index)
+        return dates
+
+    def to_transaction(self, on_date: str) -> Transaction:
+        return Transaction(self.transaction_type, self.amount, self.category, self.description, on_date)
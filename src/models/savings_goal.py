@@ -1,7 +1,6 @@
 from typing import Optional
 
 class SavingsGoal:
-    # Features [proximas]: ahorro automatico desde el registro de un ingreso
     def __init__(self, name: str, target_amount: float,
                  current_amount: float = 0.0, deadline: Optional[str] = None,
                  description: str = "", goal_id: Optional[int] = None):
@@ -1,14 +1,73 @@
+import hashlib
+from calendar import monthrange
+from datetime import date as _date
 from enum import Enum
 from dataclasses import dataclass
 from typing import Optional
 
+SAVINGS_CATEGORY = "💰 Ahorro"
+
+# Las fechas se guardan como numero de dia juliano (entero): ocupan menos que el texto, se
+# comparan como enteros y SQLite las entiende tal cual en date() y strftime()
+JULIAN_OFFSET = 1721425
+
+
+def parse_date(value) -> str:
+    """Fecha 'AAAA-MM-DD' comprobada (tambien acepta un date). Lanza ValueError si no es valida."""
+    if isinstance(value, _date):
+        return _date(value.year, value.month, value.day).isoformat()
+    text = str(value).strip()
+    if len(text) == 10 and text[4] == text[7] == "-":
+        try:
+            return _date.fromisoformat(text).isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"Fecha no válida (AAAA-MM-DD): {value!r}")
+
+
+def day_number(value) -> int:
+    """'AAAA-MM-DD' -> dia juliano con el que se guarda en la base de datos."""
+    return _date.fromisoformat(parse_date(value)).toordinal() + JULIAN_OFFSET
+
+
+def iso_date(day: int) -> str:
+    return _date.fromordinal(day - JULIAN_OFFSET).isoformat()
+
+
+def month_day_range(start_month: str, end_month: str) -> tuple:
+    """Primer dia de `start_month` y ultimo de `end_month` ('AAAA-MM') como dias julianos."""
+    first = _date(int(start_month[:4]), int(start_month[5:7]), 1)
+    year, month = int(end_month[:4]), int(end_month[5:7])
+    last = _date(year, month, monthrange(year, month)[1])
+    return first.toordinal() + JULIAN_OFFSET, last.toordinal() + JULIAN_OFFSET
+
+
+def _normalize_text(value) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def content_hash(date: str, amount: float, category: str, description: str) -> int:
+    """
+    Huella del contenido de un movimiento para detectar duplicados. Se normaliza antes
+    (importe a centimos, espacios y mayusculas) para que "Café  " y "café" cuenten como iguales.
+    Es un entero de 64 bits para que la columna y su indice ocupen poco.
+    """
+    normalized = "\x1f".join((
+        str(date).strip()[:10],
+        f"{round(float(amount), 2):.2f}",
+        _normalize_text(category),
+        _normalize_text(description)
+    ))
+    digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
 class TransactionType(Enum):
     # Trabajar con diccionarios me ha ayudado a desarrollar mejor la aplicacion
     INCOME = "ingreso"
     EXPENSE = "gasto"
     SAVINGS = "ahorro"
 
-@dataclass
+@dataclass(slots=True)
 class Transaction:
     transaction_type: TransactionType
     amount: float
@@ -16,6 +75,11 @@ class Transaction:
     description: str
     date: str
     transaction_id: Optional[int] = None
+    goal_id: Optional[int] = None
+
+    def __post_init__(self):
+        # Una fecha mal escrita romperia el orden y los rangos por fecha
+        self.date = parse_date(self.date)
 
     @property
     def id(self):
@@ -30,25 +94,60 @@ class Transaction:
     def is_savings(self):
         return self.transaction_type == TransactionType.SAVINGS
 
-    INCOME_CATEGORIES = {
-        "💼 Salario": "#10B981",
-        "📈 Inversiones": "#3B82F6",
-        "🎁 Regalos": "#F59E0B",
-        "💰 Otros": "#6B7280"
-    }
-
-    EXPENSE_CATEGORIES = {
-        "🏠 Vivienda": "#EF4444",
-        "🛒 Alimentación": "#F59E0B",
-        "🚌 Transporte": "#3B82F6",
-        "🎬 Ocio": "#8B5CF6",
-        "🏥 Salud": "#10B981",
-        "🛍️ Compras": "#EC4899",
-        "💰 Ahorro": "#8E44AD",
-        "❓ Otros": "#6B7280"
-    }
-
-    def get_color(self):
-        if self.is_income():
-            return self.INCOME_CATEGORIES.get(self.category, "#6B7280")
-        return self.EXPENSE_CATEGORIES.get(self.category, "#6B7280")
\ No newline at end of file
+
+class TransactionColumns:
+    """
+    Resultado en columnas (listas paralelas) para consumidores masivos como la exportacion
+    o los graficos: evita crear un objeto Transaction por cada fila del libro.
+    """
+    __slots__ = ('ids', 'types', 'amounts', 'categories', 'descriptions', 'dates', 'goal_ids')
+
+    def __init__(self, ids=(), types=(), amounts=(), categories=(), descriptions=(), dates=(), goal_ids=()):
+        self.ids = ids
+        self.types = types
+        self.amounts = amounts
+        self.categories = categories
+        self.descriptions = descriptions
+        self.dates = dates
+        self.goal_ids = goal_ids
+
+    @classmethod
+    def from_rows(cls, rows: list) -> "TransactionColumns":
+        # rows: (id, type, amount, category, description, date, goal_id)
+        if not rows:
+            return cls()
+        ids, types, amounts, categories, descriptions, dates, goal_ids = zip(*rows)
+        # Tipos, categorias y fechas se repiten mucho: se comparte una sola copia de cada valor
+        shared = {}
+        return cls(
+            ids,
+            tuple(shared.setdefault(v, v) for v in types),
+            amounts,
+            tuple(shared.setdefault(v, v) for v in categories),
+            descriptions,
+            tuple(shared.setdefault(v, v) for v in dates),
+            goal_ids
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rows(self):
+        return zip(self.ids, self.types, self.amounts, self.categories, self.descriptions, self.dates, self.goal_ids)
+
+    def to_numpy(self):
+        """Array estructurado de NumPy (fechas como datetime64[D]) para calculos vectorizados."""
+        import numpy as np
+
+        dtype = [('id', 'i8'), ('type', 'U7'), ('amount', 'f8'), ('category', 'O'),
+                 ('description', 'O'), ('date', 'datetime64[D]'), ('goal_id', 'i8')]
+        array = np.empty(len(self), dtype=dtype)
+        if len(self):
+            array['id'] = self.ids
+            array['type'] = self.types
+            array['amount'] = self.amounts
+            array['category'] = self.categories
+            array['description'] = self.descriptions
+            array['date'] = self.dates
+            array['goal_id'] = [g if g is not None else -1 for g in self.goal_ids]
+        return array
@@ -0,0 +1,160 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+SNAPSHOT_SUFFIX = ".db.gz"
+# Paginas copiadas por paso: entre paso y paso SQLite suelta el bloqueo y la app puede seguir escribiendo
+PAGES_PER_STEP = 256
+STEP_SLEEP = 0.005
+
+
+class BackupManager:
+    # Copias de seguridad en caliente con la API de backup de SQLite: a diferencia de copiar el
+    # archivo, la copia siempre es consistente aunque la app este escribiendo (WAL incluido).
+    # Cada snapshot se comprueba con integrity_check antes de comprimirse y se guardan los ultimos `keep`
+    def __init__(self, db, backup_dir: str = None, keep: int = 7):
+        self.db = db
+        if backup_dir is None:
+            base = os.path.dirname(os.path.abspath(db.db_name)) if db.db_name != ":memory:" else os.getcwd()
+            backup_dir = os.path.join(base, "backups")
+        self.backup_dir = backup_dir
+        self.keep = keep
+        name = os.path.basename(db.db_name) if db.db_name != ":memory:" else "mintly"
+        self.prefix = os.path.splitext(name)[0] or "mintly"
+
+    def list_snapshots(self) -> list:
+        """Rutas de los snapshots de esta base de datos, del mas reciente al mas antiguo."""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = [
+            n for n in os.listdir(self.backup_dir)
+            if n.startswith(self.prefix + "-") and n.endswith(SNAPSHOT_SUFFIX)
+        ]
+        return [os.path.join(self.backup_dir, n) for n in sorted(names, reverse=True)]
+
+    def last_snapshot_time(self):
+        snapshots = self.list_snapshots()
+        return datetime.fromtimestamp(os.path.getmtime(snapshots[0])) if snapshots else None
+
+    def create_snapshot(self, progress=None) -> str:
+        """
+        Copia la base de datos por pasos, verifica la copia, la comprime y rota las antiguas.
+        `progress(restantes, total)` se llama tras cada paso. Devuelve la ruta del snapshot.
+        """
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        target = os.path.join(self.backup_dir, f"{self.prefix}-{stamp}{SNAPSHOT_SUFFIX}")
+
+        fd, raw_path = tempfile.mkstemp(suffix=".db", dir=self.backup_dir)
+        os.close(fd)
+        try:
+            dest = sqlite3.connect(raw_path)
+            try:
+                source = self.db.pool.acquire()
+                try:
+                    source.backup(dest, pages=PAGES_PER_STEP, sleep=STEP_SLEEP,
+                                  progress=(lambda status, remaining, total: progress(remaining, total))
+                                  if progress else None)
+                finally:
+                    self.db.pool.release(source)
+                # El snapshot es un archivo suelto: sin WAL para que se pueda abrir en cualquier sitio
+                dest.execute("PRAGMA journal_mode=DELETE")
+                errors = self._integrity_errors(dest)
+            finally:
+                dest.close()
+            if errors:
+                raise sqlite3.DatabaseError(f"La copia no supera la comprobación de integridad: {errors[0]}")
+
+            partial = target + ".partial"
+            with open(raw_path, "rb") as src, gzip.open(partial, "wb", compresslevel=6) as out:
+                shutil.copyfileobj(src, out)
+            os.replace(partial, target)
+        finally:
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+
+        self.rotate()
+        return target
+
+    def snapshot_if_due(self, max_age: timedelta = timedelta(days=1), progress=None):
+        """Crea un snapshot si el ultimo es mas antiguo que `max_age`. Devuelve la ruta o None."""
+        last = self.last_snapshot_time()
+        if last is not None and datetime.now() - last < max_age:
+            return None
+        return self.create_snapshot(progress)
+
+    def rotate(self) -> list:
+        removed = self.list_snapshots()[self.keep:]
+        for path in removed:
+            os.remove(path)
+        return removed
+
+    def verify(self, path: str) -> dict:
+        """Descomprime el snapshot en un temporal y pasa integrity_check."""
+        try:
+            raw_path = self._decompress(path)
+        except sqlite3.DatabaseError as e:
+            return {'ok': False, 'errors': [str(e)], 'transactions': None, 'user_version': None}
+        try:
+            conn = sqlite3.connect(raw_path)
+            try:
+                errors = self._integrity_errors(conn)
+                transactions = None
+                if not errors:
+                    transactions = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+            except sqlite3.DatabaseError as e:
+                errors, transactions, version = [str(e)], None, None
+            finally:
+                conn.close()
+        finally:
+            os.remove(raw_path)
+        return {'ok': not errors, 'errors': errors, 'transactions': transactions, 'user_version': version}
+
+    def restore(self, path: str, safety_snapshot: bool = True) -> str:
+        """
+        Sustituye el contenido de la base de datos por el del snapshot, tambien con la API de
+        backup (las conexiones del pool siguen siendo validas). Antes se verifica el snapshot y se
+        guarda una copia del estado actual. Devuelve la ruta de esa copia (o None).
+        """
+        check = self.verify(path)
+        if not check['ok']:
+            raise sqlite3.DatabaseError(f"El snapshot está dañado: {check['errors'][0]}")
+
+        previous = self.create_snapshot() if safety_snapshot else None
+        raw_path = self._decompress(path)
+        try:
+            source = sqlite3.connect(raw_path)
+            try:
+                target = self.db.pool.acquire()
+                try:
+                    source.backup(target, pages=PAGES_PER_STEP, sleep=STEP_SLEEP)
+                finally:
+                    self.db.pool.release(target)
+            finally:
+                source.close()
+        finally:
+            os.remove(raw_path)
+
+        # Un snapshot antiguo puede venir de una version anterior del esquema
+        self.db.ensure_schema()
+        return previous
+
+    def _decompress(self, path: str) -> str:
+        fd, raw_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        try:
+            with gzip.open(path, "rb") as src, open(raw_path, "wb") as out:
+                shutil.copyfileobj(src, out)
+        except (OSError, EOFError):
+            os.remove(raw_path)
+            raise sqlite3.DatabaseError(f"No se puede leer el snapshot: {path}") from None
+        return raw_path
+
+    @staticmethod
+    def _integrity_errors(conn: sqlite3.Connection) -> list:
+        rows = [r[0] for r in conn.execute("PRAGMA integrity_check").fetchall()]
+        return [] if rows == ["ok"] else rows
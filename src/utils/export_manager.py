@@ -1,14 +1,21 @@
 import csv
 from datetime import datetime
-from typing import List
-from src.models.transaction import Transaction
+from typing import List, Union
+from src.models.transaction import Transaction, TransactionType, TransactionColumns
+
+TYPE_LABELS = {'ingreso': 'Ingreso', 'gasto': 'Gasto', 'ahorro': 'Ahorro'}
+LABEL_TYPES = {
+    'Ingreso': TransactionType.INCOME,
+    'Gasto': TransactionType.EXPENSE,
+    'Ahorro': TransactionType.SAVINGS
+}
 
 class ExportManager:
     # Feature [proxima]: Que el usuario pueda meter archivos csv o xlsx contables para que el sistema meta los datos automaticamente
     # Feature [proxima]: Que el usuario mediante los tickets/recibos pueda meter los gatos directamente con un lector de recibos
     @staticmethod
     def export_to_csv(
-            transactions: List[Transaction],
+            transactions: Union[List[Transaction], TransactionColumns],
             filename: str,
             goals: list = None
     ) -> bool:
@@ -18,21 +25,23 @@ class ExportManager:
 
                 writer.writerow(['FECHA', 'TIPO', 'CATEGORIA', 'MONTO', 'DESCRIPCION'])
 
-                for trans in transactions:
-                    if trans.is_income():
-                        tipo = 'Ingreso'
-                    elif trans.is_savings():
-                        tipo = 'Ahorro'
-                    else:
-                        tipo = 'Gasto'
-
-                    writer.writerow([
-                        trans.date,
-                        tipo,
-                        trans.category,
-                        f"{trans.amount:.2f}",
-                        trans.description
-                    ])
+                if isinstance(transactions, TransactionColumns):
+                    # Modo columnar: se escribe directamente desde las listas sin crear objetos
+                    writer.writerows(
+                        (t_date, TYPE_LABELS.get(t_type, 'Gasto'), category, f"{amount:.2f}", description)
+                        for t_date, t_type, amount, category, description in zip(
+                            transactions.dates, transactions.types, transactions.amounts,
+                            transactions.categories, transactions.descriptions)
+                    )
+                else:
+                    for trans in transactions:
+                        writer.writerow([
+                            trans.date,
+                            TYPE_LABELS.get(trans.transaction_type.value, 'Gasto'),
+                            trans.category,
+                            f"{trans.amount:.2f}",
+                            trans.description
+                        ])
 
                 if goals:
                     writer.writerow([])
@@ -55,6 +64,29 @@ class ExportManager:
             print(f"Error exportando CSV: {e}")
             return False
 
+    @staticmethod
+    def import_from_csv(filename: str) -> List[Transaction]:
+        """
+        Lee un CSV con el formato de export_to_csv (FECHA, TIPO, CATEGORIA, MONTO, DESCRIPCION).
+        Se detiene en la seccion de metas y salta las filas que no se pueden interpretar.
+        """
+        transactions = []
+        with open(filename, newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if not row or row[0].startswith('---'):
+                    break
+                try:
+                    t_date, tipo, category, amount, description = row[:5]
+                    datetime.strptime(t_date, "%Y-%m-%d")
+                    transactions.append(Transaction(
+                        LABEL_TYPES[tipo], float(amount.replace(',', '.')), category, description, t_date
+                    ))
+                except (ValueError, KeyError):
+                    print(f"Fila ignorada al importar: {row}")
+        return transactions
+
     @staticmethod
     def export_to_pdf(
             transactions: List[Transaction],
@@ -0,0 +1,94 @@
+from datetime import date
+import numpy as np
+
+# Proyeccion del balance a partir del historico diario. Todo se calcula con operaciones
+# vectorizadas de NumPy: no hay bucles de Python por dia, asi que años de datos tardan milisegundos.
+
+DEFAULT_WINDOW = 90
+DAY = np.timedelta64(1, 'D')
+
+
+def load_daily_flows(db) -> tuple:
+    """Flujo neto por dia (ingresos - gastos - ahorros) en dos arrays: fechas y montos."""
+    rows = db.get_daily_net_flows()
+    dates = np.array([r[0] for r in rows], dtype='datetime64[D]')
+    net = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+    return dates, net
+
+
+def to_daily_series(dates: np.ndarray, net: np.ndarray, end=None) -> tuple:
+    """Serie continua desde el primer dia con datos hasta `end`, con ceros en los dias sin movimientos."""
+    start = dates[0]
+    end = max(dates[-1], np.datetime64(end, 'D')) if end is not None else dates[-1]
+    offsets = ((dates - start) / DAY).astype(np.int64)
+    return start, np.bincount(offsets, weights=net, minlength=int((end - start) / DAY) + 1)
+
+
+def rolling_mean(series: np.ndarray, window: int) -> np.ndarray:
+    # Los primeros dias (menos que la ventana) usan la media de lo que hay hasta ese punto
+    csum = np.concatenate(([0.0], np.cumsum(series)))
+    idx = np.arange(1, series.size + 1)
+    lower = np.maximum(idx - window, 0)
+    return (csum[idx] - csum[lower]) / (idx - lower)
+
+
+def weekdays(days: np.ndarray) -> np.ndarray:
+    # El 1970-01-01 fue jueves; con +3 el lunes queda como 0
+    return (days.astype(np.int64) + 3) % 7
+
+
+def months_of_year(days: np.ndarray) -> np.ndarray:
+    return days.astype('datetime64[M]').astype(np.int64) % 12
+
+
+def seasonal_effect(keys: np.ndarray, series: np.ndarray, size: int) -> np.ndarray:
+    """Desviacion media de cada dia de la semana / mes respecto a la media global (aditiva)."""
+    counts = np.bincount(keys, minlength=size)
+    sums = np.bincount(keys, weights=series, minlength=size)
+    means = np.divide(sums, counts, out=np.zeros(size), where=counts > 0)
+    return np.where(counts > 0, means - series.mean(), 0.0)
+
+
+def forecast_balance(dates: np.ndarray, net: np.ndarray, months: int = 6,
+                     window: int = DEFAULT_WINDOW, today=None) -> dict:
+    today = np.datetime64(today or date.today(), 'D')
+    if dates.size == 0:
+        return {
+            'history_dates': np.array([], dtype='datetime64[D]'), 'history_balance': np.array([]),
+            'rolling': np.array([]), 'dates': np.array([], dtype='datetime64[D]'),
+            'balance': np.array([]), 'daily_mean': 0.0, 'current_balance': 0.0
+        }
+
+    start, series = to_daily_series(dates, net, end=today)
+    days = start + np.arange(series.size)
+    balance = np.cumsum(series)
+
+    weekday_eff = seasonal_effect(weekdays(days), series, 7)
+    month_eff = seasonal_effect(months_of_year(days), series, 12)
+
+    # Nivel reciente sin la estacionalidad, para no arrastrar el efecto del mes actual
+    recent = slice(max(0, series.size - window), series.size)
+    recent_days = days[recent]
+    level = np.mean(
+        series[recent] - weekday_eff[weekdays(recent_days)] - month_eff[months_of_year(recent_days)]
+    )
+
+    month_start = today.astype('datetime64[M]')
+    horizon_end = (month_start + months).astype('datetime64[D]') + (today - month_start.astype('datetime64[D]'))
+    future = today + np.arange(1, int((horizon_end - today) / DAY) + 1)
+    future_flow = level + weekday_eff[weekdays(future)] + month_eff[months_of_year(future)]
+
+    return {
+        'history_dates': days,
+        'history_balance': balance,
+        'rolling': rolling_mean(series, 30),
+        'dates': future,
+        'balance': balance[-1] + np.cumsum(future_flow),
+        'daily_mean': float(level),
+        'current_balance': float(balance[-1])
+    }
+
+
+def forecast_from_db(db, months: int = 6, window: int = DEFAULT_WINDOW, today=None) -> dict:
+    dates, net = load_daily_flows(db)
+    return forecast_balance(dates, net, months, window, today)
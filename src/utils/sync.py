@@ -0,0 +1,44 @@
+from src.models.database import SYNCED_TABLES
+
+# Cambios que se leen y aplican por transaccion
+SYNC_BATCH = 5000
+
+
+def sync_databases(local, remote, batch: int = SYNC_BATCH) -> dict:
+    """
+    Sincroniza dos libros en los dos sentidos intercambiando solo los cambios posteriores al
+    ultimo punto de sincronizacion entre ellos. Al terminar los dos tienen las mismas metas y
+    movimientos. Devuelve cuantos cambios se han recibido, enviado y descartado por conflicto.
+    """
+    copied = local.get_replica_id() == remote.get_replica_id()
+    if copied:
+        # Una copia del archivo comparte replica: se le da otra para distinguir sus cambios. Lo
+        # que ya hubiera cambiado en la copia lleva el id antiguo, asi que esta vez no se filtra
+        # por origen (lo que ya tienen los dos se descarta igualmente por tener la misma version)
+        remote.reset_replica_id()
+
+    received, discarded_local = _pull(local, remote, batch, not copied)
+    sent, discarded_remote = _pull(remote, local, batch, not copied)
+    return {'received': received, 'sent': sent, 'conflicts': discarded_local + discarded_remote}
+
+
+def _pull(target, source, batch: int, skip_own: bool = True) -> tuple:
+    source_id = source.get_replica_id()
+    since = target.get_sync_point(source_id)
+    # Lo que cambie en `source` mientras tanto ya ira en la siguiente sincronizacion
+    until = source.get_sync_seq()
+    target_id = target.get_replica_id() if skip_own else None
+
+    applied = skipped = 0
+    for table in SYNCED_TABLES:
+        cursor = since
+        while True:
+            changes = source.get_changes(table, cursor, until, target_id, batch)
+            if not changes:
+                break
+            done, ignored = target.apply_changes(changes)
+            applied += done
+            skipped += ignored
+            cursor = changes[-1]['seq']
+    target.end_sync(source_id, until, applied > 0)
+    return applied, skipped
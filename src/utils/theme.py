@@ -0,0 +1,152 @@
+from string import Template
+
+COLORS = {
+    "bg": "#0F172A",
+    "surface": "#1E293B",
+    "surface_hover": "#334155",
+    "border": "#334155",
+    "border_hover": "#475569",
+    "header": "#2563EB",
+    "primary": "#3B82F6",
+    "success": "#10B981",
+    "danger": "#EF4444",
+    "danger_hover": "#DC2626",
+    "warning": "#F59E0B",
+    "accent": "#8B5CF6",
+    "text_main": "#F8FAFC",
+    "text_soft": "#F1F5F9",
+    "text_dim": "#94A3B8"
+}
+
+# Tonos que se pueden poner con la propiedad dinamica "tone" (widget.setProperty("tone", ...))
+TONES = ("primary", "success", "danger", "warning", "accent", "muted")
+
+# Una sola hoja de estilos para toda la aplicacion. Los widgets no llevan estilo propio: se
+# identifican por objectName y, si cambian de color, por la propiedad "tone". Qt la analiza una
+# vez al arrancar en lugar de una por cada tarjeta que se crea.
+_STYLESHEET = Template("""
+QWidget#dashboard { background-color: $bg; }
+
+QLabel#budgetBanner {
+    background: $surface; color: $warning; border-left: 4px solid $warning;
+    padding: 8px 12px; font-weight: bold; font-size: 12px;
+}
+
+QTabWidget#mainTabs::pane { border: none; background: transparent; }
+QTabWidget#mainTabs QTabBar::tab {
+    background: $surface; color: $text_dim; padding: 12px 30px;
+    border-top-left-radius: 8px; border-top-right-radius: 8px; margin-right: 2px; font-weight: bold;
+}
+QTabWidget#mainTabs QTabBar::tab:selected { background: $primary; color: white; }
+
+QFrame#balanceHeader {
+    background: $header; border-top-left-radius: 16px; border-top-right-radius: 16px;
+}
+QLabel#balanceTitle { color: rgba(255,255,255,0.8); font-weight: bold; font-size: 11px; letter-spacing: 1px; }
+QLabel#balanceAmount { color: white; font-size: 34px; font-weight: 900; }
+
+QFrame#statCard { background: $surface; border-radius: 10px; }
+QLabel#statCardTitle { font-size: 10px; font-weight: bold; }
+QLabel#statCardValue { color: white; font-size: 18px; font-weight: 800; }
+
+QLabel#columnTitle { font-weight: 900; font-size: 13px; }
+QPushButton#columnAddButton { color: $bg; border-radius: 5px; font-weight: 800; font-size: 10px; }
+QPushButton#columnAddButton:hover { background: white; }
+
+QScrollArea#listScroll, QScrollArea#listScroll > QWidget#qt_scrollarea_viewport, QWidget#listBody {
+    background: transparent;
+}
+
+QFrame#transactionCard { background: $surface; border-radius: 10px; }
+QFrame#transactionCard:hover { background: $surface_hover; }
+QLabel#cardIndicator { font-size: 20px; }
+QLabel#cardCategory { color: white; font-weight: 700; font-size: 14px; }
+QLabel#cardDate { color: $text_dim; font-size: 11px; }
+QLabel#transactionAmount { font-weight: 800; font-size: 15px; }
+QLabel#cardBalance { color: $text_dim; font-size: 10px; }
+QPushButton#deleteButton { background: $danger; color: white; border: none; border-radius: 6px; }
+QPushButton#deleteButton:hover { background: $danger_hover; }
+
+QFrame#goalCard { background: $surface; border-radius: 10px; }
+QLabel#goalName { color: white; font-weight: bold; font-size: 13px; }
+QPushButton#goalDepositButton { background: $accent; border-radius: 5px; }
+QProgressBar#goalProgress { background: $bg; border-radius: 2px; }
+QProgressBar#goalProgress::chunk { background: $accent; }
+QLabel#goalProjection { font-size: 10px; }
+
+QLineEdit#searchInput {
+    background: $surface; color: $text_main; border-radius: 8px; padding: 10px; font-size: 13px;
+}
+QComboBox#searchType { background: $surface; color: $text_main; padding: 8px; }
+QLabel#searchStatus { color: $text_dim; font-size: 11px; }
+QPushButton#searchMoreButton {
+    background: $primary; color: white; border-radius: 6px; padding: 8px; font-weight: bold;
+}
+
+QLabel#statsTitle { font-size: 26px; font-weight: 800; color: $text_soft; }
+QFrame#metricCard { background-color: $surface; border: 1px solid $border; border-radius: 12px; }
+QFrame#metricCard:hover { border: 1px solid $border_hover; background-color: #242F42; }
+QLabel#metricTitle { font-size: 11px; color: $text_dim; font-weight: 800; letter-spacing: 0.5px; }
+QLabel#metricValue { font-size: 24px; font-weight: 700; }
+QFrame#ratioCard { background-color: $bg; border: 1px solid $surface; border-radius: 10px; }
+QLabel#ratioTitle { font-size: 11px; color: $text_dim; font-weight: 600; }
+QProgressBar#ratioProgress {
+    background: $bg; border-radius: 9px; text-align: center; color: white; font-weight: 800; font-size: 10px;
+}
+QProgressBar#ratioProgress::chunk { border-radius: 9px; }
+QGroupBox#panel {
+    font-size: 13px; font-weight: 800; color: $text_dim; border: 2px solid $border;
+    border-radius: 12px; margin-top: 20px; background-color: $surface;
+}
+QGroupBox#panel::title { subcontrol-origin: margin; left: 15px; padding: 0 8px; }
+QLabel#healthScore { font-size: 32px; font-weight: 900; color: white; }
+QProgressBar#healthProgress { background: $bg; border-radius: 5px; }
+QProgressBar#healthProgress::chunk {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 $danger, stop:1 $success); border-radius: 5px;
+}
+QLabel#healthMessage { color: $text_soft; font-size: 12px; font-style: italic; }
+QLabel#forecastLabel { color: $text_soft; font-size: 12px; font-weight: bold; }
+QLabel#trendHint { color: $text_dim; font-size: 11px; }
+QTableWidget#pivotTable {
+    background: $bg; color: $text_main; gridline-color: $surface; border: none; font-size: 11px;
+}
+QTableWidget#pivotTable QHeaderView::section {
+    background: $surface; color: $text_dim; border: none; padding: 4px; font-weight: bold;
+}
+QCheckBox#seriesToggle { font-weight: bold; font-size: 12px; }
+
+BalanceCard { background-color: palette(base); border-left: 5px solid $primary; border-radius: 12px; min-height: 140px; }
+BalanceCard:hover { background-color: palette(alternate-base); }
+QLabel#cardTitle, QLabel#cardSubtitle { color: palette(text); }
+
+QTextEdit#documentation {
+    background-color: $bg; color: #E2E8F0; padding: 20px; border: 1px solid $border;
+}
+""")
+
+# Reglas por tono: color de texto en etiquetas y casillas, fondo en botones y barras
+_TONE_RULES = Template("""
+QLabel[tone="$tone"], QCheckBox[tone="$tone"] { color: $color; }
+QPushButton#columnAddButton[tone="$tone"] { background: $color; }
+QProgressBar[tone="$tone"]::chunk { background: $color; }
+BalanceCard[tone="$tone"] { border-left: 5px solid $color; }
+""")
+
+
+def build_stylesheet(colors: dict = None) -> str:
+    palette = dict(COLORS, **(colors or {}))
+    tones = dict(palette, muted=palette['text_dim'])
+    sheet = _STYLESHEET.substitute(palette)
+    return sheet + "".join(_TONE_RULES.substitute(tone=tone, color=tones[tone]) for tone in TONES)
+
+
+def apply_theme(app, colors: dict = None):
+    """Pone la hoja de estilos en la aplicacion. Se llama una vez, antes de crear ventanas."""
+    app.setStyleSheet(build_stylesheet(colors))
+
+
+def set_tone(widget, tone: str):
+    # Cambiar una propiedad no vuelve a aplicar el estilo por si solo
+    widget.setProperty("tone", tone)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
@@ -0,0 +1,129 @@
+import numpy as np
+from src.utils.forecast import DAY, weekdays
+
+# Series temporales de ingresos, gastos, ahorros y balance acumulado por dia, semana o mes.
+# Los totales los agrupa SQLite; aqui solo se guardan en arrays y se reducen a los puntos que
+# caben en el grafico.
+
+GRANULARITIES = ('day', 'week', 'month')
+
+
+def bucket_start(days, granularity: str) -> np.ndarray:
+    """Primer dia del periodo (dia, semana desde el lunes o mes) de cada fecha."""
+    days = np.asarray(days, dtype='datetime64[D]')
+    if granularity == 'week':
+        return days - weekdays(days) * DAY
+    if granularity == 'month':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    return days
+
+
+def bucket_end(days, granularity: str) -> np.ndarray:
+    """Ultimo dia del periodo de cada fecha."""
+    days = np.asarray(days, dtype='datetime64[D]')
+    if granularity == 'week':
+        return bucket_start(days, granularity) + 6 * DAY
+    if granularity == 'month':
+        return (days.astype('datetime64[M]') + 1).astype('datetime64[D]') - DAY
+    return days
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices de `threshold` puntos que conservan la forma de la
+    serie (picos incluidos). El primero y el ultimo se mantienen siempre.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # threshold - 2 cubos entre el primer y el ultimo punto
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Vertice fijo del triangulo: la media del cubo siguiente
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def downsample(dates: np.ndarray, values: np.ndarray, points: int) -> tuple:
+    idx = lttb(dates.astype(np.int64), values, points)
+    return dates[idx], values[idx]
+
+
+class SeriesWindow:
+    # Tramo ya cargado de la serie de un libro. Al mover o ampliar el rango visible solo se
+    # consulta la parte nueva; el balance acumulado se arrastra desde el saldo anterior al tramo.
+    def __init__(self, db, granularity: str = 'month'):
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Periodo no válido: {granularity}")
+        self.db = db
+        self.granularity = granularity
+        self.start = self.end = None
+        self.dates = np.array([], dtype='datetime64[D]')
+        self.flows = np.empty((3, 0))  # ingresos, gastos, ahorros
+        self.opening = 0.0  # balance antes de self.start
+        self.queries = 0
+
+    def bounds(self):
+        """Primer y ultimo dia con movimientos, o None si el libro esta vacio."""
+        first, last = self.db.get_date_bounds()
+        if first is None:
+            return None
+        return np.datetime64(first, 'D'), np.datetime64(last, 'D')
+
+    def load(self, start, end) -> dict:
+        """Serie del rango [start, end] (ajustado a periodos completos), consultando solo lo que falte."""
+        start = bucket_start(start, self.granularity)
+        end = bucket_end(end, self.granularity)
+
+        if self.start is None:
+            self.dates, self.flows = self._fetch(start, end)
+            before = self.db.get_balance_by_period("0001-01-01", str(start - DAY))
+            self.opening = before['total_income'] - before['total_expense'] - before['total_savings']
+            self.start, self.end = start, end
+        else:
+            if start < self.start:
+                dates, flows = self._fetch(start, self.start - DAY)
+                self.dates = np.concatenate((dates, self.dates))
+                self.flows = np.concatenate((flows, self.flows), axis=1)
+                self.opening -= float(flows[0].sum() - flows[1].sum() - flows[2].sum())
+                self.start = start
+            if end > self.end:
+                dates, flows = self._fetch(self.end + DAY, end)
+                self.dates = np.concatenate((self.dates, dates))
+                self.flows = np.concatenate((self.flows, flows), axis=1)
+                self.end = end
+        return self.slice(start, end)
+
+    def slice(self, start, end) -> dict:
+        balance = self.opening + np.cumsum(self.flows[0] - self.flows[1] - self.flows[2])
+        lo = np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left')
+        hi = np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right')
+        income, expense, savings = self.flows[:, lo:hi]
+        return {
+            'dates': self.dates[lo:hi],
+            'income': income,
+            'expense': expense,
+            'savings': savings,
+            'balance': balance[lo:hi]
+        }
+
+    def _fetch(self, start, end) -> tuple:
+        self.queries += 1
+        rows = self.db.get_period_totals(self.granularity, str(start), str(end))
+        dates = np.array([r[0] for r in rows], dtype='datetime64[D]')
+        flows = np.array([[r[1] for r in rows], [r[2] for r in rows], [r[3] for r in rows]],
+                         dtype=np.float64).reshape(3, len(rows))
+        return dates, flows
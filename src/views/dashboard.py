@@ -1,45 +1,44 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFrame, QMessageBox, QProgressBar, QScrollArea, QTabWidget
+    QFrame, QMessageBox, QProgressBar, QScrollArea, QTabWidget,
+    QLineEdit, QComboBox
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, Signal
 from src.models.transaction import TransactionType
+from src.controllers.refresh_scheduler import RefreshScheduler
 from src.views.dialogs import (
     AddTransactionDialog, AddSavingsGoalDialog,
     AddToSavingsGoalDialog
 )
 from src.views.stats_tab import StatisticsTab
 
-COLORS = {
-    "bg": "#0F172A",
-    "surface": "#1E293B",
-    "surface_hover": "#334155",
-    "primary": "#3B82F6",
-    "success": "#10B981",
-    "danger": "#EF4444",
-    "warning": "#F59E0B",
-    "accent": "#8B5CF6",
-    "text_main": "#F8FAFC",
-    "text_dim": "#94A3B8"
-}
+# Movimientos visibles en cada lista del dashboard
+LIST_LIMIT = 20
+
+# Espera desde la ultima tecla antes de lanzar la busqueda
+SEARCH_DEBOUNCE_MS = 250
+SEARCH_PAGE_SIZE = 30
+
+# Ventana en la que se agrupan las peticiones de refresco (varios guardados seguidos = una carga)
+REFRESH_COALESCE_MS = 50
+# Vistas que hay dentro de cada pestaña
+TAB_VIEWS = {0: ('lists', 'goals'), 1: ('stats',), 2: ('search',)}
+
 
 
 class StatCard(QFrame):
-    def __init__(self, title: str, amount: float, color: str):
+    def __init__(self, title: str, amount: float, tone: str):
         super().__init__()
-        self.setStyleSheet(f"background: {COLORS['surface']}; border-radius: 10px;")
+        self.setObjectName("statCard")
 
         layout = QVBoxLayout(self)
 
         title_label = QLabel(title.upper())
-        title_label.setStyleSheet(
-            f"color: {color}; font-size: 10px; font-weight: bold;"
-        )
+        title_label.setObjectName("statCardTitle")
+        title_label.setProperty("tone", tone)
 
         self.value_label = QLabel(f"€ {amount:,.0f}")
-        self.value_label.setStyleSheet(
-            "color: white; font-size: 18px; font-weight: 800;"
-        )
+        self.value_label.setObjectName("statCardValue")
 
         layout.addWidget(title_label)
         layout.addWidget(self.value_label)
@@ -53,72 +52,128 @@ class TransactionCard(QFrame):
             amount: float,
             date: str,
             t_type: TransactionType,
-            on_delete
+            on_delete,
+            balance: float = None
     ):
         super().__init__()
         self.setFixedHeight(75)
-        self.setStyleSheet(
-            f"QFrame {{ background: {COLORS['surface']}; border-radius: 10px; }} "
-            f"QFrame:hover {{ background: {COLORS['surface_hover']}; }}"
-        )
+        self.setObjectName("transactionCard")
 
         layout = QHBoxLayout(self)
         layout.setContentsMargins(15, 10, 15, 10)
 
         if t_type == TransactionType.INCOME:
-            icon_color, sign = COLORS['success'], "+"
+            tone, sign = "success", "+"
         elif t_type == TransactionType.SAVINGS:
-            icon_color, sign = COLORS['warning'], "💰"
+            tone, sign = "warning", "💰"
         else:
-            icon_color, sign = COLORS['danger'], "-"
+            tone, sign = "danger", "-"
 
         indicator = QLabel("●")
-        indicator.setStyleSheet(f"color: {icon_color}; font-size: 20px;")
+        indicator.setObjectName("cardIndicator")
+        indicator.setProperty("tone", tone)
 
         info_layout = QVBoxLayout()
         info_layout.setSpacing(2)
 
         cat_label = QLabel(category)
-        cat_label.setStyleSheet("color: white; font-weight: 700; font-size: 14px;")
+        cat_label.setObjectName("cardCategory")
 
         date_label = QLabel(date)
-        date_label.setStyleSheet(f"color: {COLORS['text_dim']}; font-size: 11px;")
+        date_label.setObjectName("cardDate")
 
         info_layout.addWidget(cat_label)
         info_layout.addWidget(date_label)
 
         amount_label = QLabel(f"{sign} €{amount:,.2f}")
-        amount_label.setStyleSheet(
-            f"color: {icon_color}; font-weight: 800; font-size: 15px;"
-        )
+        amount_label.setObjectName("transactionAmount")
+        amount_label.setProperty("tone", tone)
+
+        # Saldo acumulado al cierre de ese dia
+        amount_layout = QVBoxLayout()
+        amount_layout.setSpacing(2)
+        amount_layout.addWidget(amount_label, alignment=Qt.AlignRight)
+        if balance is not None:
+            balance_label = QLabel(f"Saldo €{balance:,.2f}")
+            balance_label.setObjectName("cardBalance")
+            amount_layout.addWidget(balance_label, alignment=Qt.AlignRight)
 
         delete_btn = QPushButton("🗑️")
         delete_btn.setFixedSize(30, 30)
         delete_btn.setCursor(Qt.PointingHandCursor)
         delete_btn.clicked.connect(lambda _: on_delete(t_id))
-        delete_btn.setStyleSheet(
-            "QPushButton { "
-            "background: #EF4444; color: white; border: none; border-radius: 6px; "
-            "} "
-            "QPushButton:hover { background: #DC2626; }"
-        )
+        delete_btn.setObjectName("deleteButton")
 
         layout.addWidget(indicator)
         layout.addLayout(info_layout, 1)
-        layout.addWidget(amount_label)
+        layout.addLayout(amount_layout)
         layout.addSpacing(10)
         layout.addWidget(delete_btn)
 
 
+class SearchSignals(QObject):
+    # (numero de busqueda, resultados, cursor siguiente, si se añaden a los anteriores)
+    finished = Signal(int, list, object, bool)
+
+
+class SearchTask(QRunnable):
+    # La consulta se hace en el pool de hilos de Qt para que escribir nunca bloquee la interfaz
+    def __init__(self, controller, signals: SearchSignals, seq: int, query: str,
+                 filters: dict, cursor, append: bool):
+        super().__init__()
+        self.controller = controller
+        self.signals = signals
+        self.seq = seq
+        self.query = query
+        self.filters = filters
+        self.cursor = cursor
+        self.append = append
+
+    def run(self):
+        try:
+            page, next_cursor = self.controller.search_transactions(
+                self.query, self.filters, self.cursor, SEARCH_PAGE_SIZE
+            )
+        except Exception as e:
+            print(f"Error en la búsqueda: {e}")
+            page, next_cursor = [], None
+        self.signals.finished.emit(self.seq, page, next_cursor, self.append)
+
+
 class Dashboard(QWidget):
     def __init__(self, controller, parent=None):
         super().__init__(parent)
         self.controller = controller
         self.list_layouts = {}
-        self.setStyleSheet(f"background-color: {COLORS['bg']};")
+        self._search_seq = 0
+        self._search_cursor = None
+        self._search_signals = SearchSignals(self)
+        self._search_signals.finished.connect(self._on_search_results)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._run_search)
+        self.setObjectName("dashboard")
+        self.setAttribute(Qt.WA_StyledBackground, True)
         self._setup_ui()
+        self._setup_refresh()
         self.load_data()
 
+    def _setup_refresh(self):
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(REFRESH_COALESCE_MS)
+        self.refresh = RefreshScheduler(self._refresh_timer.start)
+        self._refresh_timer.timeout.connect(self.refresh.flush)
+
+        on_tab = lambda index: (lambda: self.tabs.currentIndex() == index)
+        # El encabezado (balance y avisos de presupuesto) esta siempre a la vista
+        self.refresh.register('header', self._load_header)
+        self.refresh.register('lists', self._load_lists, on_tab(0))
+        self.refresh.register('goals', self._load_goals, on_tab(0))
+        self.refresh.register('stats', self.stats_tab.load_data, on_tab(1))
+        self.refresh.register('search', self._refresh_search, on_tab(2))
+
     def _setup_ui(self):
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(20, 10, 20, 20)
@@ -127,16 +182,14 @@ class Dashboard(QWidget):
         header = self._create_header()
         main_layout.addWidget(header)
 
+        self.budget_banner = QLabel()
+        self.budget_banner.setWordWrap(True)
+        self.budget_banner.setObjectName("budgetBanner")
+        self.budget_banner.hide()
+        main_layout.addWidget(self.budget_banner)
+
         self.tabs = QTabWidget()
-        self.tabs.setStyleSheet(f"""
-            QTabWidget::pane {{ border: none; background: transparent; }}
-            QTabBar::tab {{ 
-                background: #1E293B; color: {COLORS['text_dim']}; 
-                padding: 12px 30px; border-top-left-radius: 8px; 
-                border-top-right-radius: 8px; margin-right: 2px; font-weight: bold; 
-            }}
-            QTabBar::tab:selected {{ background: #3B82F6; color: white; }}
-        """)
+        self.tabs.setObjectName("mainTabs")
 
         overview = self._create_overview_tab()
 
@@ -144,6 +197,7 @@ class Dashboard(QWidget):
 
         self.tabs.addTab(overview, "Dashboard")
         self.tabs.addTab(self.stats_tab, "Estadísticas")
+        self.tabs.addTab(self._create_search_tab(), "Buscar")
 
         self.tabs.currentChanged.connect(self._on_tab_changed)
 
@@ -152,10 +206,7 @@ class Dashboard(QWidget):
     def _create_header(self) -> QFrame:
         header = QFrame()
         header.setFixedHeight(110)
-        header.setStyleSheet(
-            "background: #2563EB; "
-            "border-top-left-radius: 16px; border-top-right-radius: 16px;"
-        )
+        header.setObjectName("balanceHeader")
 
         h_layout = QHBoxLayout(header)
         h_layout.setContentsMargins(25, 15, 25, 15)
@@ -164,15 +215,10 @@ class Dashboard(QWidget):
         balance_layout = QVBoxLayout()
 
         balance_title = QLabel("BALANCE DISPONIBLE")
-        balance_title.setStyleSheet(
-            "color: rgba(255,255,255,0.8); font-weight: bold; "
-            "font-size: 11px; letter-spacing: 1px;"
-        )
+        balance_title.setObjectName("balanceTitle")
 
         self.lbl_balance = QLabel("€ 0.00")
-        self.lbl_balance.setStyleSheet(
-            "color: white; font-size: 34px; font-weight: 900;"
-        )
+        self.lbl_balance.setObjectName("balanceAmount")
 
         balance_layout.addWidget(balance_title)
         balance_layout.addWidget(self.lbl_balance)
@@ -180,9 +226,9 @@ class Dashboard(QWidget):
         h_layout.addLayout(balance_layout)
         h_layout.addStretch()
 
-        self.stat_inc = StatCard("INGRESOS", 0, COLORS['success'])
-        self.stat_exp = StatCard("GASTOS", 0, COLORS['danger'])
-        self.stat_sav = StatCard("AHORRADO", 0, COLORS['warning'])
+        self.stat_inc = StatCard("INGRESOS", 0, "success")
+        self.stat_exp = StatCard("GASTOS", 0, "danger")
+        self.stat_sav = StatCard("AHORRADO", 0, "warning")
 
         for card in [self.stat_inc, self.stat_exp, self.stat_sav]:
             card.setFixedWidth(140)
@@ -196,17 +242,110 @@ class Dashboard(QWidget):
         layout.setContentsMargins(0, 20, 0, 0)
         layout.setSpacing(15)
 
-        self.col_inc = self._create_column("INGRESOS", COLORS['success'], "income")
-        self.col_exp = self._create_column("GASTOS", COLORS['danger'], "expense")
-        self.col_sav = self._create_column("AHORROS", COLORS['warning'], "savings_list")
-        self.col_goals = self._create_column("METAS DE AHORRO", COLORS['accent'], "goals")
+        self.col_inc = self._create_column("INGRESOS", "success", "income")
+        self.col_exp = self._create_column("GASTOS", "danger", "expense")
+        self.col_sav = self._create_column("AHORROS", "warning", "savings_list")
+        self.col_goals = self._create_column("METAS DE AHORRO", "accent", "goals")
 
         for col in [self.col_inc, self.col_exp, self.col_sav, self.col_goals]:
             layout.addWidget(col)
 
         return overview
 
-    def _create_column(self, title: str, color: str, key: str) -> QFrame:
+    def _create_search_tab(self) -> QWidget:
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+        layout.setContentsMargins(0, 20, 0, 0)
+        layout.setSpacing(12)
+
+        bar = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔍 Buscar en descripciones y categorías...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setObjectName("searchInput")
+        self.search_input.textChanged.connect(lambda _: self._search_timer.start())
+
+        self.search_type = QComboBox()
+        self.search_type.addItem("Todos", None)
+        self.search_type.addItem("Ingresos", TransactionType.INCOME)
+        self.search_type.addItem("Gastos", TransactionType.EXPENSE)
+        self.search_type.addItem("Ahorros", TransactionType.SAVINGS)
+        self.search_type.setObjectName("searchType")
+        self.search_type.currentIndexChanged.connect(lambda _: self._search_timer.start())
+
+        bar.addWidget(self.search_input)
+        bar.addWidget(self.search_type)
+        layout.addLayout(bar)
+
+        self.search_status = QLabel("")
+        self.search_status.setObjectName("searchStatus")
+        layout.addWidget(self.search_status)
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setFrameShape(QScrollArea.NoFrame)
+        scroll.setObjectName("listScroll")
+
+        widget = QWidget()
+        widget.setObjectName("listBody")
+        self.list_layouts['search'] = QVBoxLayout(widget)
+        self.list_layouts['search'].setContentsMargins(0, 0, 0, 0)
+        self.list_layouts['search'].addStretch()
+        scroll.setWidget(widget)
+        layout.addWidget(scroll)
+
+        self.search_more_btn = QPushButton("Cargar más resultados")
+        self.search_more_btn.setCursor(Qt.PointingHandCursor)
+        self.search_more_btn.setObjectName("searchMoreButton")
+        self.search_more_btn.clicked.connect(lambda: self._run_search(append=True))
+        self.search_more_btn.hide()
+        layout.addWidget(self.search_more_btn)
+
+        return tab
+
+    def _run_search(self, append: bool = False):
+        query = self.search_input.text().strip()
+        # Cualquier busqueda anterior que siga en curso queda obsoleta
+        self._search_seq += 1
+
+        if not query:
+            self._clear_layout(self.list_layouts['search'])
+            self.search_status.setText("")
+            self.search_more_btn.hide()
+            return
+
+        filters = {'t_type': self.search_type.currentData()}
+        cursor = self._search_cursor if append else None
+        self.search_status.setText("Buscando...")
+        QThreadPool.globalInstance().start(
+            SearchTask(self.controller, self._search_signals, self._search_seq, query, filters, cursor, append)
+        )
+
+    def _on_search_results(self, seq: int, page: list, next_cursor, append: bool):
+        if seq != self._search_seq:
+            return
+
+        layout = self.list_layouts['search']
+        if not append:
+            self._clear_layout(layout)
+        balances = self.controller.get_balances_at(t.date for t in page)
+        for trans in page:
+            card = TransactionCard(
+                trans.id, trans.category, trans.amount,
+                trans.date, trans.transaction_type, self._handle_delete,
+                balances[trans.date]
+            )
+            # Se mantiene el orden por relevancia (antes del stretch final)
+            layout.insertWidget(layout.count() - 1, card)
+
+        self._search_cursor = next_cursor
+        self.search_more_btn.setVisible(next_cursor is not None)
+        shown = layout.count() - 1
+        self.search_status.setText(
+            f"{shown} resultado{'s' if shown != 1 else ''}" if shown else "Sin resultados"
+        )
+
+    def _create_column(self, title: str, tone: str, key: str) -> QFrame:
         container = QFrame()
         layout = QVBoxLayout(container)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -215,21 +354,15 @@ class Dashboard(QWidget):
         header_layout = QHBoxLayout()
 
         title_label = QLabel(title)
-        title_label.setStyleSheet(
-            f"color: {color}; font-weight: 900; font-size: 13px;"
-        )
+        title_label.setObjectName("columnTitle")
+        title_label.setProperty("tone", tone)
 
         add_btn = QPushButton("+ Añadir")
         add_btn.setFixedSize(90, 28)
         add_btn.setCursor(Qt.PointingHandCursor)
         add_btn.clicked.connect(lambda _: self._handle_add(key))
-        add_btn.setStyleSheet(
-            f"QPushButton {{ "
-            f"background: {color}; color: #0F172A; border-radius: 5px; "
-            f"font-weight: 800; font-size: 10px; "
-            f"}} "
-            f"QPushButton:hover {{ background: white; }}"
-        )
+        add_btn.setObjectName("columnAddButton")
+        add_btn.setProperty("tone", tone)
 
         header_layout.addWidget(title_label)
         header_layout.addStretch()
@@ -240,9 +373,10 @@ class Dashboard(QWidget):
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
         scroll.setFrameShape(QScrollArea.NoFrame)
-        scroll.setStyleSheet("background: transparent;")
+        scroll.setObjectName("listScroll")
 
         widget = QWidget()
+        widget.setObjectName("listBody")
         self.list_layouts[key] = QVBoxLayout(widget)
         self.list_layouts[key].setContentsMargins(0, 0, 0, 0)
         self.list_layouts[key].addStretch()
@@ -253,34 +387,53 @@ class Dashboard(QWidget):
         return container
 
     def load_data(self):
-        try:
-            balance = self.controller.get_monthly_balance()
-
-            self.lbl_balance.setText(f"€ {balance['balance']:,.2f}")
-
-            self.stat_inc.value_label.setText(f"€ {balance['total_income']:,.0f}")
-            self.stat_exp.value_label.setText(f"€ {balance['total_expense']:,.0f}")
-            self.stat_sav.value_label.setText(f"€ {balance['total_savings']:,.0f}")
-
-            incomes = self.controller.get_transactions_by_type(TransactionType.INCOME)
-            self._fill_list("income", incomes)
-
-            expenses = self.controller.get_transactions_by_type(TransactionType.EXPENSE)
-            self._fill_list("expense", expenses)
-
-            savings = self.controller.get_transactions_by_type(TransactionType.SAVINGS)
-            self._fill_list("savings_list", savings)
-
-            goals = self.controller.get_all_savings_goals()
-            self._fill_goals(goals)
-
-            if hasattr(self, 'stats_tab') and self.stats_tab:
-                self.stats_tab.load_data()
-
-            print("Interfaz Dashboard actualizada al 100%")
-
-        except Exception as e:
-            print(f"Error en load_data: {e}")
+        # Recarga inmediata de lo que se ve; las pestañas ocultas se cargan al abrirlas
+        self.refresh.mark_dirty()
+        self.refresh.flush()
+
+    def schedule_refresh(self, *views):
+        """Pide un refresco agrupado de esas vistas (o de todas) tras un cambio en los datos."""
+        self.refresh.request(*views)
+
+    def refresh_goals(self):
+        # Refresco parcial cuando solo han cambiado metas o reglas de ahorro
+        self.refresh.request('header', 'goals')
+
+    def _load_header(self):
+        balance = self.controller.get_monthly_balance()
+        self.lbl_balance.setText(f"€ {balance['balance']:,.2f}")
+        self.stat_inc.value_label.setText(f"€ {balance['total_income']:,.0f}")
+        self.stat_exp.value_label.setText(f"€ {balance['total_expense']:,.0f}")
+        self.stat_sav.value_label.setText(f"€ {balance['total_savings']:,.0f}")
+        self._update_budget_banner()
+
+    def _load_lists(self):
+        self._fill_list("income", self.controller.get_transactions_by_type(TransactionType.INCOME, LIST_LIMIT))
+        self._fill_list("expense", self.controller.get_transactions_by_type(TransactionType.EXPENSE, LIST_LIMIT))
+        self._fill_list("savings_list", self.controller.get_transactions_by_type(TransactionType.SAVINGS, LIST_LIMIT))
+
+    def _load_goals(self):
+        self._fill_goals(self.controller.get_all_savings_goals())
+
+    def _refresh_search(self):
+        if self.search_input.text().strip():
+            self._run_search()
+
+    def _update_budget_banner(self):
+        alerts = self.controller.get_budget_alerts()
+        if not alerts:
+            self.budget_banner.hide()
+            return
+
+        lines = []
+        for b in alerts:
+            icon = "⛔" if b.status == "superado" else "⚠️"
+            lines.append(
+                f"{icon} {b.category}: {b.used_percentage:.0f}% del presupuesto "
+                f"(€ {b.spent:,.2f} / € {b.monthly_limit:,.2f})"
+            )
+        self.budget_banner.setText("\n".join(lines))
+        self.budget_banner.show()
 
     def _fill_list(self, key: str, data: list):
         layout = self.list_layouts[key]
@@ -293,10 +446,13 @@ class Dashboard(QWidget):
         else:
             t_type = TransactionType.SAVINGS
 
-        for trans in data[:20]:
+        data = data[:LIST_LIMIT]
+        balances = self.controller.get_balances_at(t.date for t in data)
+        for trans in data:
             card = TransactionCard(
                 trans.id, trans.category, trans.amount,
-                trans.date, t_type, self._handle_delete
+                trans.date, t_type, self._handle_delete,
+                balances[trans.date]
             )
             layout.insertWidget(0, card)
 
@@ -304,11 +460,11 @@ class Dashboard(QWidget):
         layout = self.list_layouts['goals']
         self._clear_layout(layout)
 
+        projections = self.controller.get_goal_projections(goals)
+
         for goal in goals:
             goal_frame = QFrame()
-            goal_frame.setStyleSheet(
-                f"background: {COLORS['surface']}; border-radius: 10px;"
-            )
+            goal_frame.setObjectName("goalCard")
 
             goal_layout = QVBoxLayout(goal_frame)
             goal_layout.setContentsMargins(15, 12, 15, 12)
@@ -316,21 +472,19 @@ class Dashboard(QWidget):
             header_layout = QHBoxLayout()
 
             name_label = QLabel(f"🎯 {goal.name}")
-            name_label.setStyleSheet(
-                "color: white; font-weight: bold; font-size: 13px;"
-            )
+            name_label.setObjectName("goalName")
             header_layout.addWidget(name_label)
             header_layout.addStretch()
 
             add_btn = QPushButton("💰")
             add_btn.setFixedSize(28, 28)
             add_btn.clicked.connect(lambda _, gid=goal.id: self._handle_deposit(gid))
-            add_btn.setStyleSheet(f"background: {COLORS['accent']}; border-radius: 5px;")
+            add_btn.setObjectName("goalDepositButton")
 
             del_btn = QPushButton("🗑️")
             del_btn.setFixedSize(28, 28)
             del_btn.clicked.connect(lambda _, gid=goal.id: self._delete_goal(gid))
-            del_btn.setStyleSheet("background: #EF4444; border-radius: 5px;")
+            del_btn.setObjectName("deleteButton")
 
             header_layout.addWidget(add_btn)
             header_layout.addWidget(del_btn)
@@ -341,14 +495,38 @@ class Dashboard(QWidget):
             progress.setFixedHeight(5)
             progress.setValue(int(goal.get_progress_percentage()))
             progress.setTextVisible(False)
-            progress.setStyleSheet(
-                f"QProgressBar {{ background: #0F172A; border-radius: 2px; }} "
-                f"QProgressBar::chunk {{ background: {COLORS['accent']}; }}"
-            )
+            progress.setObjectName("goalProgress")
             goal_layout.addWidget(progress)
 
+            projection = projections.get(goal.id)
+            if projection:
+                goal_layout.addWidget(self._projection_label(projection))
+
             layout.insertWidget(0, goal_frame)
 
+    @staticmethod
+    def _projection_label(projection) -> QLabel:
+        tones = {
+            "completada": "success",
+            "en camino": "success",
+            "sin fecha": "muted",
+            "sin datos": "muted",
+            "retrasada": "danger"
+        }
+        if projection.status == "sin datos":
+            text = "Sin aportaciones todavía"
+        elif projection.status == "completada":
+            text = "✅ Meta completada"
+        else:
+            text = f"🗓️ {projection.estimated_date} · {projection.status.capitalize()}"
+            if projection.status == "retrasada" and projection.required_monthly:
+                text += f" (necesitas € {projection.required_monthly:,.0f}/mes)"
+
+        label = QLabel(text)
+        label.setObjectName("goalProjection")
+        label.setProperty("tone", tones[projection.status])
+        return label
+
     @staticmethod
     def _clear_layout(layout):
         while layout.count() > 1:
@@ -357,19 +535,20 @@ class Dashboard(QWidget):
                 item.widget().deleteLater()
 
     def _on_tab_changed(self, index: int):
-        if index == 1:
-            self.stats_tab.load_data()
+        self.refresh.view_shown(*TAB_VIEWS.get(index, ()))
 
     def _handle_add(self, key):
         from src.views.dialogs import AddTransactionDialog, AddSavingsGoalDialog, AddToSavingsGoalDialog
 
         if key == "income":
-            dialog = AddTransactionDialog(self, TransactionType.INCOME)
+            dialog = AddTransactionDialog(self, TransactionType.INCOME, self.controller.get_all_savings_goals(),
+                                          self.controller.get_category_names(TransactionType.INCOME))
             if dialog.exec():
                 self._save_transaction(dialog.transaction_data)
 
         elif key == "expense":
-            dialog = AddTransactionDialog(self, TransactionType.EXPENSE)
+            dialog = AddTransactionDialog(self, TransactionType.EXPENSE,
+                                          categories=self.controller.get_category_names(TransactionType.EXPENSE))
             if dialog.exec():
                 self._save_transaction(dialog.transaction_data)
 
@@ -379,34 +558,73 @@ class Dashboard(QWidget):
                 data = dialog.get_data()
                 if data:
                     self.controller.add_to_savings_goal(data['goal_id'], data['amount'])
-                    self.load_data()
+                    self.schedule_refresh()
 
         elif key == "goals":
             dialog = AddSavingsGoalDialog(self)
             if dialog.exec():
                 data = dialog.get_data()
-                self.controller.create_savings_goal(
+                goal_id = self.controller.create_savings_goal(
                     data['name'], data['target_amount'],
                     data['current_amount'], data['deadline'], data['description']
                 )
-                self.load_data()
+                if data['auto_mode'] and data['auto_value'] > 0:
+                    self.controller.create_allocation_rule(goal_id, data['auto_mode'], data['auto_value'])
+                self.schedule_refresh()
 
     def _save_transaction(self, data):
-        self.controller.create_transaction(
-            t_type=data['type'],
-            amount=data['amount'],
-            category=data['category'],
-            description=data['description'],
-            date=data['date']
-        )
-        self.load_data()
+        if data.get('frequency'):
+            # Las repetitivas se guardan como regla y se generan las ocurrencias que ya tocan
+            self.controller.create_recurring_rule(
+                t_type=data['type'],
+                amount=data['amount'],
+                category=data['category'],
+                description=data['description'],
+                frequency=data['frequency'],
+                start_date=data['date']
+            )
+            self.controller.run_recurring_rules()
+        else:
+            duplicate = self.controller.find_duplicate(
+                data['type'], data['amount'], data['category'], data['description'], data['date']
+            )
+            if duplicate is not None:
+                reply = QMessageBox.question(
+                    self,
+                    "Posible duplicado",
+                    "Ya existe un movimiento con la misma fecha, importe, categoría y descripción.\n\n"
+                    "¿Guardarlo de todos modos?",
+                    QMessageBox.Yes | QMessageBox.No
+                )
+                if reply != QMessageBox.Yes:
+                    return
+            self.controller.create_transaction(
+                t_type=data['type'],
+                amount=data['amount'],
+                category=data['category'],
+                description=data['description'],
+                date=data['date'],
+                goal_id=data.get('goal_id'),
+                save_pct=data.get('save_pct')
+            )
+        self.schedule_refresh()
+
+        if data['type'] == TransactionType.EXPENSE:
+            budget = self.controller.check_budget(data['category'], data['date'][:7])
+            if budget and budget.status != "ok":
+                QMessageBox.warning(
+                    self,
+                    "Presupuesto",
+                    f"{budget.category}: llevas € {budget.spent:,.2f} de € {budget.monthly_limit:,.2f} "
+                    f"({budget.used_percentage:.0f}%) este mes."
+                )
 
     def _handle_deposit(self, goal_id: int):
         dialog = AddToSavingsGoalDialog(self.controller, self)
         if dialog.exec():
             data = dialog.get_data()
             self.controller.add_to_savings_goal(data['goal_id'], data['amount'])
-            self.load_data()
+            self.schedule_refresh()
 
     def _delete_goal(self, goal_id: int):
         reply = QMessageBox.question(
@@ -416,9 +634,24 @@ class Dashboard(QWidget):
             QMessageBox.Yes | QMessageBox.No
         )
 
-        if reply == QMessageBox.Yes:
-            self.controller.delete_savings_goal(goal_id)
-            self.load_data()
+        if reply != QMessageBox.Yes:
+            return
+
+        delete_transactions = False
+        if self.controller.get_goal_transactions(goal_id):
+            answer = QMessageBox.question(
+                self,
+                "Eliminar Meta",
+                "¿Eliminar también los aportes de esta meta del historial de ahorros?\n"
+                "Si eliges No, se conservan como ahorro sin meta.",
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel
+            )
+            if answer == QMessageBox.Cancel:
+                return
+            delete_transactions = answer == QMessageBox.Yes
+
+        self.controller.delete_savings_goal(goal_id, delete_transactions)
+        self.schedule_refresh()
 
     def _handle_delete(self, transaction_id: int):
         reply = QMessageBox.question(
@@ -430,4 +663,4 @@ class Dashboard(QWidget):
 
         if reply == QMessageBox.Yes:
             self.controller.delete_transaction(transaction_id)
-            self.load_data()
\ No newline at end of file
+            self.schedule_refresh()
\ No newline at end of file
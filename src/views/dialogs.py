@@ -1,10 +1,14 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-                               QLineEdit, QPushButton, QComboBox, QDateEdit, QMessageBox)
-from PySide6.QtCore import QDate
-from src.models.transaction import TransactionType, Transaction
+                               QLineEdit, QPushButton, QComboBox, QDateEdit, QMessageBox, QSpinBox,
+                               QDoubleSpinBox, QListWidget, QListWidgetItem, QInputDialog, QColorDialog)
+from PySide6.QtCore import QDate, Qt
+from PySide6.QtGui import QColor
+from src.models.transaction import TransactionType
+from src.models.recurring_rule import Frequency
+from src.models.allocation_rule import AllocationMode
 
 class AddTransactionDialog(QDialog):
-    def __init__(self, parent=None, transaction_type=TransactionType.EXPENSE):
+    def __init__(self, parent=None, transaction_type=TransactionType.EXPENSE, goals=None, categories=()):
         super().__init__(parent)
         self.parent_widget = parent
         self.setWindowTitle("Nueva Transacción")
@@ -21,8 +25,7 @@ class AddTransactionDialog(QDialog):
 
         layout.addWidget(QLabel("Categoría:"))
         self.cat_combo = QComboBox()
-        cats = Transaction.INCOME_CATEGORIES if transaction_type == TransactionType.INCOME else Transaction.EXPENSE_CATEGORIES
-        self.cat_combo.addItems(cats.keys())
+        self.cat_combo.addItems(categories)
         layout.addWidget(self.cat_combo)
 
         layout.addWidget(QLabel("Fecha:"))
@@ -30,6 +33,29 @@ class AddTransactionDialog(QDialog):
         self.date_input.setCalendarPopup(True)
         layout.addWidget(self.date_input)
 
+        layout.addWidget(QLabel("Repetir:"))
+        self.repeat_combo = QComboBox()
+        self.repeat_combo.addItem("No repetir", None)
+        self.repeat_combo.addItem("Cada semana", Frequency.WEEKLY)
+        self.repeat_combo.addItem("Cada mes", Frequency.MONTHLY)
+        self.repeat_combo.addItem("Cada año", Frequency.YEARLY)
+        layout.addWidget(self.repeat_combo)
+
+        self.goal_combo = None
+        if transaction_type == TransactionType.INCOME and goals:
+            layout.addWidget(QLabel("Apartar para una meta (solo este ingreso):"))
+            save_layout = QHBoxLayout()
+            self.goal_combo = QComboBox()
+            self.goal_combo.addItem("Sin ahorro extra", None)
+            for g in goals:
+                self.goal_combo.addItem(g.name, g.id)
+            self.save_pct_in = QSpinBox()
+            self.save_pct_in.setRange(0, 100)
+            self.save_pct_in.setSuffix(" %")
+            save_layout.addWidget(self.goal_combo, 1)
+            save_layout.addWidget(self.save_pct_in)
+            layout.addLayout(save_layout)
+
         btns = QHBoxLayout()
         save_btn = QPushButton("Guardar")
         save_btn.clicked.connect(self.accept)
@@ -49,7 +75,10 @@ class AddTransactionDialog(QDialog):
                 'amount': amount,
                 'category': self.cat_combo.currentText(),
                 'description': "",
-                'date': self.date_input.date().toString("yyyy-MM-dd")
+                'date': self.date_input.date().toString("yyyy-MM-dd"),
+                'frequency': self.repeat_combo.currentData(),
+                'goal_id': self.goal_combo.currentData() if self.goal_combo else None,
+                'save_pct': self.save_pct_in.value() if self.goal_combo else None
             }
 
             super().accept()
@@ -74,6 +103,18 @@ class AddSavingsGoalDialog(QDialog):
         layout.addWidget(QLabel("Objetivo (€):"))
         layout.addWidget(self.target_in)
 
+        layout.addWidget(QLabel("Ahorro automático de cada ingreso:"))
+        auto_layout = QHBoxLayout()
+        self.auto_mode = QComboBox()
+        self.auto_mode.addItem("No", None)
+        self.auto_mode.addItem("Porcentaje (%)", AllocationMode.PERCENTAGE)
+        self.auto_mode.addItem("Cantidad fija (€)", AllocationMode.FIXED)
+        self.auto_value = QLineEdit()
+        self.auto_value.setPlaceholderText("0")
+        auto_layout.addWidget(self.auto_mode, 1)
+        auto_layout.addWidget(self.auto_value)
+        layout.addLayout(auto_layout)
+
         btn = QPushButton("Crear Meta")
         btn.clicked.connect(self.accept)
         layout.addWidget(btn)
@@ -84,7 +125,9 @@ class AddSavingsGoalDialog(QDialog):
             'target_amount': float(self.target_in.text() or 0),
             'current_amount': 0,
             'deadline': QDate.currentDate().addYears(1).toString("yyyy-MM-dd"),
-            'description': ""
+            'description': "",
+            'auto_mode': self.auto_mode.currentData(),
+            'auto_value': float(self.auto_value.text().replace(',', '.') or 0)
         }
 
 
@@ -128,4 +171,153 @@ class AddToSavingsGoalDialog(QDialog):
                 'goal_id': goal_id
             }
         except ValueError:
-            return None
\ No newline at end of file
+            return None
+
+
+class BudgetDialog(QDialog):
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.setWindowTitle("Presupuestos Mensuales")
+        self.setFixedWidth(380)
+        layout = QVBoxLayout(self)
+
+        layout.addWidget(QLabel("Límite de gasto al mes por categoría (0 = sin límite):"))
+
+        current = {b.category: b for b in controller.get_budget_status()}
+        self.inputs = {}
+        for category in controller.get_category_names(TransactionType.EXPENSE):
+            row = QHBoxLayout()
+            row.addWidget(QLabel(category), 1)
+            spin = QDoubleSpinBox()
+            spin.setRange(0, 1_000_000)
+            spin.setDecimals(2)
+            spin.setSuffix(" €")
+            if category in current:
+                spin.setValue(current[category].monthly_limit)
+            row.addWidget(spin)
+            layout.addLayout(row)
+            self.inputs[category] = spin
+        self.existing = set(current)
+
+        btns = QHBoxLayout()
+        save_btn = QPushButton("Guardar")
+        save_btn.clicked.connect(self.accept)
+        cancel_btn = QPushButton("Cancelar")
+        cancel_btn.clicked.connect(self.reject)
+        btns.addWidget(save_btn)
+        btns.addWidget(cancel_btn)
+        layout.addLayout(btns)
+
+    def accept(self):
+        for category, spin in self.inputs.items():
+            if spin.value() > 0:
+                self.controller.set_budget(category, spin.value())
+            elif category in self.existing:
+                self.controller.delete_budget(category)
+        super().accept()
+
+
+class CategoriesDialog(QDialog):
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.changed = False
+        self.setWindowTitle("Categorías")
+        self.setFixedWidth(520)
+        layout = QVBoxLayout(self)
+
+        self.type_combo = QComboBox()
+        self.type_combo.addItem("Gastos", TransactionType.EXPENSE)
+        self.type_combo.addItem("Ingresos", TransactionType.INCOME)
+        self.type_combo.addItem("Ahorro", TransactionType.SAVINGS)
+        self.type_combo.currentIndexChanged.connect(self._fill)
+        layout.addWidget(self.type_combo)
+
+        self.list = QListWidget()
+        layout.addWidget(self.list)
+
+        btns = QHBoxLayout()
+        for text, slot in (("Nueva...", self._add), ("Subcategoría...", self._add_child),
+                           ("Renombrar...", self._rename), ("Color...", self._recolor), ("Mover...", self._move)):
+            btn = QPushButton(text)
+            btn.clicked.connect(slot)
+            btns.addWidget(btn)
+        layout.addLayout(btns)
+
+        close_btn = QPushButton("Cerrar")
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
+        self._fill()
+
+    def _fill(self):
+        self.list.clear()
+        self.categories = self.controller.get_categories(self.type_combo.currentData())
+        children = {}
+        for category in self.categories:
+            children.setdefault(category.parent_id, []).append(category)
+
+        # Cada subcategoria debajo de su padre, sangrada segun su nivel
+        def add(parent_id, depth):
+            for category in children.get(parent_id, []):
+                item = QListWidgetItem("    " * depth + category.name)
+                item.setData(Qt.UserRole, category.id)
+                item.setData(Qt.DecorationRole, QColor(category.color))
+                self.list.addItem(item)
+                add(category.id, depth + 1)
+        add(None, 0)
+
+    def _selected_id(self):
+        item = self.list.currentItem()
+        return item.data(Qt.UserRole) if item else None
+
+    def _add(self):
+        name, ok = QInputDialog.getText(self, "Nueva categoría", "Nombre (puede empezar por un emoji):")
+        if ok and name.strip():
+            self._apply(lambda: self.controller.create_category(name, self.type_combo.currentData()))
+
+    def _add_child(self):
+        parent_id = self._selected_id()
+        if parent_id is None:
+            return
+        name, ok = QInputDialog.getText(self, "Nueva subcategoría",
+                                        f"Nombre (dentro de {self.list.currentItem().text().strip()}):")
+        if ok and name.strip():
+            self._apply(lambda: self.controller.create_category(name, self.type_combo.currentData(),
+                                                                parent_id=parent_id))
+
+    def _rename(self):
+        category_id = self._selected_id()
+        if category_id is None:
+            return
+        name, ok = QInputDialog.getText(self, "Renombrar categoría", "Nuevo nombre:",
+                                        text=self.list.currentItem().text().strip())
+        if ok and name.strip():
+            self._apply(lambda: self.controller.update_category(category_id, name=name))
+
+    def _recolor(self):
+        category_id = self._selected_id()
+        if category_id is None:
+            return
+        color = QColorDialog.getColor(self.list.currentItem().data(Qt.DecorationRole), self)
+        if color.isValid():
+            self._apply(lambda: self.controller.update_category(category_id, color=color.name()))
+
+    def _move(self):
+        category_id = self._selected_id()
+        if category_id is None:
+            return
+        top = "(Primer nivel)"
+        parents = {c.name: c.id for c in self.categories if c.id != category_id}
+        choice, ok = QInputDialog.getItem(self, "Mover categoría", "Colgar de:", [top] + list(parents), 0, False)
+        if ok:
+            self._apply(lambda: self.controller.move_category(category_id, parents.get(choice)))
+
+    def _apply(self, action):
+        try:
+            action()
+        except ValueError as e:
+            QMessageBox.warning(self, "Categorías", str(e))
+            return
+        self.changed = True
+        self._fill()
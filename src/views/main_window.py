@@ -1,24 +1,63 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QMessageBox,
-    QFileDialog, QTextEdit, QDialog
+    QFileDialog, QTextEdit, QDialog, QInputDialog
 )
-from PySide6.QtGui import QAction, QKeySequence
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QAction, QActionGroup, QKeySequence
+from PySide6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, Signal
 import os
 from datetime import datetime
 
 from src.controllers.mintly import Mintly
+from src.models.profiles import ProfileRegistry, DEFAULT_PROFILE
 from src.views.dashboard import Dashboard
+from src.views.dialogs import BudgetDialog, CategoriesDialog
 from src.utils.export_manager import ExportManager
+from src.utils.backup import BackupManager
+
+RECURRING_CHECK_MS = 60 * 60 * 1000
+# Cada hora se mira si toca la copia diaria
+BACKUP_CHECK_MS = 60 * 60 * 1000
+
+
+class BackupSignals(QObject):
+    # (ruta del snapshot o None si no tocaba, mensaje de error o None, si lo pidio el usuario)
+    finished = Signal(object, object, bool)
+
+
+class BackupTask(QRunnable):
+    # La copia se hace fuera del hilo de la interfaz; la API de backup va por pasos y suelta el
+    # bloqueo entre ellos, asi que la app puede seguir guardando mientras tanto
+    def __init__(self, manager: BackupManager, signals: BackupSignals, manual: bool):
+        super().__init__()
+        self.manager = manager
+        self.signals = signals
+        self.manual = manual
+
+    def run(self):
+        try:
+            path = self.manager.create_snapshot() if self.manual else self.manager.snapshot_if_due()
+            self.signals.finished.emit(path, None, self.manual)
+        except Exception as e:
+            self.signals.finished.emit(None, str(e), self.manual)
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.controller = Mintly()
-        self.setWindowTitle("Mintly Tracker")
+        self.profiles = ProfileRegistry()
+        self.profile = DEFAULT_PROFILE
+        self.controller = Mintly(self.profiles.get(self.profile))
+        self.backups = BackupManager(self.controller.db)
+        self._backup_signals = BackupSignals(self)
+        self._backup_signals.finished.connect(self._on_backup_finished)
+        self._update_title()
+
+        self._run_recurring_rules(reload=False)
 
         self._setup_ui()
         self._create_menu()
+        self._start_recurring_timer()
+        self._start_backup_timer()
         self.showMaximized()
 
     def _setup_ui(self):
@@ -30,11 +69,179 @@ class MainWindow(QMainWindow):
         self.dashboard = Dashboard(self.controller, self)
         layout.addWidget(self.dashboard)
 
+    def _start_recurring_timer(self):
+        self.recurring_timer = QTimer(self)
+        self.recurring_timer.timeout.connect(self._run_recurring_rules)
+        self.recurring_timer.start(RECURRING_CHECK_MS)
+
+    def _start_backup_timer(self):
+        self._run_backup(manual=False)
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(lambda: self._run_backup(manual=False))
+        self.backup_timer.start(BACKUP_CHECK_MS)
+
+    def _run_backup(self, manual=True):
+        QThreadPool.globalInstance().start(BackupTask(self.backups, self._backup_signals, manual))
+
+    def _on_backup_finished(self, path, error, manual):
+        if error:
+            print(f"Error creando la copia de seguridad: {error}")
+            if manual:
+                QMessageBox.critical(self, "Copia de seguridad", f"No se pudo crear la copia:\n{error}")
+        elif manual:
+            QMessageBox.information(self, "Copia de seguridad", f"Copia creada y verificada:\n{path}")
+
+    def _restore_backup(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Restaurar copia", self.backups.backup_dir, "Copias de Mintly (*.db.gz)"
+        )
+        if not filename:
+            return
+        reply = QMessageBox.question(
+            self,
+            "Restaurar copia",
+            "Se sustituirán todos los datos actuales por los de la copia.\n"
+            "Antes se guardará una copia del estado actual.\n\n¿Continuar?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        try:
+            previous = self.backups.restore(filename)
+        except Exception as e:
+            QMessageBox.critical(self, "Restaurar copia", f"No se pudo restaurar:\n{e}")
+            return
+
+        self.controller.projections.invalidate()
+        self.controller.health_history.invalidate()
+        self.dashboard.schedule_refresh()
+        QMessageBox.information(
+            self, "Restaurar copia", f"Datos restaurados.\n\nEl estado anterior está en:\n{previous}"
+        )
+
+    def _verify_backups(self):
+        snapshots = self.backups.list_snapshots()
+        if not snapshots:
+            QMessageBox.information(self, "Copias de seguridad", "Todavía no hay copias de seguridad.")
+            return
+        lines = []
+        for path in snapshots:
+            result = self.backups.verify(path)
+            status = f"✅ {result['transactions']} transacciones" if result['ok'] else f"❌ {result['errors'][0]}"
+            lines.append(f"{os.path.basename(path)}: {status}")
+        QMessageBox.information(self, "Copias de seguridad", "\n".join(lines))
+
+    def _update_title(self):
+        suffix = "" if self.profile == DEFAULT_PROFILE else f" — {self.profile}"
+        self.setWindowTitle(f"Mintly Tracker{suffix}")
+
+    def _fill_profile_menu(self):
+        self.profile_menu.clear()
+        group = QActionGroup(self.profile_menu)
+        for name in self.profiles.list_profiles():
+            action = QAction(name, self.profile_menu, checkable=True, checked=name == self.profile)
+            action.triggered.connect(lambda _=False, n=name: self._switch_profile(n))
+            group.addAction(action)
+            self.profile_menu.addAction(action)
+
+        self.profile_menu.addSeparator()
+        new_profile = QAction("Nuevo perfil...", self.profile_menu)
+        new_profile.triggered.connect(self._create_profile)
+        self.profile_menu.addAction(new_profile)
+
+        summary = QAction("Resumen de todos los perfiles", self.profile_menu)
+        summary.triggered.connect(self._show_profiles_summary)
+        self.profile_menu.addAction(summary)
+
+    def _switch_profile(self, name):
+        # No se reconstruye la ventana: el mismo controlador pasa a usar la base del otro perfil
+        if name == self.profile:
+            return
+        try:
+            db = self.profiles.get(name)
+        except Exception as e:
+            QMessageBox.critical(self, "Perfiles", f"No se pudo abrir el perfil:\n{e}")
+            return
+
+        self.profile = name
+        self.controller.switch_database(db)
+        self.backups = BackupManager(db)
+        self._update_title()
+        self._run_recurring_rules(reload=False)
+        self.dashboard.schedule_refresh()
+
+    def _create_profile(self):
+        name, ok = QInputDialog.getText(self, "Nuevo perfil", "Nombre del perfil:")
+        if not ok or not name.strip():
+            return
+        try:
+            self.profiles.create_profile(name)
+        except ValueError as e:
+            QMessageBox.warning(self, "Perfiles", str(e))
+            return
+        self._switch_profile(name.strip())
+
+    def _show_profiles_summary(self):
+        today = datetime.now()
+        start = today.replace(day=1).strftime("%Y-%m-%d")
+        summary = self.profiles.get_combined_summary(start, today.strftime("%Y-%m-%d"))
+
+        lines = [f"<h3>Resumen del mes ({today.strftime('%m/%Y')})</h3><table cellspacing='6'>"]
+        lines.append("<tr><th align='left'>Perfil</th><th>Ingresos</th><th>Gastos</th><th>Balance</th></tr>")
+        rows = list(summary['profiles'].items()) + [("<b>Total</b>", summary['total'])]
+        for name, t in rows:
+            lines.append(
+                f"<tr><td>{name}</td><td align='right'>€ {t['total_income']:,.2f}</td>"
+                f"<td align='right'>€ {t['total_expense']:,.2f}</td>"
+                f"<td align='right'>€ {t['balance']:,.2f}</td></tr>"
+            )
+        lines.append("</table>")
+        QMessageBox.information(self, "Perfiles", "".join(lines))
+
+    def _update_undo_actions(self):
+        undo_label = self.controller.get_undo_label()
+        redo_label = self.controller.get_redo_label()
+        self.undo_action.setText(f"Deshacer: {undo_label}" if undo_label else "Deshacer")
+        self.redo_action.setText(f"Rehacer: {redo_label}" if redo_label else "Rehacer")
+        self.undo_action.setEnabled(undo_label is not None)
+        self.redo_action.setEnabled(redo_label is not None)
+
+    def _undo(self):
+        self._after_replay(self.controller.undo(), "Deshecho")
+
+    def _redo(self):
+        self._after_replay(self.controller.redo(), "Rehecho")
+
+    def _after_replay(self, result, verb):
+        if result is None:
+            self.statusBar().showMessage("No hay nada que deshacer" if verb == "Deshecho" else "No hay nada que rehacer", 3000)
+            return
+        # Solo se refresca lo que ha cambiado; los listados leen unas pocas filas, no el libro entero
+        if 'transactions' in result['tables']:
+            self.dashboard.schedule_refresh()
+        else:
+            self.dashboard.refresh_goals()
+        self.statusBar().showMessage(f"{verb}: {result['label']}", 3000)
+        self._update_undo_actions()
+
+    def _run_recurring_rules(self, reload=True):
+        try:
+            created = self.controller.run_recurring_rules()
+        except Exception as e:
+            print(f"Error generando transacciones recurrentes: {e}")
+            return
+        if created and reload:
+            self.dashboard.schedule_refresh()
+
     def _create_menu(self):
         menubar = self.menuBar()
 
         file_menu = menubar.addMenu("Archivo")
 
+        import_csv = QAction("Importar CSV...", self)
+        import_csv.triggered.connect(self._import_csv)
+        file_menu.addAction(import_csv)
+
         export_menu = file_menu.addMenu("Exportar")
 
         export_csv = QAction("CSV", self)
@@ -45,12 +252,47 @@ class MainWindow(QMainWindow):
         export_pdf.triggered.connect(self._export_pdf)
         export_menu.addAction(export_pdf)
 
+        backup_menu = file_menu.addMenu("Copias de seguridad")
+
+        backup_now = QAction("Crear copia ahora", self)
+        backup_now.triggered.connect(lambda: self._run_backup(manual=True))
+        backup_menu.addAction(backup_now)
+
+        restore_backup = QAction("Restaurar copia...", self)
+        restore_backup.triggered.connect(self._restore_backup)
+        backup_menu.addAction(restore_backup)
+
+        verify_backups = QAction("Verificar copias", self)
+        verify_backups.triggered.connect(self._verify_backups)
+        backup_menu.addAction(verify_backups)
+
+        sync_action = QAction("Sincronizar con otro libro...", self)
+        sync_action.triggered.connect(self._sync_with_file)
+        file_menu.addAction(sync_action)
+
+        self.profile_menu = file_menu.addMenu("Perfil")
+        self.profile_menu.aboutToShow.connect(self._fill_profile_menu)
+
         file_menu.addSeparator()
 
         exit_action = QAction("Salir", self)
         exit_action.triggered.connect(self.close)
         file_menu.addAction(exit_action)
 
+        edit_menu = menubar.addMenu("Editar")
+
+        self.undo_action = QAction("Deshacer", self)
+        self.undo_action.setShortcut(QKeySequence.Undo)
+        self.undo_action.triggered.connect(self._undo)
+        edit_menu.addAction(self.undo_action)
+
+        self.redo_action = QAction("Rehacer", self)
+        self.redo_action.setShortcuts([QKeySequence("Ctrl+Y"), QKeySequence.Redo])
+        self.redo_action.triggered.connect(self._redo)
+        edit_menu.addAction(self.redo_action)
+
+        edit_menu.aboutToShow.connect(self._update_undo_actions)
+
         view_menu = menubar.addMenu("Ver")
 
         refresh_action = QAction("Actualizar Datos", self)
@@ -63,6 +305,28 @@ class MainWindow(QMainWindow):
         fullscreen_action.triggered.connect(self._toggle_fullscreen)
         view_menu.addAction(fullscreen_action)
 
+        tools_menu = menubar.addMenu("Herramientas")
+
+        budgets_action = QAction("Presupuestos...", self)
+        budgets_action.triggered.connect(self._show_budgets)
+        tools_menu.addAction(budgets_action)
+
+        categories_action = QAction("Categorías...", self)
+        categories_action.triggered.connect(self._show_categories)
+        tools_menu.addAction(categories_action)
+
+        check_goals_action = QAction("Comprobar saldos de metas", self)
+        check_goals_action.triggered.connect(self._check_goals)
+        tools_menu.addAction(check_goals_action)
+
+        duplicates_action = QAction("Buscar movimientos duplicados", self)
+        duplicates_action.triggered.connect(self._merge_duplicates)
+        tools_menu.addAction(duplicates_action)
+
+        archive_action = QAction("Archivar años cerrados...", self)
+        archive_action.triggered.connect(self._archive_years)
+        tools_menu.addAction(archive_action)
+
         help_menu = menubar.addMenu("Ayuda")
 
         doc_action = QAction("Documentación", self)
@@ -74,6 +338,123 @@ class MainWindow(QMainWindow):
         about_action.triggered.connect(self._show_about)
         help_menu.addAction(about_action)
 
+    def _show_budgets(self):
+        dialog = BudgetDialog(self.controller, self)
+        if dialog.exec():
+            self.dashboard.schedule_refresh('header')
+
+    def _show_categories(self):
+        dialog = CategoriesDialog(self.controller, self)
+        dialog.exec()
+        if dialog.changed:
+            self.dashboard.schedule_refresh()
+
+    def _check_goals(self):
+        issues = self.controller.check_goal_consistency()
+        if not issues:
+            QMessageBox.information(self, "Metas", "Todos los saldos de las metas cuadran con sus aportes.")
+            return
+
+        details = "\n".join(
+            f"• {i['name']}: guardado € {i['stored']:,.2f}, según aportes € {i['expected']:,.2f}" for i in issues
+        )
+        reply = QMessageBox.question(
+            self,
+            "Metas",
+            f"Hay metas cuyo saldo no cuadra:\n\n{details}\n\n¿Recalcular los saldos desde los aportes?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self.controller.check_goal_consistency(repair=True)
+            self.dashboard.schedule_refresh()
+
+    def _merge_duplicates(self):
+        groups = self.controller.find_duplicate_groups()
+        if not groups:
+            QMessageBox.information(self, "Duplicados", "No hay movimientos duplicados.")
+            return
+
+        extra = sum(len(g) - 1 for g in groups)
+        reply = QMessageBox.question(
+            self,
+            "Duplicados",
+            f"Hay {len(groups)} movimientos repetidos ({extra} copias de más).\n\n"
+            "¿Conservar solo el primero de cada grupo y borrar las copias?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            removed = self.controller.merge_duplicates(groups)
+            self.dashboard.schedule_refresh()
+            QMessageBox.information(self, "Duplicados", f"Se han borrado {removed} copias.")
+
+    def _archive_years(self):
+        reply = QMessageBox.question(
+            self,
+            "Archivar años cerrados",
+            "Los movimientos de años anteriores al actual se moverán a archivos por año.\n"
+            "Seguirán apareciendo en búsquedas, listados y estadísticas.\n"
+            "El historial de deshacer se vaciará.\n\n¿Continuar?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        try:
+            archived = self.controller.archive_closed_years(vacuum=True)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo archivar:\n{e}")
+            return
+
+        if not archived:
+            QMessageBox.information(self, "Archivar", "No hay años cerrados que archivar.")
+            return
+        self.dashboard.schedule_refresh()
+        details = "\n".join(f"• {year}: {rows:,} movimientos" for year, rows in archived.items())
+        QMessageBox.information(self, "Archivar", f"Años archivados:\n\n{details}")
+
+    def _import_csv(self):
+        filename, _ = QFileDialog.getOpenFileName(self, "Importar CSV", "", "CSV Files (*.csv)")
+        if not filename:
+            return
+        try:
+            transactions = ExportManager.import_from_csv(filename)
+            ids, skipped = self.controller.import_transactions(transactions)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo importar el CSV:\n{e}")
+            return
+
+        self.dashboard.schedule_refresh()
+        QMessageBox.information(
+            self,
+            "Importación",
+            f"Importados {len(ids)} movimientos.\n"
+            f"Omitidos {skipped} que ya estaban en el libro."
+        )
+
+    def _sync_with_file(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Sincronizar con otro libro", "", "Bases de datos de Mintly (*.db)"
+        )
+        if not filename:
+            return
+        if os.path.abspath(filename) == os.path.abspath(self.controller.db.db_name):
+            QMessageBox.warning(self, "Sincronizar", "Ese es el libro que ya está abierto.")
+            return
+        try:
+            result = self.controller.sync_with(filename)
+        except Exception as e:
+            QMessageBox.critical(self, "Sincronizar", f"No se pudo sincronizar:\n{e}")
+            return
+
+        if result['received']:
+            self.dashboard.schedule_refresh()
+        QMessageBox.information(
+            self,
+            "Sincronizar",
+            f"Cambios recibidos: {result['received']}\n"
+            f"Cambios enviados: {result['sent']}\n"
+            f"Descartados por conflicto: {result['conflicts']}"
+        )
+
     def _show_documentation(self):
         doc_dialog = QDialog(self)
         doc_dialog.setWindowTitle("Documentación - Mintly")
@@ -82,15 +463,7 @@ class MainWindow(QMainWindow):
 
         text_edit = QTextEdit()
         text_edit.setReadOnly(True)
-        text_edit.setStyleSheet("""
-            QTextEdit {
-                background-color: #0F172A;
-                color: #E2E8F0;
-                padding: 20px;
-                border: 1px solid #334155;
-                line-height: 1.6;
-            }
-        """)
+        text_edit.setObjectName("documentation")
 
         current_dir = os.path.dirname(os.path.abspath(__file__))
         root_dir = os.path.dirname(os.path.dirname(current_dir))
@@ -120,7 +493,7 @@ class MainWindow(QMainWindow):
         )
 
         if filename:
-            transactions = self.controller.get_all_transactions()
+            transactions = self.controller.get_transactions_columns()
             goals = self.controller.get_all_savings_goals()
 
             if ExportManager.export_to_csv(transactions, filename, goals):
@@ -141,7 +514,8 @@ class MainWindow(QMainWindow):
         )
 
         if filename:
-            transactions = self.controller.get_all_transactions()
+            # El informe PDF solo muestra las 20 ultimas
+            transactions = self.controller.get_all_transactions(20)
             balance = self.controller.get_monthly_balance()
             goals = self.controller.get_all_savings_goals()
 
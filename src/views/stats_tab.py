@@ -1,30 +1,32 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QGroupBox, QFrame, QProgressBar, QCheckBox
+    QGroupBox, QFrame, QProgressBar, QCheckBox, QComboBox,
+    QTableWidget, QTableWidgetItem, QAbstractItemView, QPushButton
 )
+import numpy as np
 from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor
+from src.utils.theme import COLORS
 from src.widgets.chart_widget import ChartWidget
 from src.models.transaction import TransactionType
 
 
 class StatCard(QFrame):
-    def __init__(self, title: str, value: str, color: str, parent=None):
+    def __init__(self, title: str, value: str, tone: str, parent=None):
         super().__init__(parent)
+        self.setObjectName("metricCard")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(15, 12, 15, 12)
 
         title_label = QLabel(title.upper())
-        title_label.setStyleSheet("font-size: 11px; color: #94A3B8; font-weight: 800; letter-spacing: 0.5px;")
+        title_label.setObjectName("metricTitle")
         layout.addWidget(title_label)
 
         self.value_label = QLabel(value)
-        self.value_label.setStyleSheet(f"font-size: 24px; color: {color}; font-weight: 700;")
+        self.value_label.setObjectName("metricValue")
+        self.value_label.setProperty("tone", tone)
         layout.addWidget(self.value_label)
 
-        self.setStyleSheet("""
-            QFrame { background-color: #1E293B; border: 1px solid #334155; border-radius: 12px; }
-            QFrame:hover { border: 1px solid #475569; background-color: #242F42; }
-        """)
         self.setFixedHeight(95)
 
     def set_value(self, value: str):
@@ -32,27 +34,25 @@ class StatCard(QFrame):
 
 
 class RatioCard(QFrame):
-    def __init__(self, title: str, color: str, parent=None):
+    def __init__(self, title: str, tone: str, parent=None):
         super().__init__(parent)
+        self.setObjectName("ratioCard")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(12, 8, 12, 12)
         layout.setSpacing(5)
 
         title_label = QLabel(title)
-        title_label.setStyleSheet("font-size: 11px; color: #94A3B8; font-weight: 600;")
+        title_label.setObjectName("ratioTitle")
 
         self.progress = QProgressBar()
         self.progress.setFixedHeight(18)
         self.progress.setTextVisible(True)
         self.progress.setAlignment(Qt.AlignCenter)
-        self.progress.setStyleSheet(f"""
-            QProgressBar {{ background: #0F172A; border-radius: 9px; text-align: center; color: white; font-weight: 800; font-size: 10px; }}
-            QProgressBar::chunk {{ background: {color}; border-radius: 9px; }}
-        """)
+        self.progress.setObjectName("ratioProgress")
+        self.progress.setProperty("tone", tone)
 
         layout.addWidget(title_label)
         layout.addWidget(self.progress)
-        self.setStyleSheet("background-color: #0F172A; border: 1px solid #1E293B; border-radius: 10px;")
         self.setFixedHeight(75)
 
     def update_ratio(self, percentage: float):
@@ -67,8 +67,11 @@ class StatisticsTab(QWidget):
         self.expenses_data = {}
         self.incomes_data = {}
         self.savings_data = {}
+        # Categoria cuyo desglose muestra el grafico (None: primer nivel)
+        self.drill_parent = None
+        self.series_window = None
         self._setup_ui()
-        self.load_data()
+        # Los datos los carga el Dashboard (RefreshScheduler) la primera vez que se abre la pestaña
 
     def _setup_ui(self):
         main_layout = QVBoxLayout(self)
@@ -76,14 +79,14 @@ class StatisticsTab(QWidget):
         main_layout.setSpacing(20)
 
         title = QLabel("Análisis de tus Finanzas")
-        title.setStyleSheet("font-size: 26px; font-weight: 800; color: #F1F5F9;")
+        title.setObjectName("statsTitle")
         main_layout.addWidget(title)
 
         top_cards = QHBoxLayout()
-        self.income_card = StatCard("Ingresos", "€ 0.00", "#10B981")
-        self.expense_card = StatCard("Gastos", "€ 0.00", "#EF4444")
-        self.savings_card = StatCard("Ahorrado", "€ 0.00", "#F59E0B")
-        self.balance_card = StatCard("Balance", "€ 0.00", "#3B82F6")
+        self.income_card = StatCard("Ingresos", "€ 0.00", "success")
+        self.expense_card = StatCard("Gastos", "€ 0.00", "danger")
+        self.savings_card = StatCard("Ahorrado", "€ 0.00", "warning")
+        self.balance_card = StatCard("Balance", "€ 0.00", "primary")
 
         for card in [self.income_card, self.expense_card, self.savings_card, self.balance_card]:
             top_cards.addWidget(card)
@@ -92,20 +95,34 @@ class StatisticsTab(QWidget):
         body_layout = QHBoxLayout()
 
         chart_container = QGroupBox("Gráficos")
-        chart_container.setStyleSheet(self._group_box_style())
+        chart_container.setObjectName("panel")
         chart_layout = QVBoxLayout(chart_container)
         chart_layout.setContentsMargins(15, 30, 15, 15)
 
         controls = QHBoxLayout()
-        self.show_incomes_cb = self._create_cb("Ingresos", "#10B981")
-        self.show_expenses_cb = self._create_cb("Gastos", "#EF4444")
-        self.show_savings_cb = self._create_cb("Ahorros", "#F59E0B")
+        self.show_incomes_cb = self._create_cb("Ingresos", "success")
+        self.show_expenses_cb = self._create_cb("Gastos", "danger")
+        self.show_savings_cb = self._create_cb("Ahorros", "warning")
         for cb in [self.show_incomes_cb, self.show_expenses_cb, self.show_savings_cb]:
             controls.addWidget(cb)
         controls.addStretch()
         chart_layout.addLayout(controls)
 
-        self.unified_chart = ChartWidget()
+        # Desglose por subcategorias, un nivel cada vez
+        drill = QHBoxLayout()
+        self.drill_up_btn = QPushButton("↑ Subir")
+        self.drill_up_btn.clicked.connect(self._drill_up)
+        self.drill_path_label = QLabel("Todas las categorías")
+        self.drill_path_label.setObjectName("trendHint")
+        self.drill_combo = QComboBox()
+        self.drill_combo.activated.connect(self._drill_down)
+        drill.addWidget(self.drill_up_btn)
+        drill.addWidget(self.drill_path_label)
+        drill.addStretch()
+        drill.addWidget(self.drill_combo)
+        chart_layout.addLayout(drill)
+
+        self.unified_chart = ChartWidget(threaded=True)
         chart_layout.addWidget(self.unified_chart)
         body_layout.addWidget(chart_container, stretch=70)
 
@@ -113,41 +130,46 @@ class StatisticsTab(QWidget):
         side_panel.setSpacing(15)
 
         health_group = QGroupBox("Salud Financiera")
-        health_group.setStyleSheet(self._group_box_style())
+        health_group.setObjectName("panel")
         h_layout = QVBoxLayout(health_group)
         h_layout.setContentsMargins(15, 35, 15, 15)
         h_layout.setSpacing(10)
 
         self.health_score_label = QLabel("0/100")
-        self.health_score_label.setStyleSheet("font-size: 32px; font-weight: 900; color: white;")
+        self.health_score_label.setObjectName("healthScore")
         self.health_score_label.setAlignment(Qt.AlignCenter)
 
         self.health_progress = QProgressBar()
         self.health_progress.setFixedHeight(10)
         self.health_progress.setTextVisible(False)
-        self.health_progress.setStyleSheet("""
-            QProgressBar { background: #0F172A; border-radius: 5px; }
-            QProgressBar::chunk { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #EF4444, stop:1 #10B981); border-radius: 5px; }
-        """)
+        self.health_progress.setObjectName("healthProgress")
 
         self.health_message = QLabel("Añade movimientos para analizar")
-        self.health_message.setStyleSheet("color: #F1F5F9; font-size: 12px; font-style: italic;")
+        self.health_message.setObjectName("healthMessage")
         self.health_message.setWordWrap(True)
         self.health_message.setAlignment(Qt.AlignCenter)
 
+        self.health_trend = ChartWidget(threaded=True)
+        self.health_trend.setFixedHeight(48)
+        self.health_trend_label = QLabel("")
+        self.health_trend_label.setObjectName("trendHint")
+        self.health_trend_label.setAlignment(Qt.AlignCenter)
+
         h_layout.addWidget(self.health_score_label)
         h_layout.addWidget(self.health_progress)
         h_layout.addWidget(self.health_message)
+        h_layout.addWidget(self.health_trend)
+        h_layout.addWidget(self.health_trend_label)
         side_panel.addWidget(health_group)
 
         ratios_group = QGroupBox("Porcentajes para tener un control")
-        ratios_group.setStyleSheet(self._group_box_style())
+        ratios_group.setObjectName("panel")
         r_layout = QVBoxLayout(ratios_group)
         r_layout.setContentsMargins(15, 35, 15, 15)
         r_layout.setSpacing(12)
 
-        self.savings_rate_card = RatioCard("TASA DE AHORRO", "#10B981")
-        self.expense_rate_card = RatioCard("TASA DE GASTO", "#EF4444")
+        self.savings_rate_card = RatioCard("TASA DE AHORRO", "success")
+        self.expense_rate_card = RatioCard("TASA DE GASTO", "danger")
 
         r_layout.addWidget(self.savings_rate_card)
         r_layout.addWidget(self.expense_rate_card)
@@ -156,11 +178,85 @@ class StatisticsTab(QWidget):
         body_layout.addLayout(side_panel, stretch=30)
         main_layout.addLayout(body_layout)
 
-    def _create_cb(self, text, color):
+        trend_group = QGroupBox("Evolución")
+        trend_group.setObjectName("panel")
+        t_layout = QVBoxLayout(trend_group)
+        t_layout.setContentsMargins(15, 30, 15, 15)
+
+        t_controls = QHBoxLayout()
+        trend_hint = QLabel("Rueda para ampliar, arrastra para desplazar")
+        trend_hint.setObjectName("trendHint")
+        self.trend_granularity = QComboBox()
+        for label, granularity in (("Diario", 'day'), ("Semanal", 'week'), ("Mensual", 'month')):
+            self.trend_granularity.addItem(label, granularity)
+        self.trend_granularity.setCurrentIndex(2)
+        self.trend_granularity.currentIndexChanged.connect(self._load_trend)
+        t_controls.addWidget(trend_hint)
+        t_controls.addStretch()
+        t_controls.addWidget(self.trend_granularity)
+        t_layout.addLayout(t_controls)
+
+        self.trend_chart = ChartWidget()
+        self.trend_chart.setMinimumHeight(220)
+        t_layout.addWidget(self.trend_chart)
+        main_layout.addWidget(trend_group)
+
+        pivot_group = QGroupBox("Comparativa mensual por categoría")
+        pivot_group.setObjectName("panel")
+        p_layout = QVBoxLayout(pivot_group)
+        p_layout.setContentsMargins(15, 30, 15, 15)
+
+        p_controls = QHBoxLayout()
+        self.pivot_type = QComboBox()
+        for label, t_type in (("Gastos", TransactionType.EXPENSE), ("Ingresos", TransactionType.INCOME),
+                              ("Ahorros", TransactionType.SAVINGS)):
+            self.pivot_type.addItem(label, t_type)
+        self.pivot_range = QComboBox()
+        for label, months in (("12 meses", 12), ("3 años", 36), ("Todo", None)):
+            self.pivot_range.addItem(label, months)
+        self.pivot_type.currentIndexChanged.connect(self._load_pivot)
+        self.pivot_range.currentIndexChanged.connect(self._load_pivot)
+        p_controls.addWidget(self.pivot_type)
+        p_controls.addWidget(self.pivot_range)
+        p_controls.addStretch()
+        p_layout.addLayout(p_controls)
+
+        self.pivot_table = QTableWidget()
+        self.pivot_table.setObjectName("pivotTable")
+        self.pivot_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.pivot_table.setMinimumHeight(260)
+        p_layout.addWidget(self.pivot_table)
+        main_layout.addWidget(pivot_group)
+
+        forecast_group = QGroupBox("Proyección del Balance")
+        forecast_group.setObjectName("panel")
+        f_layout = QVBoxLayout(forecast_group)
+        f_layout.setContentsMargins(15, 30, 15, 15)
+
+        f_controls = QHBoxLayout()
+        self.forecast_label = QLabel("Sin datos suficientes")
+        self.forecast_label.setObjectName("forecastLabel")
+        self.forecast_months = QComboBox()
+        for months in (3, 6, 12):
+            self.forecast_months.addItem(f"{months} meses", months)
+        self.forecast_months.setCurrentIndex(1)
+        self.forecast_months.currentIndexChanged.connect(self._update_forecast)
+        f_controls.addWidget(self.forecast_label)
+        f_controls.addStretch()
+        f_controls.addWidget(self.forecast_months)
+        f_layout.addLayout(f_controls)
+
+        self.forecast_chart = ChartWidget(threaded=True)
+        self.forecast_chart.setMinimumHeight(220)
+        f_layout.addWidget(self.forecast_chart)
+        main_layout.addWidget(forecast_group)
+
+    def _create_cb(self, text, tone):
         cb = QCheckBox(text)
         cb.setChecked(True)
         cb.stateChanged.connect(self._update_chart)
-        cb.setStyleSheet(f"color: {color}; font-weight: bold; font-size: 12px;")
+        cb.setObjectName("seriesToggle")
+        cb.setProperty("tone", tone)
         return cb
 
     def _update_chart(self):
@@ -173,11 +269,13 @@ class StatisticsTab(QWidget):
             (self.show_savings_cb, self.savings_data, "#F59E0B")
         ]
 
+        # Cada categoria con su color del catalogo; el del tipo si no tiene uno propio
+        category_colors = self.controller.get_category_colors()
         for cb, data, color in data_map:
             if cb.isChecked():
                 for cat, amount in data.items():
                     combined_data[cat] = combined_data.get(cat, 0) + amount
-                    combined_colors[cat] = color
+                    combined_colors[cat] = category_colors.get(cat, color)
 
         if not combined_data:
             self.unified_chart.set_data({}, "Sin datos en la aplicación", {})
@@ -185,7 +283,41 @@ class StatisticsTab(QWidget):
 
         self.unified_chart.set_data(combined_data, "Distribución", combined_colors)
 
+    def _load_chart_level(self):
+        # Cada categoria del nivel con el total de su subarbol, ya agregado en la base de datos
+        if self.drill_parent is not None and not self.controller.get_category_path(self.drill_parent):
+            self.drill_parent = None
+        parent = self.drill_parent
+        self.incomes_data = self.controller.get_subtree_totals(TransactionType.INCOME, parent)
+        self.expenses_data = self.controller.get_subtree_totals(TransactionType.EXPENSE, parent)
+        self.savings_data = self.controller.get_subtree_totals(TransactionType.SAVINGS, parent)
+
+        categories = self.controller.get_categories()
+        with_children = {c.parent_id for c in categories}
+        self.drill_combo.clear()
+        self.drill_combo.addItem("Ver subcategorías de...", None)
+        for category in categories:
+            if category.parent_id == parent and category.id in with_children:
+                self.drill_combo.addItem(category.name, category.id)
+        self.drill_combo.setEnabled(self.drill_combo.count() > 1)
+
+        path = self.controller.get_category_path(parent) if parent is not None else []
+        self.drill_path_label.setText(" › ".join(c.name for c in path) or "Todas las categorías")
+        self.drill_up_btn.setEnabled(parent is not None)
+        self._update_chart()
+
+    def _drill_down(self, index):
+        category_id = self.drill_combo.itemData(index)
+        if category_id is not None:
+            self.drill_parent = category_id
+            self._load_chart_level()
 
+    def _drill_up(self):
+        if self.drill_parent is None:
+            return
+        path = self.controller.get_category_path(self.drill_parent)
+        self.drill_parent = path[-1].parent_id if path else None
+        self._load_chart_level()
 
     def load_data(self):
         balance = self.controller.get_monthly_balance()
@@ -194,15 +326,13 @@ class StatisticsTab(QWidget):
         self.savings_card.set_value(f"€ {balance['total_savings']:,.2f}")
         self.balance_card.set_value(f"€ {balance['balance']:,.2f}")
 
-        self.expenses_data = self.controller.get_expenses_by_category()
-        self.incomes_data = self.controller.get_income_by_category()
-        self.savings_data = self.controller.get_savings_by_category()
-        self._update_chart()
+        self._load_chart_level()
 
         health = self.controller.get_financial_health_score()
         self.health_score_label.setText(f"{health['score']}/100")
         self.health_progress.setValue(health['score'])
         self.health_message.setText(health['message'])
+        self._update_health_trend()
 
         inc = balance['total_income']
         if inc > 0:
@@ -211,10 +341,101 @@ class StatisticsTab(QWidget):
             self.savings_rate_card.update_ratio(s_rate)
             self.expense_rate_card.update_ratio(e_rate)
 
+        self._load_trend()
+        self._load_pivot()
+        self._update_forecast()
+
+    def _update_health_trend(self):
+        # Ultimos 24 meses; el historico completo se calcula igual, pero no cabe en la tarjeta
+        history = self.controller.get_health_history()
+        scores = history['scores'][-24:]
+        self.health_trend.set_sparkline(scores.tolist(), "#10B981", (0, 100))
+        if scores.size > 1:
+            months = history['months'][-24:]
+            self.health_trend_label.setText(
+                f"{months[0]} → {months[-1]}: media {scores.mean():.0f}, mejor {scores.max()}"
+            )
+        else:
+            self.health_trend_label.setText("")
+
+    def _load_trend(self):
+        # Ventana nueva: los datos pueden haber cambiado desde la ultima carga
+        self.series_window = self.controller.get_series_window(self.trend_granularity.currentData())
+        bounds = self.series_window.bounds()
+        if bounds is None:
+            self.trend_chart.set_time_series([], "Evolución")
+            return
+        data = self.series_window.load(*bounds)
+        self.trend_chart.set_time_series(self._trend_series(data), "Evolución", self._on_trend_range)
+
+    def _on_trend_range(self, start, end):
+        # Solo se consulta el tramo que no estuviera ya cargado
+        self.trend_chart.update_time_series(self._trend_series(self.series_window.load(start, end)))
+
     @staticmethod
-    def _group_box_style():
-        return """
-            QGroupBox { font-size: 13px; font-weight: 800; color: #94A3B8; border: 2px solid #334155; 
-                        border-radius: 12px; margin-top: 20px; background-color: #1E293B; }
-            QGroupBox::title { subcontrol-origin: margin; left: 15px; padding: 0 8px; }
-        """
\ No newline at end of file
+    def _trend_series(data: dict) -> list:
+        return [
+            ("Ingresos", data['dates'], data['income'], "#10B981"),
+            ("Gastos", data['dates'], data['expense'], "#EF4444"),
+            ("Ahorros", data['dates'], data['savings'], "#F59E0B"),
+            ("Balance", data['dates'], data['balance'], "#3B82F6")
+        ]
+
+    def _load_pivot(self):
+        t_type = self.pivot_type.currentData()
+        pivot = self.controller.get_category_pivot(t_type, self.pivot_range.currentData())
+        diff, pct = pivot.deltas()
+        totals = pivot.totals_by_month()
+        total_diff = np.diff(totals, prepend=np.nan)
+
+        # Intensidad de cada celda respecto a la mayor de la tabla, calculada de una vez
+        peak = pivot.values.max() if pivot.values.size else 0.0
+        alpha = (pivot.values / peak * 200).astype(int) if peak > 0 else np.zeros(pivot.values.shape, dtype=int)
+        tone = {TransactionType.INCOME: 'success', TransactionType.SAVINGS: 'warning'}.get(t_type, 'danger')
+        base = QColor(COLORS[tone])
+
+        table = self.pivot_table
+        table.setUpdatesEnabled(False)
+        table.clear()
+        table.setRowCount(len(pivot))
+        table.setColumnCount(len(pivot.categories) + 2)
+        table.setHorizontalHeaderLabels(pivot.categories + ["Total", "Δ mes anterior"])
+        # El mes mas reciente arriba
+        table.setVerticalHeaderLabels(pivot.month_labels()[::-1])
+
+        for row, i in enumerate(range(len(pivot) - 1, -1, -1)):
+            for j in range(len(pivot.categories)):
+                value = pivot.values[i, j]
+                if not value:
+                    continue
+                item = QTableWidgetItem(f"{value:,.0f}")
+                color = QColor(base)
+                color.setAlpha(int(alpha[i, j]))
+                item.setBackground(color)
+                if not np.isnan(pct[i, j]):
+                    item.setToolTip(f"{diff[i, j]:+,.2f} € ({pct[i, j]:+.1f}%) respecto al mes anterior")
+                table.setItem(row, j, item)
+            table.setItem(row, len(pivot.categories), QTableWidgetItem(f"{totals[i]:,.0f}"))
+            if not np.isnan(total_diff[i]):
+                table.setItem(row, len(pivot.categories) + 1, QTableWidgetItem(f"{total_diff[i]:+,.0f}"))
+        table.setUpdatesEnabled(True)
+
+    def _update_forecast(self):
+        months = self.forecast_months.currentData()
+        result = self.controller.get_cash_flow_forecast(months)
+        if result['dates'].size == 0:
+            self.forecast_label.setText("Sin datos suficientes")
+            self.forecast_chart.set_line_data([], "Proyección")
+            return
+
+        # Solo el ultimo año del historico para que se aprecie la proyeccion
+        cutoff = result['history_dates'][-1] - np.timedelta64(365, 'D')
+        recent = result['history_dates'] >= cutoff
+        self.forecast_label.setText(
+            f"Balance estimado en {months} meses: € {result['balance'][-1]:,.2f} "
+            f"(flujo medio diario € {result['daily_mean']:,.2f})"
+        )
+        self.forecast_chart.set_line_data([
+            ("Histórico", result['history_dates'][recent], result['history_balance'][recent], "#3B82F6", "-"),
+            ("Proyección", result['dates'], result['balance'], "#F59E0B", "--")
+        ], "Balance acumulado")
@@ -1,21 +1,24 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont
+from src.utils.theme import set_tone
 
 
 class BalanceCard(QWidget):
     clicked = Signal()
 
-    def __init__(self, title: str, amount: float = 0.0, subtitle: str = "", color: str = "#3498DB", parent=None):
+    def __init__(self, title: str, amount: float = 0.0, subtitle: str = "", tone: str = "primary", parent=None):
         super().__init__(parent)
 
         self.title_text = title
         self.amount_value = amount
         self.subtitle_text = subtitle
-        self.accent_color = color
+        self.tone = tone
 
         self._setup_ui()
-        self._apply_styles()
+        # El color sale del tema de la aplicacion segun la propiedad "tone"
+        self.setProperty("tone", tone)
+        self.amount_label.setProperty("tone", tone)
 
     def _setup_ui(self):
         layout = QVBoxLayout(self)
@@ -56,33 +59,6 @@ class BalanceCard(QWidget):
 
         self.setCursor(Qt.PointingHandCursor)
 
-    def _apply_styles(self):
-        self.setStyleSheet(f"""
-            BalanceCard {{
-                background-color: palette(base);
-                border-left: 5px solid {self.accent_color};
-                border-radius: 12px;
-                min-height: 140px;
-            }}
-            
-            BalanceCard:hover {{
-                background-color: palette(alternate-base);
-            }}
-            
-            QLabel#cardTitle {{
-                color: palette(text);
-                opacity: 0.7;
-            }}
-            
-            QLabel#cardAmount {{
-                color: {self.accent_color};
-            }}
-            
-            QLabel#cardSubtitle {{
-                color: palette(text);
-                opacity: 0.6;
-            }}
-        """)
     @staticmethod
     def _format_amount(amount: float) -> str:
         if amount >= 0:
@@ -98,9 +74,10 @@ class BalanceCard(QWidget):
         self.subtitle_text = subtitle
         self.subtitle_label.setText(subtitle)
 
-    def set_color(self, color: str):
-        self.accent_color = color
-        self._apply_styles()
+    def set_tone(self, tone: str):
+        self.tone = tone
+        set_tone(self, tone)
+        set_tone(self.amount_label, tone)
     
     def mouse_press_event(self, event):
         if event.button() == Qt.LeftButton:
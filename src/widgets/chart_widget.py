@@ -1,77 +1,312 @@
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
+from matplotlib.patches import Circle
 from PySide6.QtWidgets import QWidget, QVBoxLayout
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QImage, QPainter
 import re
 import warnings
+from src.utils.timeseries import downsample
 
 warnings.filterwarnings("ignore", category=UserWarning, module="matplotlib")
 
+BACKGROUND = '#1E293B'
+# Puntos por pulgada de las figuras: el tamaño en pixeles es el del widget
+DPI = 100
+
+
+def _clean_text(text):
+    return re.sub(r'[^\w\s,.€%]', '', str(text)).strip()
+
+
+def _draw_empty(ax):
+    ax.text(0.5, 0.5, 'Sin datos', ha='center', va='center', color='#94A3B8')
+    ax.set_axis_off()
+
+
+def draw_bars(figure, ax, data, title, colors_map=None, chart_type="barras"):
+    """Totales por categoria en barras o sectores. Solo usa la figura que recibe."""
+    ax.clear()
+    ax.set_facecolor(BACKGROUND)
+
+    if not data:
+        _draw_empty(ax)
+        return
+
+    ax.set_axis_on()
+
+    labels = [_clean_text(k) for k in data.keys()]
+    values = list(data.values())
+
+    colors = []
+    for original_key in data.keys():
+        colors.append(colors_map.get(original_key, '#3B82F6') if colors_map else '#3B82F6')
+
+    if chart_type == "sectores":
+        ax.pie(
+            values, labels=labels, autopct='%1.1f%%',
+            startangle=140, colors=colors,
+            textprops={'color': "#F8FAFC", 'weight': 'bold'},
+            pctdistance=0.85
+        )
+        ax.add_artist(Circle((0, 0), 0.70, fc=BACKGROUND))
+
+        ax.legend(labels, loc="upper right", bbox_to_anchor=(1.1, 1),
+                  fontsize=8, labelcolor='#F8FAFC', frameon=False)
+    else:
+        bars = ax.bar(labels, values, color=colors, edgecolor='#334155')
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width() / 2., height,
+                    f'€{height:,.0f}', ha='center', va='bottom', color='#F8FAFC')
+
+        for spine in ax.spines.values():
+            spine.set_color('#334155')
+
+    ax.set_title(_clean_text(title), pad=20, color='#F8FAFC', fontweight='bold')
+    figure.tight_layout()
+
+
+def draw_lines(figure, ax, series, title):
+    """series: lista de (etiqueta, fechas, valores, color, estilo de linea)."""
+    ax.clear()
+    ax.set_facecolor(BACKGROUND)
+
+    if not series or all(len(x) == 0 for _, x, _, _, _ in series):
+        _draw_empty(ax)
+        return
+
+    ax.set_axis_on()
+    for label, x, values, color, style in series:
+        ax.plot(x, values, linestyle=style, color=color, linewidth=1.6, label=_clean_text(label))
+
+    for spine in ax.spines.values():
+        spine.set_color('#334155')
+    ax.tick_params(colors='#94A3B8', labelsize=8)
+    ax.grid(color='#334155', linewidth=0.5, alpha=0.6)
+    ax.legend(loc="upper left", fontsize=8, labelcolor='#F8FAFC', frameon=False)
+
+    ax.set_title(_clean_text(title), pad=12, color='#F8FAFC', fontweight='bold')
+    figure.autofmt_xdate()
+    figure.tight_layout()
+
+
+def draw_sparkline(figure, ax, values, color, limits=None):
+    """Linea minima sin ejes ni texto, para tendencias dentro de una tarjeta."""
+    ax.clear()
+    ax.set_facecolor(BACKGROUND)
+    ax.set_axis_off()
+    figure.subplots_adjust(left=0.01, right=0.99, top=0.95, bottom=0.05)
+    if len(values) == 0:
+        return
+    x = range(len(values))
+    ax.plot(x, values, color=color, linewidth=1.4)
+    ax.fill_between(x, values, limits[0] if limits else min(values), color=color, alpha=0.15)
+    ax.plot([len(values) - 1], [values[-1]], marker='o', markersize=3, color=color)
+    if limits:
+        ax.set_ylim(*limits)
+
+
+class RenderSignals(QObject):
+    # (numero de render, (QImage, lienzo Agg que es dueño de su memoria))
+    finished = Signal(int, object)
+
+
+class RenderTask(QRunnable):
+    # Dibuja la figura con Agg en un hilo del pool. Antes de cada paso caro se comprueba si el
+    # widget ya ha pedido otro render; si es asi se abandona sin terminar
+    def __init__(self, signals: RenderSignals, seq: int, latest, draw, args: tuple,
+                 width: int, height: int, ratio: float):
+        super().__init__()
+        self.signals = signals
+        self.seq = seq
+        self.latest = latest
+        self.draw = draw
+        self.args = args
+        self.width = width
+        self.height = height
+        self.ratio = ratio
+
+    def _stale(self) -> bool:
+        return self.latest() != self.seq
+
+    def run(self):
+        if self._stale():
+            return
+        try:
+            dpi = DPI * self.ratio
+            figure = Figure(figsize=(self.width / DPI, self.height / DPI), dpi=dpi, facecolor=BACKGROUND)
+            canvas = FigureCanvasAgg(figure)
+            self.draw(figure, figure.add_subplot(111), *self.args)
+            if self._stale():
+                return
+            canvas.draw()
+            if self._stale():
+                return
+            # La QImage usa directamente el buffer RGBA del renderer, sin copiarlo
+            buffer = canvas.buffer_rgba()
+            height, width = buffer.shape[:2]
+            image = QImage(buffer, width, height, width * 4, QImage.Format_RGBA8888)
+            image.setDevicePixelRatio(self.ratio)
+        except Exception as e:
+            print(f"Error dibujando el gráfico: {e}")
+            return
+        self.signals.finished.emit(self.seq, (image, canvas))
+
 
 class ChartWidget(QWidget):
-    def __init__(self, parent=None):
+    # Con threaded=True el grafico se dibuja fuera del hilo de la interfaz y se pinta como
+    # imagen; sin el se usa el lienzo Qt de matplotlib, que permite ampliar y desplazar
+    def __init__(self, parent=None, threaded: bool = False):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
         self.layout.setContentsMargins(0, 0, 0, 0)
+        self.threaded = threaded
 
         plt.rcParams.update({
             'text.color': '#F8FAFC',
             'axes.labelcolor': '#94A3B8',
             'font.size': 9,
             'legend.edgecolor': '#334155',
-            'legend.facecolor': '#1E293B'
+            'legend.facecolor': BACKGROUND
         })
 
-        self.figure = Figure(figsize=(5, 4), dpi=100, facecolor='#1E293B')
+        # Modo serie temporal: rueda para ampliar y arrastrar para desplazar
+        self._on_range_changed = None
+        self._ts_lines = []
+        self._drag = None
+
+        if threaded:
+            self.figure = self.canvas = self.ax = None
+            self._image = None
+            self._image_owner = None
+            self._render_seq = 0
+            self._render_spec = None
+            self._render_signals = RenderSignals(self)
+            self._render_signals.finished.connect(self._on_rendered)
+            return
+
+        self.figure = Figure(figsize=(5, 4), dpi=DPI, facecolor=BACKGROUND)
         self.canvas = FigureCanvas(self.figure)
         self.layout.addWidget(self.canvas)
         self.ax = self.figure.add_subplot(111)
 
-    @staticmethod
-    def _clean_text(text):
-        return re.sub(r'[^\w\s,.€%]', '', str(text)).strip()
+        self.canvas.mpl_connect('scroll_event', self._on_scroll)
+        self.canvas.mpl_connect('button_press_event', self._on_press)
+        self.canvas.mpl_connect('motion_notify_event', self._on_motion)
+        self.canvas.mpl_connect('button_release_event', self._on_release)
 
     def set_data(self, data, title, colors_map=None, chart_type="barras"):
-        self.ax.clear()
-        self.ax.set_facecolor('#1E293B')
+        self._show(draw_bars, (data, title, colors_map, chart_type))
+
+    def set_line_data(self, series, title):
+        """series: lista de (etiqueta, fechas, valores, color, estilo de linea)."""
+        self._show(draw_lines, (series, title))
+
+    def set_sparkline(self, values, color='#3B82F6', limits=None):
+        self._show(draw_sparkline, (values, color, limits))
+
+    def _show(self, draw, args: tuple):
+        self._on_range_changed = None
+        if self.threaded:
+            self._render_spec = (draw, args)
+            self._request_render()
+            return
+        draw(self.figure, self.ax, *args)
+        self.canvas.draw()
+
+    def _request_render(self):
+        # Cada peticion deja obsoletas las anteriores, terminen o no
+        self._render_seq += 1
+        if self._render_spec is None or not self.isVisible() or self.width() < 10 or self.height() < 10:
+            return
+        draw, args = self._render_spec
+        QThreadPool.globalInstance().start(RenderTask(
+            self._render_signals, self._render_seq, lambda: self._render_seq, draw, args,
+            self.width(), self.height(), self.devicePixelRatioF()
+        ))
+
+    def _on_rendered(self, seq: int, result):
+        if seq != self._render_seq:
+            return
+        self._image, self._image_owner = result
+        self.update()
+
+    def paintEvent(self, event):
+        if not self.threaded or self._image is None:
+            return super().paintEvent(event)
+        QPainter(self).drawImage(0, 0, self._image)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.threaded:
+            self._request_render()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Lo pedido mientras la pestaña estaba oculta se dibuja al mostrarse
+        if self.threaded and self._render_spec is not None:
+            self._request_render()
+
+    def set_time_series(self, series, title, on_range_changed=None):
+        """
+        series: lista de (etiqueta, fechas, valores, color). Cada serie se reduce con LTTB a
+        tantos puntos como pixeles de ancho tiene el grafico. Si se pasa on_range_changed(inicio,
+        fin), se llama al ampliar o desplazar el eje con las fechas que han quedado a la vista
+        (solo con el lienzo interactivo, no en modo threaded).
+        """
+        points = max(3, self.width())
+        self.set_line_data([
+            (label, *downsample(x, values, points), color, "-") for label, x, values, color in series
+        ], title)
+        if self.threaded:
+            return
+        self._ts_lines = list(self.ax.get_lines())
+        self._on_range_changed = on_range_changed if self._ts_lines else None
+
+    def update_time_series(self, series):
+        """Cambia los puntos de las lineas sin rehacer el grafico (tras desplazar o ampliar)."""
+        points = max(3, self.canvas.width())
+        for line, (_, x, values, _) in zip(self._ts_lines, series):
+            line.set_data(*downsample(x, values, points))
+        self.ax.relim()
+        self.ax.autoscale_view(scalex=False)
+        self.canvas.draw_idle()
+
+    def _visible_range(self) -> tuple:
+        lo, hi = self.ax.get_xlim()
+        return mdates.num2date(lo).date(), mdates.num2date(hi).date()
+
+    def _emit_range(self):
+        if self._on_range_changed:
+            self._on_range_changed(*self._visible_range())
+
+    def _on_scroll(self, event):
+        if not self._on_range_changed or event.inaxes is not self.ax or event.xdata is None:
+            return
+        factor = 0.8 if event.button == 'up' else 1.25
+        lo, hi = self.ax.get_xlim()
+        x = event.xdata
+        self.ax.set_xlim(x - (x - lo) * factor, x + (hi - x) * factor)
+        self._emit_range()
+
+    def _on_press(self, event):
+        if self._on_range_changed and event.button == 1 and event.inaxes is self.ax:
+            self._drag = (event.x, self.ax.get_xlim())
 
-        if not data:
-            self.ax.text(0.5, 0.5, 'Sin datos', ha='center', va='center', color='#94A3B8')
-            self.ax.set_axis_off()
-            self.canvas.draw()
+    def _on_motion(self, event):
+        if self._drag is None:
             return
+        start_x, (lo, hi) = self._drag
+        # En pixeles: xdata cambia mientras se mueve el eje
+        shift = (event.x - start_x) * (hi - lo) / self.ax.bbox.width
+        self.ax.set_xlim(lo - shift, hi - shift)
+        self.canvas.draw_idle()
 
-        self.ax.set_axis_on()
-
-        labels = [self._clean_text(k) for k in data.keys()]
-        values = list(data.values())
-
-        colors = []
-        for original_key in data.keys():
-            colors.append(colors_map.get(original_key, '#3B82F6') if colors_map else '#3B82F6')
-
-        if chart_type == "sectores":
-            self.ax.pie(
-                values, labels=labels, autopct='%1.1f%%',
-                startangle=140, colors=colors,
-                textprops={'color': "#F8FAFC", 'weight': 'bold'},
-                pctdistance=0.85
-            )
-            centre_circle = plt.Circle((0, 0), 0.70, fc='#1E293B')
-            self.figure.gca().add_artist(centre_circle)
-
-            self.ax.legend(labels, loc="upper right", bbox_to_anchor=(1.1, 1),
-                           fontsize=8, labelcolor='#F8FAFC', frameon=False)
-        else:
-            bars = self.ax.bar(labels, values, color=colors, edgecolor='#334155')
-            for bar in bars:
-                height = bar.get_height()
-                self.ax.text(bar.get_x() + bar.get_width() / 2., height,
-                             f'€{height:,.0f}', ha='center', va='bottom', color='#F8FAFC')
-
-            for spine in self.ax.spines.values():
-                spine.set_color('#334155')
-
-        self.ax.set_title(self._clean_text(title), pad=20, color='#F8FAFC', fontweight='bold')
-        self.figure.tight_layout()
-        self.canvas.draw()
\ No newline at end of file
+    def _on_release(self, event):
+        if self._drag is not None:
+            self._drag = None
+            self._emit_range()
@@ -0,0 +1,168 @@
+import unittest
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.database import Database
+from src.controllers.mintly import Mintly
+from src.api.server import ApiServer
+
+
+class TestKeysetPagination(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_api.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_pages_cover_all_rows_in_order(self):
+        self.db.add_transactions([
+            Transaction(TransactionType.EXPENSE, float(i), "🎬 Ocio", "", f"2024-01-{i % 28 + 1:02d}")
+            for i in range(23)
+        ])
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.db.get_transactions_page(limit=5, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 23)
+        self.assertEqual(len({t.id for t in seen}), 23)
+        keys = [(t.date, t.id) for t in seen]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_page_filtered_by_type(self):
+        self.db.add_transaction(Transaction(TransactionType.INCOME, 100.0, "💼 Salario", "", "2024-01-01"))
+        self.db.add_transaction(Transaction(TransactionType.EXPENSE, 10.0, "🎬 Ocio", "", "2024-01-02"))
+
+        page, cursor = self.db.get_transactions_page(limit=10, t_type=TransactionType.INCOME)
+        self.assertEqual(len(page), 1)
+        self.assertTrue(page[0].is_income())
+        self.assertIsNone(cursor)
+
+
+class TestApiServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_api.db"))
+        self.server = ApiServer(Mintly(self.db), port=0)
+
+    def tearDown(self):
+        self.server._executor.shutdown()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_create_and_list_transactions(self):
+        status, body = self.server.dispatch("POST", "/transactions", [
+            {'type': 'ingreso', 'amount': 1000, 'category': "💼 Salario", 'date': "2024-01-01"},
+            {'type': 'gasto', 'amount': 50, 'category': "🎬 Ocio", 'date': "2024-01-02"}
+        ])
+        self.assertEqual(status, 201)
+        self.assertEqual(len(body['ids']), 2)
+
+        status, body = self.server.dispatch("GET", "/transactions?limit=1")
+        self.assertEqual(status, 200)
+        self.assertEqual(body['items'][0]['category'], "🎬 Ocio")
+        self.assertIsNotNone(body['next_cursor'])
+
+        status, body = self.server.dispatch("GET", f"/transactions?limit=1&cursor={body['next_cursor']}")
+        self.assertEqual(body['items'][0]['type'], 'ingreso')
+        self.assertIsNone(body['next_cursor'])
+
+    def test_invalid_type_is_rejected(self):
+        status, body = self.server.dispatch("POST", "/transactions", {
+            'type': 'regalo', 'amount': 10, 'category': "x", 'date': "2024-01-01"
+        })
+        self.assertEqual(status, 400)
+        self.assertIn('error', body)
+
+    def test_categories_can_be_added_and_renamed(self):
+        status, body = self.server.dispatch("POST", "/categories", {'name': "🐶 Mascotas", 'type': 'gasto'})
+        self.assertEqual(status, 201)
+        category_id = body['id']
+
+        status, _ = self.server.dispatch("PATCH", f"/categories/{category_id}", {'name': "🐾 Mascotas"})
+        self.assertEqual(status, 200)
+        status, body = self.server.dispatch("GET", "/categories")
+        names = {c['id']: c['name'] for c in body}
+        self.assertEqual(names[category_id], "🐾 Mascotas")
+        self.assertEqual(self.server.dispatch("PATCH", "/categories/9999", {'name': "x"})[0], 404)
+
+    def test_category_tree_levels(self):
+        _, body = self.server.dispatch("POST", "/categories", {'name': "🍿 Cine", 'type': 'gasto'})
+        parent_id = body['id']
+        _, body = self.server.dispatch("POST", "/categories",
+                                       {'name': "🎟️ Estrenos", 'type': 'gasto', 'parent_id': parent_id})
+        self.server.dispatch("POST", "/transactions",
+                             {'type': 'gasto', 'amount': 12, 'category': "🎟️ Estrenos", 'date': "2024-01-01"})
+
+        self.assertEqual(self.server.dispatch("GET", "/categories/expense?level=top")[1], {"🍿 Cine": 12.0})
+        self.assertEqual(self.server.dispatch("GET", f"/categories/expense?parent={parent_id}")[1],
+                         {"🎟️ Estrenos": 12.0})
+        # Un ciclo se rechaza y no se aplica nada de la peticion
+        status, _ = self.server.dispatch("PATCH", f"/categories/{parent_id}",
+                                         {'name': "Otro", 'parent_id': body['id']})
+        self.assertEqual(status, 400)
+        names = [c['name'] for c in self.server.dispatch("GET", "/categories")[1]]
+        self.assertIn("🍿 Cine", names)
+
+    def test_failed_batch_rolls_back(self):
+        status, body = self.server.dispatch("POST", "/batch", [
+            {'method': 'POST', 'path': '/transactions',
+             'body': {'type': 'gasto', 'amount': 5, 'category': "🎬 Ocio", 'date': "2024-01-01"}},
+            {'method': 'GET', 'path': '/no-existe'}
+        ])
+        self.assertEqual(status, 404)
+        self.assertEqual(self.db.get_all_transactions(), [])
+
+    def test_http_roundtrip(self):
+        async def scenario():
+            await self.server.start()
+            reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+            payload = json.dumps({'name': "Viaje", 'target_amount': 500}).encode()
+            writer.write(
+                b"POST /goals HTTP/1.1\r\nContent-Length: " + str(len(payload)).encode() +
+                b"\r\nConnection: close\r\n\r\n" + payload
+            )
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            self.server._server.close()
+            await self.server._server.wait_closed()
+            return response
+
+        response = asyncio.run(scenario())
+        self.assertTrue(response.startswith(b"HTTP/1.1 201"))
+        self.assertEqual(self.db.get_all_savings_goals()[0].name, "Viaje")
+
+    def test_invalid_content_length_gets_a_response(self):
+        async def send(length):
+            reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+            writer.write(b"POST /goals HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+        async def scenario():
+            await self.server.start()
+            responses = [await send(b"abc"), await send(b"-1")]
+            self.server._server.close()
+            await self.server._server.wait_closed()
+            return responses
+
+        for response in asyncio.run(scenario()):
+            self.assertTrue(response.startswith(b"HTTP/1.1 400"))
+
+
+if __name__ == '__main__':
+    unittest.main()
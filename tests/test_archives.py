@@ -0,0 +1,102 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.savings_goal import SavingsGoal
+from src.models.budget import Budget
+from src.models.database import Database
+
+
+class TestYearlyArchives(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_archive.db"))
+        self.goal_id = self.db.add_savings_goal(SavingsGoal("Viaje", 1000.0))
+        self.db.add_transactions([
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "Nómina enero", "2021-01-01"),
+            Transaction(TransactionType.EXPENSE, 30.0, "🎬 Ocio", "Cine antiguo", "2021-06-15"),
+            Transaction(TransactionType.EXPENSE, 20.0, "🎬 Ocio", "Cine", "2022-03-10"),
+            Transaction(TransactionType.EXPENSE, 5.0, "🍔 Comida", "Café", "2023-02-01"),
+        ])
+        self.db.add_savings_deposit(self.goal_id, 50.0, "2021-02-01")
+        self.before = self.db.get_all_transactions()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _hot_count(self):
+        with self.db.transaction() as conn:
+            return conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def test_archive_moves_rows_but_keeps_reads_identical(self):
+        archived = self.db.archive_closed_years(keep_years=0)
+
+        self.assertEqual(archived, {2021: 2, 2022: 1, 2023: 1})
+        self.assertTrue(os.path.exists(self.db.archive_path(2021)))
+        # El aporte enlazado a la meta se queda en la tabla activa
+        self.assertEqual(self._hot_count(), 1)
+        self.assertEqual(self.db.check_goal_consistency(), [])
+
+        after = self.db.get_all_transactions()
+        self.assertEqual([t.id for t in after], [t.id for t in self.before])
+        self.assertEqual(self.db.get_transaction(self.before[-1].id).description, "Nómina enero")
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.db.get_transactions_page(limit=2, cursor=cursor)
+            seen.extend(t.id for t in page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [t.id for t in self.before])
+
+    def test_aggregates_use_archive_totals(self):
+        balance_before = self.db.get_balance_by_period("2021-01-01", "2021-12-31")
+        flows_before = [tuple(r) for r in self.db.get_daily_net_flows()]
+        self.db.archive_closed_years(keep_years=0)
+
+        self.assertEqual(self.db.get_balance_by_period("2021-01-01", "2021-12-31"), balance_before)
+        self.assertEqual([tuple(r) for r in self.db.get_daily_net_flows()], flows_before)
+        self.assertEqual(self.db.get_expenses_by_category(), {"🎬 Ocio": 50.0, "🍔 Comida": 5.0})
+        self.assertEqual(self.db.get_month_category_total("2021-06", TransactionType.EXPENSE, "🎬 Ocio"), 30.0)
+
+    def test_budgets_of_archived_months(self):
+        self.db.set_budget(Budget("🎬 Ocio", 100.0))
+        self.db.archive_closed_years(keep_years=0)
+
+        self.assertEqual([b.spent for b in self.db.get_budgets("2021-06")], [30.0])
+        self.assertEqual(self.db.get_budget("🎬 Ocio", "2022-03").spent, 20.0)
+
+    def test_search_and_columns_span_archives_by_range(self):
+        self.db.archive_closed_years(keep_years=0)
+
+        self.assertEqual(len(self.db.search_transactions("cine")[0]), 2)
+        only_2022, _ = self.db.search_transactions("cine", {'start': "2022-01-01", 'end': "2022-12-31"})
+        self.assertEqual([t.description for t in only_2022], ["Cine"])
+
+        columns = self.db.get_transactions_columns(TransactionType.EXPENSE, start="2021-01-01", end="2022-12-31")
+        self.assertEqual(list(columns.amounts), [20.0, 30.0])
+
+    def test_reimport_of_archived_year_is_deduplicated(self):
+        self.db.archive_year(2021)
+        ids, skipped = self.db.import_transactions([
+            Transaction(TransactionType.EXPENSE, 30.0, "🎬 Ocio", "Cine antiguo", "2021-06-15")
+        ])
+        self.assertEqual((ids, skipped), ([], 1))
+        # El alta de un solo movimiento tambien lo detecta
+        t_id = self.db.find_duplicate(
+            Transaction(TransactionType.EXPENSE, 30.0, "🎬 Ocio", "Cine antiguo", "2021-06-15"))
+        self.assertEqual(self.db.get_transaction(t_id).description, "Cine antiguo")
+
+    def test_current_year_cannot_be_archived(self):
+        from datetime import date
+        with self.assertRaises(ValueError):
+            self.db.archive_year(date.today().year)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import gzip
+import os
+import sys
+import tempfile
+from datetime import timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.database import Database
+from src.utils.backup import BackupManager
+from src import cli
+
+
+class TestBackupManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_backup.db"))
+        self.manager = BackupManager(self.db, os.path.join(self.tmp.name, "backups"), keep=3)
+        self.db.add_transactions([
+            Transaction(TransactionType.INCOME, 1500.0, "💼 Salario", "Nómina", "2024-01-01"),
+            Transaction(TransactionType.EXPENSE, 40.0, "🛒 Alimentación", "Súper", "2024-01-03"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_snapshot_is_compressed_and_verified(self):
+        steps = []
+        path = self.manager.create_snapshot(lambda remaining, total: steps.append(remaining))
+
+        self.assertTrue(path.endswith(".db.gz"))
+        self.assertTrue(steps)
+        result = self.manager.verify(path)
+        self.assertTrue(result['ok'])
+        self.assertEqual(result['transactions'], 2)
+
+    def test_rotation_and_schedule(self):
+        for _ in range(5):
+            self.manager.create_snapshot()
+        self.assertEqual(len(self.manager.list_snapshots()), 3)
+
+        self.assertIsNone(self.manager.snapshot_if_due(timedelta(days=1)))
+        self.assertIsNotNone(self.manager.snapshot_if_due(timedelta(0)))
+
+    def test_corrupted_snapshot_is_detected(self):
+        path = self.manager.create_snapshot()
+        with gzip.open(path, "rb") as f:
+            data = bytearray(f.read())
+        data[4096:8192] = b"\xff" * 4096
+        with gzip.open(path, "wb") as f:
+            f.write(bytes(data))
+
+        self.assertFalse(self.manager.verify(path)['ok'])
+        with open(path, "wb") as f:
+            f.write(b"no es gzip")
+        self.assertFalse(self.manager.verify(path)['ok'])
+
+    def test_restore_replaces_data_and_keeps_previous_state(self):
+        snapshot = self.manager.create_snapshot()
+        self.db.add_transaction(Transaction(TransactionType.EXPENSE, 9.0, "🎬 Ocio", "Cine", "2024-01-05"))
+
+        previous = self.manager.restore(snapshot)
+
+        self.assertEqual(len(self.db.get_all_transactions()), 2)
+        self.assertEqual(self.db.search_transactions("cine")[0], [])
+        self.assertEqual(self.manager.verify(previous)['transactions'], 3)
+
+    def test_cli_backup_and_verify(self):
+        self.db.close()
+        args = ["--db", self.db.db_name, "--dir", self.manager.backup_dir]
+        self.assertEqual(cli.main(args + ["backup"]), 0)
+        self.assertEqual(cli.main(args + ["verify"]), 0)
+        self.db = Database(self.db.db_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import TransactionType
+from src.models.budget import Budget
+from src.models.database import Database
+from src.controllers.mintly import Mintly
+
+
+class TestBudget(unittest.TestCase):
+    def test_status_levels(self):
+        self.assertEqual(Budget("🎬 Ocio", 100.0, spent=50.0).status, "ok")
+        self.assertEqual(Budget("🎬 Ocio", 100.0, spent=85.0).status, "aviso")
+        self.assertEqual(Budget("🎬 Ocio", 100.0, spent=120.0).status, "superado")
+
+
+class TestBudgetTotals(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.controller = Mintly(Database(os.path.join(self.tmp.name, "test_budgets.db")))
+
+    def tearDown(self):
+        self.controller.db.close()
+        self.tmp.cleanup()
+
+    def test_running_totals_follow_inserts_and_deletes(self):
+        self.controller.set_budget("🛒 Alimentación", 300.0)
+        first = self.controller.create_transaction(TransactionType.EXPENSE, 120.0, "🛒 Alimentación", "", "2024-03-02")
+        self.controller.create_transaction(TransactionType.EXPENSE, 150.0, "🛒 Alimentación", "", "2024-03-20")
+        self.controller.create_transaction(TransactionType.EXPENSE, 999.0, "🛒 Alimentación", "", "2024-04-01")
+
+        budget = self.controller.check_budget("🛒 Alimentación", "2024-03")
+        self.assertEqual(budget.spent, 270.0)
+        self.assertEqual(budget.status, "aviso")
+
+        self.controller.delete_transaction(first)
+        budget = self.controller.check_budget("🛒 Alimentación", "2024-03")
+        self.assertEqual(budget.spent, 150.0)
+        self.assertEqual(budget.status, "ok")
+
+    def test_budget_vs_actual_for_month(self):
+        self.controller.set_budget("🎬 Ocio", 50.0)
+        self.controller.set_budget("🚌 Transporte", 80.0)
+        self.controller.create_transaction(TransactionType.EXPENSE, 60.0, "🎬 Ocio", "", "2024-05-10")
+
+        status = {b.category: b for b in self.controller.get_budget_status("2024-05")}
+        self.assertEqual(status["🎬 Ocio"].status, "superado")
+        self.assertEqual(status["🚌 Transporte"].spent, 0.0)
+        self.assertEqual([b.category for b in self.controller.get_budget_alerts("2024-05")], ["🎬 Ocio"])
+
+    def test_income_does_not_count_as_spending(self):
+        self.controller.set_budget("💰 Otros", 10.0)
+        self.controller.create_transaction(TransactionType.INCOME, 500.0, "💰 Otros", "", "2024-05-10")
+
+        self.assertEqual(self.controller.check_budget("💰 Otros", "2024-05").spent, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.database import Database
+from src.models.budget import Budget
+from src.models.category import Category, category_icon
+
+
+class TestCategories(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_categories.db"))
+        self.db.add_transactions([
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "Nómina", "2024-01-01"),
+            Transaction(TransactionType.EXPENSE, 40.0, "🐶 Mascotas", "Pienso", "2024-01-05"),
+            Transaction(TransactionType.EXPENSE, 60.0, "🐶 Mascotas", "Veterinario", "2024-01-20"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_catalogue_and_colors(self):
+        income = [c.name for c in self.db.get_categories(TransactionType.INCOME)]
+        self.assertIn("💼 Salario", income)
+        self.assertEqual(self.db.get_category_color("🏠 Vivienda"), "#EF4444")
+        self.assertEqual(category_icon("🛒 Alimentación"), "🛒")
+        self.assertIsNone(category_icon("Alimentación"))
+
+        # Una categoria nueva entra en el catalogo con el tipo del movimiento
+        pets = [c for c in self.db.get_categories(TransactionType.EXPENSE) if c.name == "🐶 Mascotas"]
+        self.assertEqual(len(pets), 1)
+        self.assertEqual(pets[0].icon, "🐶")
+
+    def test_rows_reference_the_category_by_id(self):
+        with self.db.transaction() as conn:
+            row = conn.execute("SELECT typeof(category_id) FROM transactions LIMIT 1").fetchone()
+        self.assertEqual(row[0], 'integer')
+        self.assertEqual(self.db.get_expenses_by_category(), {"🐶 Mascotas": 100.0})
+        self.assertEqual(self.db.get_transactions_by_type(TransactionType.EXPENSE)[0].category, "🐶 Mascotas")
+
+    def test_rename_keeps_rows_budgets_and_search(self):
+        self.db.set_budget(Budget("🐶 Mascotas", 200.0))
+        pets = next(c for c in self.db.get_categories() if c.name == "🐶 Mascotas")
+        self.db.update_category(pets.id, name="🐾 Animales", color="#123456")
+
+        self.assertEqual({t.category for t in self.db.get_transactions_by_type(TransactionType.EXPENSE)},
+                         {"🐾 Animales"})
+        self.assertEqual(self.db.get_budgets("2024-01")[0].spent, 100.0)
+        self.assertEqual(len(self.db.search_transactions("animales")[0]), 2)
+        self.assertEqual(self.db.search_transactions("mascotas")[0], [])
+        self.assertEqual(self.db.get_category_colors()["🐾 Animales"], "#123456")
+
+        with self.assertRaises(ValueError):
+            self.db.update_category(pets.id, name="💼 Salario")
+        with self.assertRaises(ValueError):
+            self.db.add_category(Category("💼 Salario", TransactionType.INCOME))
+
+    def test_rolled_back_category_is_not_cached(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.add_transaction(Transaction(TransactionType.EXPENSE, 5.0, "🧸 Juguetes", "", "2024-02-01"))
+                raise RuntimeError("fallo")
+
+        self.db.add_transaction(Transaction(TransactionType.EXPENSE, 5.0, "🧸 Juguetes", "", "2024-02-01"))
+        self.assertEqual([c.name for c in self.db.get_categories()].count("🧸 Juguetes"), 1)
+        self.assertEqual(self.db.get_month_category_total("2024-02", TransactionType.EXPENSE, "🧸 Juguetes"), 5.0)
+
+
+class TestCategoriesMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "legacy.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL CHECK (type IN ('ingreso', 'gasto', 'ahorro')),
+                amount REAL NOT NULL, category TEXT NOT NULL, description TEXT, date TEXT NOT NULL)
+        """)
+        conn.executemany(
+            "INSERT INTO transactions (type, amount, category, description, date) VALUES (?, ?, ?, ?, ?)",
+            [('gasto', 2.0, "☕ Cafés", "Café con leche", "2024-05-01"),
+             ('gasto', 30.0, "🛒 Alimentación", "Mercado", "2024-05-02")]
+        )
+        conn.commit()
+        conn.close()
+        self.db = Database(self.path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_names_become_catalogue_entries(self):
+        self.assertIn("☕ Cafés", [c.name for c in self.db.get_categories(TransactionType.EXPENSE)])
+        self.assertEqual(self.db.get_expenses_by_category(), {"☕ Cafés": 2.0, "🛒 Alimentación": 30.0})
+        self.assertEqual(self.db.search_transactions("cafes")[0][0].category, "☕ Cafés")
+        pivot = self.db.get_category_pivot(TransactionType.EXPENSE, "2024-05", "2024-05")
+        self.assertEqual(pivot.categories[0], "🛒 Alimentación")
+
+
+class TestCategoryTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test_tree.db")
+        self.db = Database(self.path)
+        self.home = next(c.id for c in self.db.get_categories() if c.name == "🏠 Vivienda")
+        self.rent = self.db.add_category(Category("Alquiler", TransactionType.EXPENSE, parent_id=self.home))
+        self.power = self.db.add_category(Category("Luz", TransactionType.EXPENSE, parent_id=self.home))
+        self.summer = self.db.add_category(Category("Luz verano", TransactionType.EXPENSE, parent_id=self.power))
+        self.db.add_transactions([
+            Transaction(TransactionType.EXPENSE, 500.0, "Alquiler", "", "2023-01-01"),
+            Transaction(TransactionType.EXPENSE, 40.0, "Luz", "", "2024-01-02"),
+            Transaction(TransactionType.EXPENSE, 60.0, "Luz verano", "", "2024-07-02"),
+            Transaction(TransactionType.EXPENSE, 10.0, "🏠 Vivienda", "Comunidad", "2024-07-03"),
+            Transaction(TransactionType.EXPENSE, 5.0, "🎬 Ocio", "", "2024-07-04"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_levels_roll_up_their_subtree(self):
+        self.assertEqual(self.db.get_subtree_totals(TransactionType.EXPENSE), {"🏠 Vivienda": 610.0, "🎬 Ocio": 5.0})
+        # Lo apuntado en el propio padre aparece con su nombre junto a las hijas
+        self.assertEqual(self.db.get_subtree_totals(TransactionType.EXPENSE, self.home),
+                         {"🏠 Vivienda": 10.0, "Alquiler": 500.0, "Luz": 100.0})
+        self.assertEqual(self.db.get_subtree_totals(TransactionType.EXPENSE, self.power, "2024-07", "2024-07"),
+                         {"Luz verano": 60.0})
+        self.assertEqual([c.name for c in self.db.get_category_path(self.summer)],
+                         ["🏠 Vivienda", "Luz", "Luz verano"])
+
+        # Los años archivados siguen contando
+        self.db.archive_year(2023)
+        self.assertEqual(self.db.get_subtree_totals(TransactionType.EXPENSE)["🏠 Vivienda"], 610.0)
+
+    def test_moving_a_subtree(self):
+        self.db.move_category(self.power, None)
+        self.assertEqual(self.db.get_subtree_totals(TransactionType.EXPENSE),
+                         {"🏠 Vivienda": 510.0, "Luz": 100.0, "🎬 Ocio": 5.0})
+        self.assertEqual([c.name for c in self.db.get_category_path(self.summer)], ["Luz", "Luz verano"])
+
+        with self.assertRaises(ValueError):
+            self.db.move_category(self.power, self.summer)
+        with self.assertRaises(ValueError):
+            self.db.move_category(self.power, self.power)
+        income = next(c.id for c in self.db.get_categories(TransactionType.INCOME))
+        with self.assertRaises(ValueError):
+            self.db.move_category(self.power, income)
+        self.assertFalse(self.db.move_category(9999, None))
+
+    def test_migration_rebuilds_the_closure(self):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM category_tree")
+            conn.execute("PRAGMA user_version = 13")
+        self.db.close()
+
+        self.db = Database(self.path)
+        self.assertEqual(self.db.get_subtree_totals(TransactionType.EXPENSE, self.home),
+                         {"🏠 Vivienda": 10.0, "Alquiler": 500.0, "Luz": 100.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.database import Database
+from src.models.category_pivot import CategoryPivot
+
+
+class TestCategoryPivot(unittest.TestCase):
+    def test_from_rows_fills_empty_months(self):
+        pivot = CategoryPivot.from_rows([
+            ('2024-01', '🍔 Comida', 100.0),
+            ('2024-03', '🍔 Comida', 150.0),
+            ('2024-03', '🎬 Ocio', 300.0),
+        ], '2024-01', '2024-04')
+
+        self.assertEqual(pivot.month_labels(), ['2024-01', '2024-02', '2024-03', '2024-04'])
+        self.assertEqual(pivot.categories, ['🎬 Ocio', '🍔 Comida'])
+        np.testing.assert_array_equal(pivot.values, [[0, 100], [0, 0], [300, 150], [0, 0]])
+        np.testing.assert_array_equal(pivot.totals_by_month(), [100, 0, 450, 0])
+
+    def test_deltas(self):
+        pivot = CategoryPivot.from_rows([('2024-01', 'A', 100.0), ('2024-02', 'A', 150.0)], '2024-01', '2024-03')
+        diff, pct = pivot.deltas()
+
+        np.testing.assert_array_equal(diff[:, 0], [np.nan, 50.0, -150.0])
+        np.testing.assert_array_equal(pct[:, 0], [np.nan, 50.0, -100.0])
+        self.assertTrue(np.isnan(pivot.deltas(lag=12)[0]).all())
+
+    def test_empty(self):
+        pivot = CategoryPivot.from_rows([], '2024-01', '2024-02')
+        self.assertEqual(pivot.values.shape, (2, 0))
+
+
+class TestCategoryPivotFromDatabase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_pivot.db"))
+        self.db.add_transactions([
+            Transaction(TransactionType.EXPENSE, 40.0, "🍔 Comida", "", "2021-05-03"),
+            Transaction(TransactionType.EXPENSE, 60.0, "🍔 Comida", "", "2021-05-20"),
+            Transaction(TransactionType.EXPENSE, 30.0, "🎬 Ocio", "", "2022-01-10"),
+            Transaction(TransactionType.EXPENSE, 25.0, "🍔 Comida", "", "2022-02-01"),
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2022-02-01"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_includes_archived_years(self):
+        self.db.archive_year(2021)
+        pivot = self.db.get_category_pivot(TransactionType.EXPENSE, '2021-05', '2022-02')
+
+        self.assertEqual(len(pivot), 10)
+        self.assertEqual(pivot.categories, ['🍔 Comida', '🎬 Ocio'])
+        np.testing.assert_array_equal(pivot.values[0], [100.0, 0.0])
+        np.testing.assert_array_equal(pivot.values[-2:], [[0.0, 30.0], [25.0, 0.0]])
+
+    def test_deleted_rows_do_not_leave_columns(self):
+        pivot = self.db.get_category_pivot('ingreso', '2022-01', '2022-02')
+        self.assertEqual(pivot.categories, ['💼 Salario'])
+
+        t_id = self.db.get_transactions_by_type(TransactionType.INCOME)[0].id
+        self.db.delete_transaction(t_id)
+        self.assertEqual(self.db.get_category_pivot('ingreso', '2022-01', '2022-02').categories, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType, day_number
+from src.models.database import Database
+
+
+class TestDailyBalance(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "test_balance.db")
+        self.db = Database(self.path)
+        self.db.add_transactions([
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2022-01-01"),
+            Transaction(TransactionType.EXPENSE, 100.0, "🍔 Comida", "", "2022-01-05"),
+            Transaction(TransactionType.SAVINGS, 200.0, "💰 Ahorro", "", "2023-03-01"),
+            Transaction(TransactionType.EXPENSE, 50.0, "🎬 Ocio", "", "2023-03-10"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _dirty_from(self):
+        with self.db.transaction() as conn:
+            return conn.execute("SELECT date(dirty_from) FROM balance_state").fetchone()[0]
+
+    def test_balance_at_date(self):
+        self.assertEqual(self.db.get_balance_at("2021-12-31"), 0.0)
+        self.assertEqual(self.db.get_balance_at("2022-01-01"), 1000.0)
+        self.assertEqual(self.db.get_balance_at("2022-06-30"), 900.0)
+        self.assertEqual(self.db.get_balance_at("2023-12-31"), 650.0)
+        self.assertEqual(self.db.get_balance_between("2022-01-02", "2023-03-01"), -300.0)
+        self.assertIsNone(self._dirty_from())
+
+    def test_append_only_dirties_new_day(self):
+        self.db.get_balance_at("2023-12-31")
+        self.db.add_transaction(Transaction(TransactionType.INCOME, 10.0, "💼 Salario", "", "2023-04-01"))
+
+        self.assertEqual(self._dirty_from(), "2023-04-01")
+        self.assertEqual(self.db.get_balance_at("2023-04-01"), 660.0)
+
+    def test_back_dated_changes_are_repaired_lazily(self):
+        self.db.get_balance_at("2023-12-31")
+        t_id = self.db.add_transaction(Transaction(TransactionType.EXPENSE, 40.0, "🍔 Comida", "", "2022-01-03"))
+        self.assertEqual(self._dirty_from(), "2022-01-03")
+        self.assertEqual(self.db.get_balances_at(["2022-01-05", "2023-03-10"]),
+                         {"2022-01-05": 860.0, "2023-03-10": 610.0})
+
+        with self.db.transaction() as conn:
+            conn.execute("UPDATE transactions SET date = ? WHERE id = ?", (day_number("2023-06-01"), t_id))
+        self.assertEqual(self.db.get_balance_at("2022-12-31"), 900.0)
+        self.assertEqual(self.db.get_balance_at("2023-06-01"), 610.0)
+
+        self.db.delete_transaction(t_id)
+        self.assertEqual(self.db.get_balance_at("2023-06-01"), 650.0)
+
+    def test_archiving_keeps_balances(self):
+        self.db.archive_year(2022)
+        self.assertEqual(self.db.get_balance_at("2022-06-30"), 900.0)
+        self.assertEqual(self.db.get_balance_at("2023-12-31"), 650.0)
+
+    def test_migration_backfills_existing_ledger(self):
+        with self.db.transaction() as conn:
+            for trigger in ("insert", "delete", "update"):
+                conn.execute(f"DROP TRIGGER trg_balance_{trigger}")
+            conn.execute("DROP TABLE daily_balance")
+            conn.execute("DROP TABLE balance_state")
+            conn.execute("PRAGMA user_version = 10")
+        self.db.close()
+
+        self.db = Database(self.path)
+        self.assertEqual(self.db.get_balance_at("2023-12-31"), 650.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType, content_hash
+from src.models.savings_goal import SavingsGoal
+from src.models.database import Database
+from src.utils.export_manager import ExportManager
+
+
+class TestDuplicateDetection(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_duplicates.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    @staticmethod
+    def _coffee(description="Café", amount=2.0, date="2024-05-01"):
+        return Transaction(TransactionType.EXPENSE, amount, "🍔 Comida", description, date)
+
+    def test_hash_is_normalized(self):
+        self.assertEqual(content_hash("2024-05-01", 2, "🍔 Comida", "  café  con leche"),
+                         content_hash("2024-05-01", 2.001, "🍔 comida", "Café con leche"))
+        self.assertNotEqual(content_hash("2024-05-01", 2, "🍔 Comida", "Café"),
+                            content_hash("2024-05-02", 2, "🍔 Comida", "Café"))
+
+    def test_find_duplicate_on_single_insert(self):
+        self.assertIsNone(self.db.find_duplicate(self._coffee()))
+        t_id = self.db.add_transaction(self._coffee())
+        self.assertEqual(self.db.find_duplicate(self._coffee(" CAFÉ ")), t_id)
+        self.assertIsNone(self.db.find_duplicate(self._coffee(amount=2.5)))
+
+    def test_reimport_skips_existing_rows_keeping_multiplicity(self):
+        statement = [self._coffee(), self._coffee(), self._coffee("Pan", 1.2)]
+        ids, skipped = self.db.import_transactions(statement)
+        self.assertEqual((len(ids), skipped), (3, 0))
+
+        ids, skipped = self.db.import_transactions(statement + [self._coffee()])
+        self.assertEqual((len(ids), skipped), (1, 3))
+        self.assertEqual(len(self.db.get_all_transactions()), 4)
+
+    def test_merge_keeps_oldest_and_fixes_goal_balance(self):
+        goal_id = self.db.add_savings_goal(SavingsGoal("Viaje", 1000.0))
+        first = self.db.add_transaction(self._coffee())
+        self.db.add_transactions([self._coffee(), self._coffee()])
+        for _ in range(2):
+            self.db.add_savings_deposit(goal_id, 50.0, "2024-05-01")
+
+        groups = self.db.find_duplicate_groups()
+        self.assertEqual(len(groups), 2)
+        self.assertIn(first, [g[0] for g in groups])
+
+        self.assertEqual(self.db.merge_duplicates(), 3)
+        self.assertEqual(self.db.find_duplicate_groups(), [])
+        self.assertEqual(self.db.get_all_savings_goals()[0].current_amount, 50.0)
+        self.assertEqual(self.db.check_goal_consistency(), [])
+
+    def test_csv_round_trip_does_not_duplicate(self):
+        self.db.add_transactions([self._coffee(), self._coffee("Pan", 1.2)])
+        path = os.path.join(self.tmp.name, "export.csv")
+        ExportManager.export_to_csv(self.db.get_transactions_columns(), path, self.db.get_all_savings_goals())
+
+        ids, skipped = self.db.import_transactions(ExportManager.import_from_csv(path))
+        self.assertEqual((ids, skipped), ([], 2))
+
+
+class TestContentHashMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "legacy.db")
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL CHECK (type IN ('ingreso', 'gasto', 'ahorro')),
+                amount REAL NOT NULL, category TEXT NOT NULL, description TEXT, date TEXT NOT NULL)
+        """)
+        conn.executemany(
+            "INSERT INTO transactions (type, amount, category, description, date) VALUES (?, ?, ?, ?, ?)",
+            [('gasto', 2.0, "🍔 Comida", "Café", "2024-05-01")] * 2
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_existing_rows_are_hashed(self):
+        self.db = Database(self.path)
+        self.assertEqual(self.db.find_duplicate_groups(), [[1, 2]])
+
+
+if __name__ == '__main__':
+    unittest.main()
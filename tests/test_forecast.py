@@ -0,0 +1,65 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import TransactionType
+from src.models.database import Database
+from src.controllers.mintly import Mintly
+from src.utils.forecast import forecast_balance, rolling_mean, to_daily_series, weekdays
+
+
+class TestForecastMath(unittest.TestCase):
+    def test_daily_series_fills_gaps(self):
+        dates = np.array(['2024-01-01', '2024-01-04'], dtype='datetime64[D]')
+        start, series = to_daily_series(dates, np.array([10.0, -4.0]), end='2024-01-05')
+
+        self.assertEqual(start, np.datetime64('2024-01-01'))
+        np.testing.assert_array_equal(series, [10.0, 0.0, 0.0, -4.0, 0.0])
+
+    def test_rolling_mean_warm_up(self):
+        np.testing.assert_allclose(rolling_mean(np.array([2.0, 4.0, 6.0, 8.0]), 2), [2.0, 3.0, 5.0, 7.0])
+
+    def test_weekday_index_starts_on_monday(self):
+        days = np.array(['2024-01-01', '2024-01-07'], dtype='datetime64[D]')
+        np.testing.assert_array_equal(weekdays(days), [0, 6])
+
+    def test_constant_flow_projects_linearly(self):
+        dates = np.arange(np.datetime64('2023-01-01'), np.datetime64('2024-01-01'))
+        result = forecast_balance(dates, np.full(dates.size, 10.0), months=1, today='2023-12-31')
+
+        self.assertEqual(result['current_balance'], 3650.0)
+        self.assertEqual(result['dates'][0], np.datetime64('2024-01-01'))
+        self.assertEqual(result['dates'][-1], np.datetime64('2024-01-31'))
+        np.testing.assert_allclose(result['balance'][-1], 3650.0 + 31 * 10.0)
+
+    def test_empty_history(self):
+        result = forecast_balance(np.array([], dtype='datetime64[D]'), np.array([]))
+        self.assertEqual(result['dates'].size, 0)
+
+
+class TestForecastFromDatabase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.controller = Mintly(Database(os.path.join(self.tmp.name, "test_forecast.db")))
+
+    def tearDown(self):
+        self.controller.db.close()
+        self.tmp.cleanup()
+
+    def test_savings_and_expenses_reduce_balance(self):
+        self.controller.create_transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2024-01-01")
+        self.controller.create_transaction(TransactionType.EXPENSE, 300.0, "🎬 Ocio", "", "2024-01-01")
+        goal_id = self.controller.create_savings_goal("Viaje", 500.0, 0.0, None, "")
+        self.controller.db.add_savings_deposit(goal_id, 100.0, "2024-01-02")
+
+        rows = self.controller.db.get_daily_net_flows()
+        self.assertEqual([(r['date'], r['net']) for r in rows], [("2024-01-01", 700.0), ("2024-01-02", -100.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
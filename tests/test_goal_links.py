@@ -0,0 +1,98 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import TransactionType
+from src.models.database import Database
+from src.controllers.mintly import Mintly
+
+
+class TestGoalLinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.controller = Mintly(Database(os.path.join(self.tmp.name, "test_links.db")))
+        self.goal_id = self.controller.create_savings_goal("Moto", 2000.0, 100.0, None, "")
+
+    def tearDown(self):
+        self.controller.db.close()
+        self.tmp.cleanup()
+
+    def test_deposit_is_linked_to_goal(self):
+        self.controller.add_to_savings_goal(self.goal_id, 50.0)
+
+        linked = self.controller.get_goal_transactions(self.goal_id)
+        self.assertEqual(len(linked), 1)
+        self.assertEqual(linked[0].goal_id, self.goal_id)
+
+    def test_deposit_to_missing_goal_is_rejected(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.controller.add_to_savings_goal(9999, 50.0)
+
+    def test_delete_goal_keeps_or_removes_linked_rows(self):
+        other = self.controller.create_savings_goal("Sofá", 500.0, 0.0, None, "")
+        self.controller.add_to_savings_goal(self.goal_id, 50.0)
+        self.controller.add_to_savings_goal(other, 30.0)
+
+        self.controller.delete_savings_goal(self.goal_id)
+        savings = self.controller.get_transactions_by_type(TransactionType.SAVINGS)
+        self.assertEqual(len(savings), 2)
+        self.assertIn(None, [t.goal_id for t in savings])
+
+        self.controller.delete_savings_goal(other, delete_transactions=True)
+        self.assertEqual(len(self.controller.get_transactions_by_type(TransactionType.SAVINGS)), 1)
+
+    def test_consistency_check_and_repair(self):
+        self.controller.add_to_savings_goal(self.goal_id, 50.0)
+        self.assertEqual(self.controller.check_goal_consistency(), [])
+
+        self.controller.db.update_savings_goal_amount(self.goal_id, 25.0)
+        issues = self.controller.check_goal_consistency(repair=True)
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(issues[0]['expected'], 150.0)
+
+        self.assertEqual(self.controller.get_all_savings_goals()[0].current_amount, 150.0)
+        self.assertEqual(self.controller.check_goal_consistency(), [])
+
+
+class TestGoalLinkMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "legacy.db")
+
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL CHECK (type IN ('ingreso', 'gasto', 'ahorro')),
+                amount REAL NOT NULL, category TEXT NOT NULL, description TEXT, date TEXT NOT NULL)
+        """)
+        conn.execute("""
+            CREATE TABLE savings_goals (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                target_amount REAL NOT NULL, current_amount REAL DEFAULT 0, deadline TEXT, description TEXT)
+        """)
+        conn.execute("INSERT INTO savings_goals (name, target_amount, current_amount) VALUES ('Viaje', 1000, 400)")
+        conn.executemany(
+            "INSERT INTO transactions (type, amount, category, description, date) VALUES (?, ?, ?, ?, ?)",
+            [('ahorro', 100.0, "💰 Ahorro", "Auto-ahorro: Viaje", "2024-01-01"),
+             ('ahorro', 50.0, "💰 Ahorro", "Traspaso manual a meta", "2024-01-05")]
+        )
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_backfill_links_rows_and_keeps_balance(self):
+        self.db = Database(self.path)
+
+        linked = self.db.get_goal_transactions(1)
+        self.assertEqual(len(linked), 2)
+        self.assertEqual(self.db.check_goal_consistency(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.savings_goal import SavingsGoal
+from src.models.database import Database
+from src.controllers.goal_projection import GoalProjectionService
+
+
+class TestGoalProjection(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_projection.db"))
+        self.service = GoalProjectionService(self.db)
+        self.today = date(2024, 7, 1)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _goal(self, goal_id):
+        return next(g for g in self.db.get_all_savings_goals() if g.id == goal_id)
+
+    def test_on_track_and_behind(self):
+        fast = self.db.add_savings_goal(SavingsGoal("Rápida", 1200.0, deadline="2024-12-31"))
+        slow = self.db.add_savings_goal(SavingsGoal("Lenta", 1200.0, deadline="2024-08-01"))
+        for month in range(1, 7):
+            self.db.add_savings_deposit(fast, 100.0, f"2024-0{month}-01")
+            self.db.add_savings_deposit(slow, 100.0, f"2024-0{month}-01")
+
+        projections = self.service.get_projections(self.db.get_all_savings_goals(), self.today)
+
+        self.assertEqual(projections[fast].status, "en camino")
+        self.assertEqual(projections[slow].status, "retrasada")
+        self.assertAlmostEqual(projections[fast].monthly_rate, 600.0 / 182 * 30.44, places=2)
+        self.assertGreater(projections[slow].required_monthly, projections[slow].monthly_rate)
+
+    def test_goal_without_contributions(self):
+        goal_id = self.db.add_savings_goal(SavingsGoal("Nueva", 500.0))
+        projection = self.service.get_projections([self._goal(goal_id)], self.today)[goal_id]
+
+        self.assertEqual(projection.status, "sin datos")
+        self.assertIsNone(projection.estimated_date)
+
+    def test_cache_refreshes_only_after_deposit(self):
+        goal_id = self.db.add_savings_goal(SavingsGoal("Caché", 1000.0, deadline="2025-12-31"))
+        self.db.add_savings_deposit(goal_id, 100.0, "2024-06-01")
+
+        first = self.service.get_projections([self._goal(goal_id)], self.today)[goal_id]
+        again = self.service.get_projections([self._goal(goal_id)], self.today)[goal_id]
+        self.assertIs(first, again)
+
+        self.db.add_savings_deposit(goal_id, 300.0, "2024-06-15")
+        updated = self.service.get_projections([self._goal(goal_id)], self.today)[goal_id]
+        self.assertIsNot(first, updated)
+        self.assertGreater(updated.monthly_rate, first.monthly_rate)
+
+
+if __name__ == '__main__':
+    unittest.main()
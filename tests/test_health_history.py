@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import tempfile
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.database import Database
+from src.controllers.mintly import Mintly
+from src.controllers.health_history import health_scores
+from src.utils.backup import BackupManager
+
+TODAY = date(2024, 4, 10)
+
+
+class TestHealthHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_health.db"))
+        self.controller = Mintly(self.db)
+        self.db.add_transactions([
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2024-01-01"),
+            Transaction(TransactionType.EXPENSE, 500.0, "🍔 Comida", "", "2024-01-15"),
+            Transaction(TransactionType.SAVINGS, 200.0, "💰 Ahorro", "", "2024-01-20"),
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2024-03-01"),
+            Transaction(TransactionType.EXPENSE, 1200.0, "🏠 Vivienda", "", "2024-03-02"),
+            Transaction(TransactionType.INCOME, 500.0, "💼 Salario", "", "2024-04-01"),
+        ])
+        self.calls = []
+        original = self.db.get_monthly_type_totals
+        self.db.get_monthly_type_totals = lambda *args: self.calls.append(args) or original(*args)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_vectorized_score_matches_formula(self):
+        # 20% ahorro y 50% gasto: int(20 * 2 + 50 * 0.8) = 80
+        np.testing.assert_array_equal(
+            health_scores([1000.0, 0.0, 1000.0], [500.0, 10.0, 1500.0], [200.0, 0.0, 0.0]), [80, 0, 0]
+        )
+
+    def test_every_month_is_scored(self):
+        history = self.controller.get_health_history(TODAY)
+
+        self.assertEqual([str(m) for m in history['months']], ['2024-01', '2024-02', '2024-03', '2024-04'])
+        np.testing.assert_array_equal(history['scores'], [80, 0, 0, 80])
+
+    def test_closed_months_are_cached(self):
+        self.controller.get_health_history(TODAY)
+        self.controller.get_health_history(TODAY)
+        # Primera llamada: meses cerrados + mes actual; segunda: solo el mes actual
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(self.calls[-1], ('2024-04', '2024-04'))
+
+        # Un movimiento del mes en curso no invalida los meses cerrados
+        self.db.add_transaction(Transaction(TransactionType.EXPENSE, 50.0, "🍔 Comida", "", "2024-04-05"))
+        history = self.controller.get_health_history(TODAY)
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(history['expense'][-1], 50.0)
+
+        self.db.add_transaction(Transaction(TransactionType.SAVINGS, 100.0, "💰 Ahorro", "", "2024-02-15"))
+        history = self.controller.get_health_history(TODAY)
+        self.assertEqual(len(self.calls), 6)
+        self.assertEqual(history['savings'][1], 100.0)
+
+    def test_restored_backup_rebuilds_closed_months(self):
+        backups = BackupManager(self.db, os.path.join(self.tmp.name, "backups"))
+        snapshot = backups.create_snapshot()
+        self.db.add_transaction(Transaction(TransactionType.EXPENSE, 800.0, "🍔 Comida", "", "2024-01-20"))
+        self.assertEqual(self.controller.get_health_history(TODAY)['scores'][0], 16)
+
+        backups.restore(snapshot, safety_snapshot=False)
+        self.assertEqual(self.controller.get_health_history(TODAY)['scores'][0], 80)
+
+    def test_archived_years_count(self):
+        self.db.add_transaction(Transaction(TransactionType.INCOME, 800.0, "💼 Salario", "", "2022-06-01"))
+        self.db.archive_year(2022)
+        history = self.controller.get_health_history(TODAY)
+
+        self.assertEqual(str(history['months'][0]), '2022-06')
+        self.assertEqual(history['scores'][0], 80)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType, day_number, iso_date, month_day_range
+from src.models.database import Database, ARCHIVE_SCHEMA
+from src.models.migrations import MIGRATIONS
+
+
+class TestDateValidation(unittest.TestCase):
+    def test_invalid_dates_are_rejected(self):
+        for value in ("15/03/2024", "2024-13-01", "2024-02-30", "20240301", "", None):
+            with self.assertRaises(ValueError):
+                Transaction(TransactionType.EXPENSE, 1.0, "🎬 Ocio", "", value)
+
+    def test_dates_are_normalized(self):
+        self.assertEqual(Transaction(TransactionType.EXPENSE, 1.0, "🎬 Ocio", "", date(2024, 3, 5)).date, "2024-03-05")
+        self.assertEqual(Transaction(TransactionType.EXPENSE, 1.0, "🎬 Ocio", "", " 2024-03-05 ").date, "2024-03-05")
+
+    def test_day_number_round_trip(self):
+        # Mismo numero que usa SQLite: date() lo devuelve como la fecha original
+        conn = sqlite3.connect(":memory:")
+        for day in ("0001-01-01", "1999-12-31", "2024-02-29", "9999-12-31"):
+            self.assertEqual(iso_date(day_number(day)), day)
+            self.assertEqual(conn.execute("SELECT date(?)", (day_number(day),)).fetchone()[0], day)
+        conn.close()
+        self.assertEqual(month_day_range("2024-02", "2024-02"),
+                         (day_number("2024-02-01"), day_number("2024-02-29")))
+
+
+class TestIntegerDates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_dates.db"))
+        self.db.add_transactions([
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2024-01-31"),
+            Transaction(TransactionType.EXPENSE, 100.0, "🍔 Comida", "", "2024-02-01"),
+            Transaction(TransactionType.EXPENSE, 50.0, "🎬 Ocio", "", "2024-02-29"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_dates_are_stored_as_day_numbers(self):
+        with self.db.transaction() as conn:
+            rows = conn.execute("SELECT typeof(date), date FROM transactions ORDER BY id").fetchall()
+        self.assertEqual([tuple(r) for r in rows][0], ('integer', day_number("2024-01-31")))
+        self.assertEqual([t.date for t in self.db.get_all_transactions()], ["2024-02-29", "2024-02-01", "2024-01-31"])
+
+    def test_ranges_and_months(self):
+        self.assertEqual(self.db.get_balance_by_period("2024-02-01", "2024-02-29")['total_expense'], 150.0)
+        self.assertEqual(self.db.get_month_category_total("2024-02", TransactionType.EXPENSE, "🎬 Ocio"), 50.0)
+        self.assertEqual(self.db.get_date_bounds(), ("2024-01-31", "2024-02-29"))
+        columns = self.db.get_transactions_columns(start="2024-02-01")
+        self.assertEqual(columns.dates, ("2024-02-29", "2024-02-01"))
+
+
+class TestIntegerDatesMigration(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "legacy.db")
+        self.archive = os.path.join(self.tmp.name, "legacy_archive_2022.db")
+        self.db = None
+
+        # Libro en la version 11 (fechas en texto) con un año archivado
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                type TEXT NOT NULL CHECK (type IN ('ingreso', 'gasto', 'ahorro')),
+                amount REAL NOT NULL, category TEXT NOT NULL, description TEXT, date TEXT NOT NULL)
+        """)
+        conn.execute("""
+            CREATE TABLE savings_goals (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                target_amount REAL NOT NULL, current_amount REAL DEFAULT 0, deadline TEXT, description TEXT)
+        """)
+        for migration in MIGRATIONS[:11]:
+            migration(conn)
+        conn.execute("PRAGMA user_version = 11")
+        conn.executemany(
+            "INSERT INTO transactions (type, amount, category, description, date) VALUES (?, ?, ?, ?, ?)",
+            [('ingreso', 1000.0, "💼 Salario", "Nómina", "2023-01-31"),
+             ('gasto', 100.0, "🍔 Comida", "Cena", "2023-02-01"),
+             ('gasto', 5.0, "🎬 Ocio", "Borrado", "2023-02-02")]
+        )
+        conn.execute("DELETE FROM transactions WHERE id = 3")
+        conn.execute("INSERT INTO archives (year, path, rows) VALUES (2022, ?, 1)", (self.archive,))
+        conn.execute("INSERT INTO archive_totals VALUES ('2022-06-01', 'gasto', '🎬 Ocio', 20.0, 1)")
+        conn.execute("INSERT INTO daily_balance (date, net) VALUES ('2022-06-01', -20.0)")
+        conn.execute("UPDATE balance_state SET dirty_from = '2022-06-01'")
+        conn.commit()
+        conn.close()
+
+        archive = sqlite3.connect(self.archive)
+        for statement in ARCHIVE_SCHEMA:
+            archive.execute(statement.replace("date INTEGER", "date TEXT"))
+        archive.execute("INSERT INTO transactions VALUES (100, 'gasto', 20.0, '🎬 Ocio', 'Cine', '2022-06-01', NULL, 0)")
+        archive.commit()
+        archive.close()
+
+    def tearDown(self):
+        if self.db is not None:
+            self.db.close()
+        self.tmp.cleanup()
+
+    def test_text_dates_are_converted(self):
+        self.db = Database(self.path)
+        with self.db.transaction() as conn:
+            types = {r[0] for r in conn.execute("SELECT typeof(date) FROM transactions")}
+            types |= {r[0] for r in conn.execute("SELECT typeof(date) FROM archive_totals")}
+            types |= {r[0] for r in conn.execute("SELECT typeof(date) FROM daily_balance")}
+        self.assertEqual(types, {'integer'})
+
+        self.assertEqual(self.db.get_transaction(2).date, "2023-02-01")
+        self.assertEqual(self.db.get_transaction(100).date, "2022-06-01")
+        self.assertEqual(self.db.get_balance_at("2023-02-01"), 880.0)
+
+        # Los triggers siguen funcionando y los ids borrados no se reutilizan
+        t_id = self.db.add_transaction(Transaction(TransactionType.EXPENSE, 30.0, "🍔 Comida", "", "2023-02-10"))
+        self.assertEqual(t_id, 4)
+        self.assertEqual(self.db.get_month_category_total("2023-02", TransactionType.EXPENSE, "🍔 Comida"), 130.0)
+        self.assertEqual(self.db.search_transactions("cena")[0][0].id, 2)
+        self.assertEqual(self.db.get_balance_at("2023-12-31"), 850.0)
+
+    def test_malformed_dates_stop_the_migration(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("INSERT INTO transactions (type, amount, category, date) VALUES ('gasto', 1, 'x', '15/03/2023')")
+        conn.commit()
+        conn.close()
+
+        with self.assertRaises(ValueError):
+            Database(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
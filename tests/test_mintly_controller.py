@@ -101,6 +101,7 @@ class TestDatabase(unittest.TestCase):
         self.db = Database("test_mintly.db")
 
     def tearDown(self):
+        self.db.close()
         try:
             os.remove("test_mintly.db")
         except:
@@ -151,10 +152,10 @@ class TestDatabase(unittest.TestCase):
 class TestMintlyController(unittest.TestCase):
 
     def setUp(self):
-        self.controller = Mintly()
-        self.controller.db = Database("test_controller.db")
+        self.controller = Mintly(Database("test_controller.db"))
 
     def tearDown(self):
+        self.controller.db.close()
         try:
             os.remove("test_controller.db")
         except:
@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.profiles import ProfileRegistry, DEFAULT_PROFILE
+from src.controllers.mintly import Mintly
+
+
+class TestProfileRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ProfileRegistry(os.path.join(self.tmp.name, "mintly.db"), max_open=2)
+
+    def tearDown(self):
+        self.registry.close()
+        self.tmp.cleanup()
+
+    def test_profiles_have_separate_databases(self):
+        home = self.registry.get()
+        work = self.registry.create_profile("Trabajo")
+        self.assertIsNot(home, work)
+        self.assertIs(self.registry.get("Trabajo"), work)
+
+        work.add_transaction(Transaction(TransactionType.INCOME, 100.0, "💼 Salario", "", "2024-01-01"))
+        self.assertEqual(len(home.get_all_transactions()), 0)
+        self.assertEqual(self.registry.list_profiles(), [DEFAULT_PROFILE, "Trabajo"])
+
+    def test_invalid_or_duplicate_names_are_rejected(self):
+        self.registry.create_profile("Casa")
+        for name in ("Casa", DEFAULT_PROFILE, "../fuera", "", "viejo_archive_2020"):
+            with self.assertRaises(ValueError):
+                self.registry.create_profile(name)
+        with self.assertRaises(KeyError):
+            self.registry.get("No existe")
+
+    def test_least_recently_used_profile_is_closed(self):
+        first = self.registry.create_profile("Uno")
+        self.registry.create_profile("Dos")
+        self.registry.get()
+        self.assertTrue(first.pool._closed)
+
+        reopened = self.registry.get("Uno")
+        self.assertIsNot(reopened, first)
+        self.assertEqual(reopened.get_all_transactions(), [])
+
+    def test_controller_switches_profile_in_place(self):
+        controller = Mintly(self.registry.get())
+        controller.create_transaction(TransactionType.EXPENSE, 10.0, "🍔 Comida", "", "2024-01-01")
+
+        controller.switch_database(self.registry.create_profile("Viajes"))
+        self.assertEqual(controller.get_all_transactions(), [])
+        self.assertIs(controller.projections.db, controller.db)
+
+    def test_combined_summary_attaches_every_profile(self):
+        self.registry.get().add_transactions([
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2024-01-05"),
+            Transaction(TransactionType.EXPENSE, 200.0, "🍔 Comida", "", "2024-01-06"),
+        ])
+        self.registry.create_profile("Pareja").add_transactions([
+            Transaction(TransactionType.INCOME, 500.0, "💼 Salario", "", "2024-01-05"),
+            Transaction(TransactionType.EXPENSE, 50.0, "🍔 Comida", "", "2024-01-07"),
+            Transaction(TransactionType.EXPENSE, 80.0, "🍔 Comida", "", "2023-12-31"),
+        ])
+
+        summary = self.registry.get_combined_summary("2024-01-01", "2024-01-31")
+        self.assertEqual(summary['profiles']["Pareja"]['balance'], 450.0)
+        self.assertEqual(summary['total']['total_income'], 1500.0)
+        self.assertEqual(summary['total']['balance'], 1250.0)
+
+        self.assertEqual(self.registry.get_combined_category_totals(TransactionType.EXPENSE), {"🍔 Comida": 330.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
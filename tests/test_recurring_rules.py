@@ -0,0 +1,69 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import TransactionType
+from src.models.recurring_rule import RecurringRule, Frequency
+from src.models.database import Database
+from src.controllers.mintly import Mintly
+
+
+class TestRecurringRule(unittest.TestCase):
+    def test_monthly_rule_clamps_to_month_end(self):
+        rule = RecurringRule(TransactionType.EXPENSE, 700.0, "🏠 Vivienda", "Alquiler",
+                             Frequency.MONTHLY, "2024-01-31")
+
+        self.assertEqual(rule.occurrence_date(1), "2024-02-29")
+        self.assertEqual(rule.occurrence_date(2), "2024-03-31")
+
+    def test_due_dates_respect_end_date(self):
+        rule = RecurringRule(TransactionType.INCOME, 1500.0, "💼 Salario", "Nómina",
+                             Frequency.MONTHLY, "2024-01-01", end_date="2024-03-15")
+
+        self.assertEqual(rule.due_dates("2024-12-31"), ["2024-01-01", "2024-02-01", "2024-03-01"])
+
+    def test_weekly_interval(self):
+        rule = RecurringRule(TransactionType.EXPENSE, 10.0, "🎬 Ocio", "", Frequency.WEEKLY,
+                             "2024-01-01", interval=2)
+
+        self.assertEqual(rule.due_dates("2024-01-31"), ["2024-01-01", "2024-01-15", "2024-01-29"])
+
+
+class TestRecurringCatchUp(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.controller = Mintly(Database(os.path.join(self.tmp.name, "test_recurring.db")))
+
+    def tearDown(self):
+        self.controller.db.close()
+        self.tmp.cleanup()
+
+    def test_catch_up_is_idempotent(self):
+        self.controller.create_recurring_rule(
+            TransactionType.INCOME, 1500.0, "💼 Salario", "Nómina", Frequency.MONTHLY, "2023-01-25"
+        )
+
+        created = self.controller.run_recurring_rules(today="2023-12-31")
+        self.assertEqual(created, 12)
+        self.assertEqual(self.controller.run_recurring_rules(today="2023-12-31"), 0)
+
+        created = self.controller.run_recurring_rules(today="2024-02-25")
+        self.assertEqual(created, 2)
+        self.assertEqual(len(self.controller.get_all_transactions()), 14)
+
+        rule = self.controller.get_recurring_rules()[0]
+        self.assertEqual(rule.next_due, "2024-03-25")
+
+    def test_future_rule_creates_nothing(self):
+        self.controller.create_recurring_rule(
+            TransactionType.EXPENSE, 40.0, "🎬 Ocio", "Gimnasio", Frequency.MONTHLY, "2030-01-01"
+        )
+
+        self.assertEqual(self.controller.run_recurring_rules(today="2024-01-01"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
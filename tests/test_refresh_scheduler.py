@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.controllers.refresh_scheduler import RefreshScheduler
+
+
+class TestRefreshScheduler(unittest.TestCase):
+    def setUp(self):
+        self.timer_starts = 0
+        self.current_tab = 0
+        self.loads = []
+        self.scheduler = RefreshScheduler(self._start_timer)
+        self.scheduler.register('header', lambda: self.loads.append('header'))
+        self.scheduler.register('lists', lambda: self.loads.append('lists'), lambda: self.current_tab == 0)
+        self.scheduler.register('stats', lambda: self.loads.append('stats'), lambda: self.current_tab == 1)
+
+    def _start_timer(self):
+        self.timer_starts += 1
+
+    def test_burst_of_requests_is_coalesced(self):
+        for _ in range(5):
+            self.scheduler.request()
+        self.assertEqual(self.timer_starts, 1)
+        self.assertEqual(self.loads, [])
+
+        self.scheduler.flush()
+        self.assertEqual(self.loads, ['header', 'lists'])
+
+        self.scheduler.request('header')
+        self.assertEqual(self.timer_starts, 2)
+
+    def test_hidden_view_waits_until_shown(self):
+        self.scheduler.flush()
+        self.assertTrue(self.scheduler.is_dirty('stats'))
+
+        self.current_tab = 1
+        self.scheduler.view_shown('stats')
+        self.scheduler.view_shown('stats')
+        self.assertEqual(self.scheduler.refresh_counts['stats'], 1)
+
+        # Sin cambios, volver a la pestaña no recarga nada
+        self.current_tab = 0
+        self.scheduler.view_shown('lists')
+        self.assertEqual(self.scheduler.refresh_counts['lists'], 1)
+
+    def test_only_requested_views_reload(self):
+        self.scheduler.flush()
+        self.loads.clear()
+        self.scheduler.request('header')
+        self.scheduler.flush()
+        self.assertEqual(self.loads, ['header'])
+
+    def test_failing_view_does_not_block_the_rest(self):
+        def broken():
+            raise RuntimeError("sin conexión")
+        self.scheduler.register('broken', broken)
+        self.scheduler.mark_dirty()
+        self.scheduler.flush()
+        self.assertIn('header', self.loads)
+        self.assertFalse(self.scheduler.is_dirty('broken'))
+
+    def test_without_timer_requests_refresh_immediately(self):
+        scheduler = RefreshScheduler()
+        calls = []
+        scheduler.register('header', lambda: calls.append(1))
+        scheduler.request()
+        scheduler.request()
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
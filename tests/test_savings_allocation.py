@@ -0,0 +1,82 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.allocation_rule import AllocationMode
+from src.models.database import Database
+from src.controllers.mintly import Mintly
+
+
+class TestSavingsAllocation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.controller = Mintly(Database(os.path.join(self.tmp.name, "test_allocation.db")))
+        self.goal_id = self.controller.create_savings_goal("Coche", 1000.0, 0.0, "2025-12-31", "")
+
+    def tearDown(self):
+        self.controller.db.close()
+        self.tmp.cleanup()
+
+    def _goal(self):
+        return self.controller.get_all_savings_goals()[0]
+
+    def test_percentage_rule_on_income(self):
+        self.controller.create_allocation_rule(self.goal_id, AllocationMode.PERCENTAGE, 10)
+        self.controller.create_transaction(TransactionType.INCOME, 1500.0, "💼 Salario", "", "2024-01-01")
+
+        savings = self.controller.get_transactions_by_type(TransactionType.SAVINGS)
+        self.assertEqual(len(savings), 1)
+        self.assertEqual(savings[0].amount, 150.0)
+        self.assertEqual(self._goal().current_amount, 150.0)
+
+    def test_expenses_are_not_allocated(self):
+        self.controller.create_allocation_rule(self.goal_id, AllocationMode.FIXED, 50)
+        self.controller.create_transaction(TransactionType.EXPENSE, 80.0, "🎬 Ocio", "", "2024-01-01")
+
+        self.assertEqual(self.controller.get_transactions_by_type(TransactionType.SAVINGS), [])
+
+    def test_allocation_stops_at_goal_target(self):
+        self.controller.create_allocation_rule(self.goal_id, AllocationMode.FIXED, 400)
+        self.controller.import_transactions([
+            Transaction(TransactionType.INCOME, 2000.0, "💼 Salario", "", f"2024-0{m}-01")
+            for m in range(1, 5)
+        ])
+
+        amounts = sorted(t.amount for t in self.controller.get_transactions_by_type(TransactionType.SAVINGS))
+        self.assertEqual(amounts, [200.0, 400.0, 400.0])
+        self.assertEqual(self._goal().current_amount, 1000.0)
+
+    def test_income_and_savings_roll_back_together(self):
+        with self.controller.db.transaction() as conn:
+            conn.execute("""
+                CREATE TRIGGER fail_savings BEFORE INSERT ON transactions WHEN NEW.type = 'ahorro'
+                BEGIN SELECT RAISE(ABORT, 'fallo simulado'); END
+            """)
+        self.controller.create_allocation_rule(self.goal_id, AllocationMode.PERCENTAGE, 20)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.controller.create_transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2024-01-01")
+
+        self.assertEqual(self.controller.get_all_transactions(), [])
+        self.assertEqual(self._goal().current_amount, 0.0)
+
+    def test_manual_deposit_is_atomic(self):
+        with self.controller.db.transaction() as conn:
+            conn.execute("""
+                CREATE TRIGGER fail_goal BEFORE UPDATE ON savings_goals
+                BEGIN SELECT RAISE(ABORT, 'fallo simulado'); END
+            """)
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.controller.add_to_savings_goal(self.goal_id, 100.0)
+
+        self.assertEqual(self.controller.get_all_transactions(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
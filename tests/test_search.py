@@ -0,0 +1,72 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.database import Database
+
+
+class TestTransactionSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_search.db"))
+        self.ids = self.db.add_transactions([
+            Transaction(TransactionType.EXPENSE, 3.5, "🍔 Comida", "Café con leche", "2024-01-02"),
+            Transaction(TransactionType.EXPENSE, 12.0, "🎮 Ocio", "Cine y café", "2024-02-10"),
+            Transaction(TransactionType.EXPENSE, 40.0, "🛒 Alimentación", "Supermercado", "2024-03-01"),
+            Transaction(TransactionType.INCOME, 50.0, "🎁 Regalos", "Regalo cumpleaños", "2024-03-05"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_prefix_and_accent_insensitive(self):
+        results, cursor = self.db.search_transactions("cafe")
+        self.assertEqual(len(results), 2)
+        self.assertIsNone(cursor)
+
+        results, _ = self.db.search_transactions("super")
+        self.assertEqual([t.description for t in results], ["Supermercado"])
+
+        results, _ = self.db.search_transactions("comida")
+        self.assertEqual([t.category for t in results], ["🍔 Comida"])
+
+    def test_filters_and_hostile_input(self):
+        results, _ = self.db.search_transactions("café", {'start': "2024-02-01"})
+        self.assertEqual([t.description for t in results], ["Cine y café"])
+
+        results, _ = self.db.search_transactions("regalo", {'t_type': TransactionType.EXPENSE})
+        self.assertEqual(results, [])
+
+        self.assertEqual(self.db.search_transactions('"" AND OR *')[0], [])
+        self.assertEqual(self.db.search_transactions("   ")[0], [])
+
+    def test_pagination_covers_all_results(self):
+        self.db.add_transactions([
+            Transaction(TransactionType.EXPENSE, 1.0, "🍔 Comida", f"Café {i}", "2024-04-01") for i in range(7)
+        ])
+        seen, cursor = [], None
+        while True:
+            page, cursor = self.db.search_transactions("café", cursor=cursor, limit=3)
+            seen.extend(t.id for t in page)
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 9)
+        self.assertEqual(len(set(seen)), 9)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.db.delete_transaction(self.ids[2])
+        self.assertEqual(self.db.search_transactions("supermercado")[0], [])
+
+        with self.db.transaction() as conn:
+            conn.execute("UPDATE transactions SET description = 'Panadería' WHERE id = ?", (self.ids[0],))
+        self.assertEqual([t.id for t in self.db.search_transactions("panaderia")[0]], [self.ids[0]])
+        self.assertEqual(len(self.db.search_transactions("cafe")[0]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
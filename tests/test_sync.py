@@ -0,0 +1,137 @@
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.savings_goal import SavingsGoal
+from src.models.database import Database
+from src.utils.sync import sync_databases
+
+
+def ledger(db):
+    return sorted((t.date, t.amount, t.category, t.description) for t in db.get_all_transactions())
+
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.a = Database(os.path.join(self.tmp.name, "a.db"))
+        self.b = Database(os.path.join(self.tmp.name, "b.db"))
+
+    def tearDown(self):
+        self.a.close()
+        self.b.close()
+        self.tmp.cleanup()
+
+    def test_first_sync_merges_both_ledgers(self):
+        self.a.add_transaction(Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "Nómina", "2024-01-01"))
+        self.b.add_transaction(Transaction(TransactionType.EXPENSE, 20.0, "🎬 Ocio", "Cine", "2024-01-02"))
+
+        result = sync_databases(self.a, self.b)
+        self.assertEqual((result['received'], result['sent']), (1, 1))
+        self.assertEqual(ledger(self.a), ledger(self.b))
+        self.assertEqual(len(ledger(self.a)), 2)
+
+        # Sin cambios nuevos no se intercambia nada
+        self.assertEqual(sync_databases(self.a, self.b), {'received': 0, 'sent': 0, 'conflicts': 0})
+
+    def test_updates_and_deletes_propagate(self):
+        t_id = self.a.add_transaction(Transaction(TransactionType.EXPENSE, 5.0, "🍔 Comida", "Café", "2024-01-01"))
+        other = self.a.add_transaction(Transaction(TransactionType.EXPENSE, 9.0, "🍔 Comida", "Menú", "2024-01-01"))
+        sync_databases(self.a, self.b)
+
+        with self.a.transaction() as conn:
+            conn.execute("UPDATE transactions SET amount = 6.5 WHERE id = ?", (t_id,))
+        self.a.delete_transaction(other)
+        result = sync_databases(self.a, self.b)
+
+        self.assertEqual(result['sent'], 2)
+        self.assertEqual(ledger(self.b), [("2024-01-01", 6.5, "🍔 Comida", "Café")])
+
+    def test_last_writer_wins_and_delete_beats_tie(self):
+        t_id = self.a.add_transaction(Transaction(TransactionType.EXPENSE, 5.0, "🍔 Comida", "Café", "2024-01-01"))
+        sync_databases(self.a, self.b)
+        b_id = self.b.get_all_transactions()[0].id
+
+        with self.a.transaction() as conn:
+            conn.execute("UPDATE transactions SET amount = 7.0 WHERE id = ?", (t_id,))
+            conn.execute("UPDATE sync_rows SET modified_at = '2030-01-01 00:00:00.000' WHERE row_id = ?", (t_id,))
+        with self.b.transaction() as conn:
+            conn.execute("UPDATE transactions SET amount = 8.0 WHERE id = ?", (b_id,))
+        result = sync_databases(self.a, self.b)
+
+        self.assertEqual(result['conflicts'], 1)
+        self.assertEqual(ledger(self.a), ledger(self.b))
+        self.assertEqual(ledger(self.b)[0][1], 7.0)
+
+        stamp = "2031-01-01 00:00:00.000"
+        with self.a.transaction() as conn:
+            conn.execute("UPDATE transactions SET amount = 9.0 WHERE id = ?", (t_id,))
+            conn.execute("UPDATE sync_rows SET modified_at = ? WHERE row_id = ?", (stamp, t_id))
+        self.b.delete_transaction(b_id)
+        with self.b.transaction() as conn:
+            conn.execute("UPDATE sync_rows SET modified_at = ? WHERE deleted = 1", (stamp,))
+        sync_databases(self.a, self.b)
+        self.assertEqual(ledger(self.a), [])
+        self.assertEqual(ledger(self.b), [])
+
+    def test_goal_deposits_keep_their_link_and_balance(self):
+        goal_id = self.a.add_savings_goal(SavingsGoal("Viaje", 1000.0))
+        self.a.add_savings_deposit(goal_id, 50.0, "2024-01-01")
+        sync_databases(self.a, self.b)
+
+        b_goal = self.b.get_all_savings_goals()[0]
+        self.b.add_savings_deposit(b_goal.id, 30.0, "2024-01-02")
+        self.a.add_savings_deposit(goal_id, 20.0, "2024-01-03")
+        sync_databases(self.a, self.b)
+
+        for db in (self.a, self.b):
+            goal = db.get_all_savings_goals()[0]
+            self.assertEqual(goal.current_amount, 100.0)
+            self.assertEqual(len(db.get_goal_transactions(goal.id)), 3)
+            self.assertEqual(db.check_goal_consistency(), [])
+
+    def test_archiving_is_not_propagated_as_delete(self):
+        self.a.add_transaction(Transaction(TransactionType.EXPENSE, 5.0, "🍔 Comida", "Café", "2021-01-01"))
+        sync_databases(self.a, self.b)
+
+        self.a.archive_year(2021)
+        self.assertEqual(sync_databases(self.a, self.b)['sent'], 0)
+        self.assertEqual(len(ledger(self.b)), 1)
+
+    def test_remote_edit_to_archived_row_is_not_reinserted(self):
+        self.a.add_transaction(Transaction(TransactionType.EXPENSE, 5.0, "🍔 Comida", "Café", "2021-01-01"))
+        sync_databases(self.a, self.b)
+        self.a.archive_year(2021)
+
+        edited = self.b.get_all_transactions()[0]
+        with self.b.transaction() as conn:
+            conn.execute("UPDATE transactions SET amount = 7.0 WHERE id = ?", (edited.id,))
+        result = sync_databases(self.a, self.b)
+
+        self.assertEqual(result['conflicts'], 1)
+        self.assertEqual([t.amount for t in self.a.get_all_transactions()], [5.0])
+        self.assertEqual(self.a.get_expenses_by_category(), {"🍔 Comida": 5.0})
+
+    def test_copied_file_gets_its_own_replica(self):
+        self.a.add_transaction(Transaction(TransactionType.EXPENSE, 5.0, "🍔 Comida", "Café", "2024-01-01"))
+        self.b.close()
+        with self.a.transaction() as conn:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        path = os.path.join(self.tmp.name, "copy.db")
+        shutil.copy(self.a.db_name, path)
+        self.b = Database(path)
+
+        self.b.add_transaction(Transaction(TransactionType.EXPENSE, 9.0, "🍔 Comida", "Menú", "2024-01-02"))
+        sync_databases(self.a, self.b)
+        self.assertNotEqual(self.a.get_replica_id(), self.b.get_replica_id())
+        self.assertEqual(len(ledger(self.a)), 2)
+        self.assertEqual(ledger(self.a), ledger(self.b))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.theme import COLORS, TONES, build_stylesheet
+
+
+class TestTheme(unittest.TestCase):
+    def test_all_placeholders_are_filled(self):
+        sheet = build_stylesheet()
+        self.assertNotIn("$", sheet)
+        self.assertEqual(sheet.count("{"), sheet.count("}"))
+
+    def test_every_tone_has_rules(self):
+        sheet = build_stylesheet()
+        for tone in TONES:
+            self.assertIn(f'QLabel[tone="{tone}"]', sheet)
+            self.assertIn(f'QProgressBar[tone="{tone}"]::chunk', sheet)
+        self.assertIn(f'QLabel[tone="success"], QCheckBox[tone="success"] {{ color: {COLORS["success"]}; }}', sheet)
+        self.assertIn(f'QLabel[tone="muted"], QCheckBox[tone="muted"] {{ color: {COLORS["text_dim"]}; }}', sheet)
+
+    def test_palette_override(self):
+        sheet = build_stylesheet({'danger': '#FF0000'})
+        self.assertIn('#FF0000', sheet)
+        self.assertNotIn(COLORS['danger'], sheet)
+        # El resto de la paleta no cambia
+        self.assertIn(COLORS['success'], sheet)
+
+    def test_widgets_are_selected_by_object_name(self):
+        sheet = build_stylesheet()
+        for name in ("transactionCard", "deleteButton", "goalCard", "metricCard", "panel"):
+            self.assertRegex(sheet, rf"#{name}\b")
+        self.assertIsNone(re.search(r"^\s*QFrame\s*\{", sheet, re.M))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.database import Database
+from src.utils.timeseries import SeriesWindow, bucket_end, bucket_start, lttb
+
+
+class TestDownsampling(unittest.TestCase):
+    def test_short_series_is_kept(self):
+        np.testing.assert_array_equal(lttb(np.arange(5), np.arange(5.0), 10), np.arange(5))
+
+    def test_reduces_to_threshold_and_keeps_peaks(self):
+        x = np.arange(10_000)
+        y = np.sin(x / 300.0)
+        y[4321] = 50.0
+        idx = lttb(x, y, 200)
+
+        self.assertEqual(idx.size, 200)
+        self.assertEqual((idx[0], idx[-1]), (0, x.size - 1))
+        self.assertTrue(np.all(np.diff(idx) > 0))
+        self.assertIn(4321, idx)
+
+    def test_buckets(self):
+        days = np.array(['2024-02-14', '2024-02-18'], dtype='datetime64[D]')
+        np.testing.assert_array_equal(bucket_start(days, 'week'), np.array(['2024-02-12', '2024-02-12'], dtype='datetime64[D]'))
+        np.testing.assert_array_equal(bucket_end(days, 'week'), np.array(['2024-02-18', '2024-02-18'], dtype='datetime64[D]'))
+        self.assertEqual(bucket_start(days, 'month')[0], np.datetime64('2024-02-01'))
+        self.assertEqual(bucket_end(days, 'month')[0], np.datetime64('2024-02-29'))
+
+
+class TestSeriesWindow(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_series.db"))
+        self.db.add_transactions([
+            Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2023-12-31"),
+            Transaction(TransactionType.INCOME, 500.0, "💼 Salario", "", "2024-01-01"),
+            Transaction(TransactionType.EXPENSE, 40.0, "🍔 Comida", "", "2024-01-03"),
+            Transaction(TransactionType.EXPENSE, 60.0, "🍔 Comida", "", "2024-01-09"),
+            Transaction(TransactionType.SAVINGS, 100.0, "💰 Ahorro", "", "2024-02-20"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_period_totals_by_week(self):
+        rows = self.db.get_period_totals('week', '2024-01-01', '2024-12-31')
+        self.assertEqual([tuple(r) for r in rows], [
+            ('2024-01-01', 500.0, 40.0, 0.0),
+            ('2024-01-08', 0.0, 60.0, 0.0),
+            ('2024-02-19', 0.0, 0.0, 100.0),
+        ])
+        self.assertEqual(self.db.get_date_bounds(), ('2023-12-31', '2024-02-20'))
+
+    def test_balance_carries_opening(self):
+        window = SeriesWindow(self.db, 'month')
+        data = window.load('2024-01-15', '2024-02-10')
+
+        np.testing.assert_array_equal(data['dates'], np.array(['2024-01-01', '2024-02-01'], dtype='datetime64[D]'))
+        np.testing.assert_allclose(data['expense'], [100.0, 0.0])
+        np.testing.assert_allclose(data['balance'], [1400.0, 1300.0])
+
+    def test_pan_only_queries_new_range(self):
+        window = SeriesWindow(self.db, 'day')
+        window.load('2024-01-01', '2024-01-05')
+        self.assertEqual(window.queries, 1)
+
+        window.load('2024-01-02', '2024-01-04')
+        self.assertEqual(window.queries, 1)
+
+        data = window.load('2023-12-30', '2024-01-10')
+        self.assertEqual(window.queries, 3)
+        np.testing.assert_allclose(data['balance'], [1000.0, 1500.0, 1460.0, 1400.0])
+        self.assertEqual(window.opening, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType, TransactionColumns
+from src.models.database import Database
+from src.utils.export_manager import ExportManager
+
+
+class TestTransactionColumns(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_columns.db"))
+        self.db.add_transactions([
+            Transaction(TransactionType.INCOME, 1500.0, "💼 Salario", "Nómina", "2024-01-01"),
+            Transaction(TransactionType.EXPENSE, 40.5, "🛒 Alimentación", "Súper", "2024-01-03"),
+            Transaction(TransactionType.EXPENSE, 12.0, "🛒 Alimentación", "Pan", "2024-02-01"),
+        ])
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_transaction_uses_slots(self):
+        t = Transaction(TransactionType.EXPENSE, 1.0, "x", "", "2024-01-01")
+        self.assertFalse(hasattr(t, "__dict__"))
+
+    def test_columns_match_object_results(self):
+        columns = self.db.get_transactions_columns()
+        objects = self.db.get_all_transactions()
+
+        self.assertEqual(len(columns), 3)
+        self.assertEqual(list(columns.ids), [t.id for t in objects])
+        self.assertEqual(list(columns.amounts), [t.amount for t in objects])
+        self.assertEqual(columns.types[0], 'gasto')
+
+    def test_filters_and_numpy(self):
+        columns = self.db.get_transactions_columns(TransactionType.EXPENSE, start="2024-01-01", end="2024-01-31")
+        self.assertEqual(list(columns.descriptions), ["Súper"])
+
+        array = self.db.get_transactions_columns().to_numpy()
+        self.assertAlmostEqual(array['amount'][array['type'] == 'gasto'].sum(), 52.5)
+        self.assertEqual(str(array['date'].max()), "2024-02-01")
+        self.assertEqual(len(TransactionColumns().to_numpy()), 0)
+
+    def test_csv_export_from_columns(self):
+        path = os.path.join(self.tmp.name, "export.csv")
+        self.assertTrue(ExportManager.export_to_csv(self.db.get_transactions_columns(), path))
+        with open(path, encoding='utf-8-sig') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[1], "2024-02-01,Gasto,🛒 Alimentación,12.00,Pan")
+        self.assertEqual(len(lines), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.models.transaction import Transaction, TransactionType
+from src.models.savings_goal import SavingsGoal
+from src.models.allocation_rule import AllocationRule, AllocationMode
+from src.models.recurring_rule import RecurringRule, Frequency
+from src.models.database import Database
+
+
+class TestUndoJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "test_undo.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def _expense(self, amount=10.0, description="Cine"):
+        return Transaction(TransactionType.EXPENSE, amount, "🎬 Ocio", description, "2024-03-01")
+
+    def test_undo_and_redo_delete(self):
+        t_id = self.db.add_transaction(self._expense())
+        self.db.delete_transaction(t_id)
+        self.assertEqual(self.db.get_undo_label(), "Borrar movimiento")
+
+        result = self.db.undo()
+        self.assertEqual(result['tables'], {'transactions'})
+        restored = self.db.get_transaction(t_id)
+        self.assertEqual((restored.amount, restored.description), (10.0, "Cine"))
+        # Los datos derivados (totales y busqueda) vuelven con la fila
+        self.assertEqual(self.db.get_month_category_total("2024-03", TransactionType.EXPENSE, "🎬 Ocio"), 10.0)
+        self.assertEqual(len(self.db.search_transactions("cine")[0]), 1)
+
+        self.db.redo()
+        self.assertIsNone(self.db.get_transaction(t_id))
+        self.assertIsNone(self.db.get_redo_label())
+
+    def test_undo_goal_deletion_restores_rules_and_links(self):
+        goal_id = self.db.add_savings_goal(SavingsGoal("Viaje", 1000.0))
+        self.db.add_allocation_rule(AllocationRule(goal_id, AllocationMode.FIXED, 100))
+        self.db.add_transaction(Transaction(TransactionType.INCOME, 1000.0, "💼 Salario", "", "2024-03-01"))
+        self.db.delete_savings_goal(goal_id)
+
+        self.db.undo()
+
+        self.assertEqual(len(self.db.get_allocation_rules(goal_id)), 1)
+        self.assertEqual(len(self.db.get_goal_transactions(goal_id)), 1)
+        self.assertEqual(self.db.get_all_savings_goals()[0].current_amount, 100.0)
+        self.assertEqual(self.db.check_goal_consistency(), [])
+
+    def test_income_and_its_auto_savings_are_one_step(self):
+        goal_id = self.db.add_savings_goal(SavingsGoal("Viaje", 1000.0))
+        self.db.add_allocation_rule(AllocationRule(goal_id, AllocationMode.PERCENTAGE, 10))
+        self.db.add_transaction(Transaction(TransactionType.INCOME, 500.0, "💼 Salario", "", "2024-03-01"))
+
+        self.db.undo()
+        self.assertEqual(self.db.get_all_transactions(), [])
+        self.assertEqual(self.db.get_all_savings_goals()[0].current_amount, 0.0)
+
+    def test_undo_keeps_writes_made_outside_the_journal(self):
+        goal_id = self.db.add_savings_goal(SavingsGoal("Viaje", 1000.0))
+        self.db.add_allocation_rule(AllocationRule(goal_id, AllocationMode.FIXED, 50))
+        self.db.add_savings_deposit(goal_id, 100.0, "2024-01-01")
+        # Las ocurrencias de reglas repetitivas no abren paso de deshacer
+        self.db.add_recurring_rule(RecurringRule(TransactionType.INCOME, 1000.0, "💼 Salario", "Nómina",
+                                                 Frequency.MONTHLY, "2024-01-01"))
+        self.db.materialize_recurring_rules("2024-02-01")
+        self.assertEqual(self.db.get_all_savings_goals()[0].current_amount, 200.0)
+
+        self.db.undo()
+        self.assertEqual(self.db.get_all_savings_goals()[0].current_amount, 100.0)
+        self.assertEqual(self.db.check_goal_consistency(), [])
+
+        self.db.redo()
+        self.assertEqual(self.db.get_all_savings_goals()[0].current_amount, 200.0)
+        self.assertEqual(self.db.check_goal_consistency(), [])
+
+    def test_undo_only_restores_the_columns_it_changed(self):
+        goal_id = self.db.add_savings_goal(SavingsGoal("Viaje", 1000.0))
+        self.db.add_savings_deposit(goal_id, 100.0, "2024-01-01")
+        with self.db.transaction() as conn:
+            conn.execute("UPDATE savings_goals SET name = 'Vacaciones' WHERE id = ?", (goal_id,))
+
+        self.db.undo()
+        goal = self.db.get_all_savings_goals()[0]
+        self.assertEqual((goal.name, goal.current_amount), ("Vacaciones", 0.0))
+
+    def test_new_action_clears_redo(self):
+        self.db.add_transaction(self._expense())
+        self.db.undo()
+        self.assertEqual(self.db.get_redo_label(), "Añadir movimiento")
+
+        self.db.add_transaction(self._expense(20.0))
+        self.assertIsNone(self.db.get_redo_label())
+        self.assertIsNone(self.db.redo())
+
+    def test_failed_write_leaves_no_step(self):
+        with self.assertRaises(Exception):
+            self.db.add_savings_deposit(9999, 50.0, "2024-03-01")
+        self.assertIsNone(self.db.get_undo_label())
+
+    def test_retention_is_bounded(self):
+        self.db.journal_max_steps = 5
+        for i in range(8):
+            self.db.add_transaction(self._expense(float(i + 1)))
+
+        undone = 0
+        while self.db.undo():
+            undone += 1
+        self.assertEqual(undone, 5)
+        self.assertEqual(len(self.db.get_all_transactions()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()